@@ -0,0 +1 @@
+"""Benchmarks for EchoMind (run with python -m benchmarks.<name>)"""
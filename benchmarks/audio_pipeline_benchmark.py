@@ -0,0 +1,181 @@
+"""Allocation benchmark for the always-on listening pipeline
+
+Plays synthetic turns (see vad_benchmark.synthetic_clip) through the same
+path a running session uses, without a sound card:
+- capture: MicrophoneCapture's audio callback, fed one block at a time from
+  a reused driver buffer, as PortAudio does (ring write + noise floor)
+- listen: a RingSource per listen() attempt, read by record_utterance with a
+  VoiceActivityDetector (or, with --recognizer, by speech_recognition's
+  Recognizer.listen, the VAD_ENABLED=false path)
+
+Reported per second of audio:
+- transient KB: memory allocated and released again while handling each
+  block (the sum over blocks of tracemalloc's peak above the level at the
+  start of the block; a lower bound of the allocation volume)
+- gen0 GCs: garbage collections of the youngest generation, a measure of
+  how many container objects the pipeline churns through
+- CPU time (measured in a separate run without tracemalloc)
+
+Usage:
+    python -m benchmarks.audio_pipeline_benchmark [--seconds 120] [--recognizer]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import speech_recognition as sr
+
+from benchmarks.vad_benchmark import SAMPLE_RATE, synthetic_clip
+from utils.audio_capture import MicrophoneCapture
+from utils.noise_floor import NoiseFloor
+from utils.vad import VoiceActivityDetector, record_utterance
+
+BLOCK_SIZE = 1024
+
+
+class AllocationMeter:
+    """Sums tracemalloc's per-step peak above the memory in use at the start of the step"""
+
+    def __init__(self):
+        self.transient = 0
+        self._base = None
+
+    def step(self):
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._base is not None:
+            self.transient += max(0, peak - self._base)
+        tracemalloc.reset_peak()
+        self._base = current
+
+
+class Driver:
+    """Feeds audio into a MicrophoneCapture block by block, on demand of its readers"""
+
+    def __init__(self, capture, samples, meter):
+        self.capture = capture
+        self.samples = samples
+        self.meter = meter
+        self.fed = 0
+        self._indata = bytearray(capture.block_size * 2)  # PortAudio reuses its buffer too
+        self._frames = np.frombuffer(self._indata, dtype=np.int16)
+
+    @property
+    def exhausted(self):
+        return self.fed + self.capture.block_size > len(self.samples)
+
+    def pump(self, until):
+        """Run the audio callback until the ring holds position until"""
+        block = self.capture.block_size
+        while self.capture.ring.written < until:
+            if self.exhausted:
+                raise EOFError
+            self._frames[:] = self.samples[self.fed:self.fed + block]
+            self.fed += block
+            self.capture._callback(self._indata, block, None, None)
+
+    def source(self):
+        """capture.source(), whose reads first capture the audio they wait for"""
+        source = self.capture.source()
+        for name in ("read", "read_samples"):
+            method = getattr(source, name, None)
+            if method is not None:
+                setattr(source, name, self._pumped(source, method))
+        return source
+
+    def _pumped(self, source, method):
+        def read(size):
+            self.meter.step()
+            self.pump(source.position + size)
+            return method(size)
+        return read
+
+
+def vad_listen(source, threshold):
+    detector = VoiceActivityDetector(source.SAMPLE_RATE, threshold)
+    return record_utterance(source, detector, timeout=8, phrase_time_limit=12)
+
+
+def recognizer_listen(source, threshold):
+    recognizer = sr.Recognizer()
+    recognizer.dynamic_energy_threshold = False
+    recognizer.energy_threshold = threshold
+    return recognizer.listen(source, timeout=8, phrase_time_limit=12)
+
+
+def run(samples, listen, traced):
+    """Listen through samples until they run out; returns the measurements"""
+    meter = AllocationMeter()
+    with tempfile.TemporaryDirectory() as directory:
+        capture = MicrophoneCapture(sample_rate=SAMPLE_RATE, block_size=BLOCK_SIZE)
+        capture.noise = NoiseFloor(SAMPLE_RATE, path=os.path.join(directory, "noise_floor.json"))
+        driver = Driver(capture, samples, meter)
+        utterances = 0
+        gc.collect()
+        collections = gc.get_stats()[0]["collections"]
+        if traced:
+            tracemalloc.start()
+        started = time.process_time()
+        while not driver.exhausted:
+            try:
+                with driver.source() as source:
+                    if listen(source, capture.noise.threshold).frame_data:
+                        utterances += 1
+            except (sr.WaitTimeoutError, EOFError):
+                pass
+        cpu = time.process_time() - started
+        meter.step()
+        if traced:
+            tracemalloc.stop()
+        collections = gc.get_stats()[0]["collections"] - collections
+    seconds = driver.fed / SAMPLE_RATE
+    return {
+        "audio_s": round(seconds, 1),
+        "utterances": utterances,
+        "transient_kb_per_s": round(meter.transient / 1024 / seconds, 1),
+        "gen0_gcs_per_min": round(collections / seconds * 60, 1),
+        "cpu_ms_per_s": round(cpu / seconds * 1000, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure allocations of the always-on listening pipeline")
+    parser.add_argument("--seconds", type=float, default=120, help="audio to play through the pipeline")
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--recognizer", action="store_true", help="listen with Recognizer.listen instead of the VAD")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    clips, total = [], 0
+    while total < args.seconds * SAMPLE_RATE:
+        clip, _ = synthetic_clip(rng)
+        clips.append(clip)
+        total += len(clip)
+    samples = np.concatenate(clips)
+
+    listen = recognizer_listen if args.recognizer else vad_listen
+    result = run(samples, listen, traced=True)
+    untraced = run(samples, listen, traced=False)
+    result["cpu_ms_per_s"] = untraced["cpu_ms_per_s"]
+    result["gen0_gcs_per_min"] = untraced["gen0_gcs_per_min"]
+    result["listener"] = "recognizer" if args.recognizer else "vad"
+
+    print(f"{'listener':<12}{'audio s':>9}{'utterances':>12}{'transient KB/s':>16}{'gen0 GCs/min':>14}{'cpu ms/s':>10}")
+    print(f"{result['listener']:<12}{result['audio_s']:>9}{result['utterances']:>12}{result['transient_kb_per_s']:>16}"
+          f"{result['gen0_gcs_per_min']:>14}{result['cpu_ms_per_s']:>10}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
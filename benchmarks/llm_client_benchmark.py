@@ -0,0 +1,258 @@
+"""Latency benchmark for the LLM clients against the local mock server
+
+Starts benchmarks/mock_llm_server.py, points clients/gemini_client.py and
+clients/groq_client.py at it and sends the same prompt --requests times
+through the full provider chain (rate limiter, circuit breakers, deadline,
+Groq fallback) in each scenario:
+- gemini / gemini stream (sse) / gemini stream (json array): Gemini answers
+- 429 burst -> groq, blocking and streamed: Gemini sends bursts of 429s
+- gemini timeouts: some Gemini requests are never answered
+- malformed json / malformed stream: some Gemini bodies or stream events are
+  truncated JSON
+
+For every scenario it reports time to first token (the whole answer for
+blocking calls), total latency, the latency of requests Groq answered
+(fallback latency), how many answers were usable, and the client's CPU time
+per request: in total, parsing (Response.json, StreamParser) and cleaning
+(text extraction, normalize_response, strip_json_noise).
+
+Nothing leaves the machine: the API keys and endpoints are replaced before
+the clients are imported, and the response cache and rate limits are off.
+
+Usage:
+    python -m benchmarks.llm_client_benchmark [--requests 20] [--out report.json]
+    python -m benchmarks.llm_client_benchmark --scenario "429 burst -> groq" --gemini-latency 0.8
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import requests
+
+from benchmarks.mock_llm_server import GEMINI, GROQ, MockLLMServer, add_behaviour_args, behaviour_from_args
+
+PROMPT = "What's the weather like today, and when is my next meeting?"
+
+# name -> (streamed, Gemini changes, Groq changes); Gemini streams SSE unless "sse" is False
+SCENARIOS = {
+    "gemini": (False, {}, {}),
+    "gemini stream (sse)": (True, {}, {}),
+    "gemini stream (json array)": (True, {"sse": False}, {}),
+    "429 burst -> groq": (False, {"burst_every": 10, "burst_length": 3}, {}),
+    "429 burst -> groq stream": (True, {"burst_every": 10, "burst_length": 3}, {}),
+    "gemini timeouts": (False, {"hang_rate": 0.2}, {}),
+    "gemini stream timeouts": (True, {"hang_rate": 0.2}, {}),
+    "malformed json": (False, {"malformed_rate": 0.3}, {}),
+    "malformed stream": (True, {"malformed_rate": 0.3}, {}),
+}
+
+
+class CpuMeter:
+    """Per-category CPU time of wrapped functions (outermost call only, per thread)"""
+
+    def __init__(self):
+        self.seconds = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._patched = []
+
+    def wrap(self, owner, name, category):
+        original = getattr(owner, name)
+        local = self._local
+
+        def timed(*args, **kwargs):
+            if getattr(local, "active", False):
+                return original(*args, **kwargs)
+            local.active = True
+            started = time.thread_time()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                local.active = False
+                spent = time.thread_time() - started
+                with self._lock:
+                    self.seconds[category] = self.seconds.get(category, 0.0) + spent
+
+        setattr(owner, name, timed)
+        self._patched.append((owner, name, original))
+
+    def take(self):
+        """Return the totals so far and start over"""
+        with self._lock:
+            seconds, self.seconds = self.seconds, {}
+        return seconds
+
+    def restore(self):
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched.clear()
+
+
+def load_clients(server):
+    """Import the clients configured for the mock server"""
+    os.environ.update({
+        "GEMINI_API_ENDPOINT": server.gemini_endpoint(),
+        "GEMINI_API_KEY": "mock",
+        "GEMINI_API_KEY_HEADER": "x-goog-api-key",
+        "GROQ_API_ENDPOINT": server.groq_endpoint(),
+        "GROQ_API_KEY": "mock",
+        "GEMINI_RATE_LIMIT_RPM": "0",
+        "GROQ_RATE_LIMIT_RPM": "0",
+        "LLM_CACHE": "false",
+        "LLM_HEDGE": "false",
+    })
+    from clients import gemini_client, groq_client
+    return gemini_client, groq_client
+
+
+def instrument(gemini_client, groq_client):
+    """CpuMeter around the clients' parsing and cleaning functions"""
+    from clients import stream_parser
+
+    meter = CpuMeter()
+    meter.wrap(requests.models.Response, "json", "parse")
+    meter.wrap(stream_parser.StreamParser, "feed", "parse")
+    meter.wrap(stream_parser.StreamParser, "close", "parse")
+    for name in ("_extract_text_from_data", "strip_json_noise", "normalize_response"):
+        meter.wrap(gemini_client, name, "clean")
+    for name in ("_extract_text_from_data", "_extract_reply", "normalize_response"):
+        meter.wrap(groq_client, name, "clean")
+    return meter
+
+
+def reset_clients(gemini_client, groq_client):
+    """Fresh circuit breakers (and the chains holding them) for the next scenario"""
+    from clients.circuit_breaker import CircuitBreaker
+    from clients.provider_chain import ProviderChain
+
+    gemini_client.BREAKER = CircuitBreaker("gemini")
+    groq_client.BREAKER = CircuitBreaker("groq")
+    gemini_client.GEMINI_CHAIN = ProviderChain(gemini_client._gemini_providers())
+    gemini_client.GROQ_CHAIN = ProviderChain(gemini_client._groq_providers())
+    gemini_client.CHAIN = ProviderChain(gemini_client.GEMINI_CHAIN.providers + gemini_client.GROQ_CHAIN.providers)
+    gemini_client.ASYNC_CHAIN = ProviderChain(gemini_client._async_providers())
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def _usable(text):
+    return bool(text) and "having trouble" not in text
+
+
+def run_scenario(name, server, gemini_client, groq_client, meter, base, count=20, deadline=6.0):
+    """Send PROMPT count times; return the scenario's result dict"""
+    streamed, gemini_changes, groq_changes = SCENARIOS[name]
+    gemini_changes = dict(gemini_changes)
+    sse = gemini_changes.pop("sse", True)
+    server.configure(GEMINI, base[GEMINI].replace(**gemini_changes))
+    server.configure(GROQ, base[GROQ].replace(**groq_changes))
+    reset_clients(gemini_client, groq_client)
+    gemini_client.GEMINI_API_ENDPOINT = server.gemini_endpoint(stream=streamed, sse=sse)
+    os.environ["GEMINI_API_STREAM"] = "true" if streamed else "false"
+    meter.take()
+
+    first, total, fallback, cpu = [], [], [], []
+    usable = 0
+    for _ in range(count):
+        groq_before = server.requests[GROQ]
+        cpu_started = time.thread_time()
+        started = time.perf_counter()
+        ttft = None
+        if streamed:
+            chunks = []
+            for chunk in gemini_client.stream_generate(PROMPT, deadline):
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                chunks.append(chunk)
+            answer = "".join(chunks)
+        else:
+            answer = gemini_client.generate_response(PROMPT, deadline)
+        elapsed = time.perf_counter() - started
+        cpu.append(time.thread_time() - cpu_started)
+        first.append(ttft if ttft is not None else elapsed)
+        total.append(elapsed)
+        if server.requests[GROQ] > groq_before:
+            fallback.append(elapsed)
+        usable += _usable(answer)
+
+    spent = meter.take()
+    return {
+        "scenario": name,
+        "requests": count,
+        "usable": usable,
+        "fallbacks": len(fallback),
+        "ttft_p50_ms": _ms(_percentile(first, 50)),
+        "ttft_p95_ms": _ms(_percentile(first, 95)),
+        "total_p50_ms": _ms(_percentile(total, 50)),
+        "total_p95_ms": _ms(_percentile(total, 95)),
+        "fallback_p50_ms": _ms(_percentile(fallback, 50)),
+        "cpu_ms": round(sum(cpu) / count * 1000, 3),
+        "parse_cpu_ms": round(spent.get("parse", 0.0) / count * 1000, 3),
+        "clean_cpu_ms": round(spent.get("clean", 0.0) / count * 1000, 3),
+        "gemini_circuit": gemini_client.BREAKER.state,
+    }
+
+
+def print_report(results):
+    columns = (("scenario", "", 28), ("usable", "ok", 6), ("fallbacks", "groq", 6),
+               ("ttft_p50_ms", "ttft p50", 10), ("ttft_p95_ms", "ttft p95", 10),
+               ("total_p50_ms", "total p50", 11), ("total_p95_ms", "total p95", 11),
+               ("fallback_p50_ms", "fallback", 10), ("cpu_ms", "cpu ms", 9),
+               ("parse_cpu_ms", "parse", 8), ("clean_cpu_ms", "clean", 8), ("gemini_circuit", "circuit", 10))
+    print("".join(f"{title:<{width}}" if key == "scenario" else f"{title:>{width}}"
+                  for key, title, width in columns))
+    for r in results:
+        row = []
+        for key, _, width in columns:
+            value = r[key]
+            if key == "scenario":
+                row.append(f"{value:<{width}}")
+            else:
+                row.append(f"{'-' if value is None else value:>{width}}")
+        print("".join(row))
+    print("latencies in ms; cpu/parse/clean are client CPU ms per request")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the LLM clients against a local mock server")
+    parser.add_argument("--requests", type=int, default=20, help="requests per scenario")
+    parser.add_argument("--deadline", type=float, default=6.0, help="budget per request in seconds")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="only run this scenario (repeatable)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the results as JSON")
+    add_behaviour_args(parser, GEMINI, 0.3)
+    add_behaviour_args(parser, GROQ, 0.1)
+    args = parser.parse_args(argv)
+
+    base = {GEMINI: behaviour_from_args(args, GEMINI), GROQ: behaviour_from_args(args, GROQ)}
+    with MockLLMServer(base[GEMINI], base[GROQ], seed=args.seed) as server:
+        gemini_client, groq_client = load_clients(server)
+        meter = instrument(gemini_client, groq_client)
+        try:
+            results = [run_scenario(name, server, gemini_client, groq_client, meter, base,
+                                    args.requests, args.deadline)
+                       for name in (args.scenario or SCENARIOS)]
+        finally:
+            meter.restore()
+    print_report(results)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Local stand-in for the Gemini and Groq HTTP APIs
+
+Serves the endpoints the clients in clients/ talk to, so they can be
+benchmarked (or the assistant run) without an API key or quota:
+- Gemini `.../models/<model>:generateContent` (one JSON answer) and
+  `:streamGenerateContent` (a JSON array, or SSE with `?alt=sse`)
+- Groq / OpenAI-compatible `.../chat/completions` (one JSON answer, or SSE
+  deltas ending in `data: [DONE]` when the body asks for `stream: true`)
+
+Each provider's behaviour is a MockBehaviour:
+- latency (+ random jitter) before the response starts
+- token_rate: generated tokens per second. A blocking answer arrives after
+  all of them; a stream sends tokens_per_event tokens per event as they
+  are "generated". 0 means instantly.
+- 429 bursts: burst_length requests out of every burst_every are answered
+  429 with a Retry-After header
+- hang_rate: chance that a request gets no answer for hang_seconds, after
+  which the connection is closed (a client-side timeout)
+- malformed_rate: chance that a body, or one stream event, is truncated JSON
+
+Random choices come from a seeded generator, so runs are repeatable.
+
+Run it standalone and point .env at it:
+    python -m benchmarks.mock_llm_server --port 8808 --gemini-429-every 10 --gemini-429-burst 3
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+GEMINI = "gemini"
+GROQ = "groq"
+
+_WORDS = (
+    "sure here is a short answer the weather today looks mild with a light breeze and "
+    "your next meeting starts at 3 pm so there is time for a coffee first"
+).split()
+
+
+class MockBehaviour:
+    """How one mocked provider answers"""
+
+    def __init__(self, latency=0.2, jitter=0.0, token_rate=200.0, answer_tokens=40, tokens_per_event=4,
+                 burst_every=0, burst_length=0, retry_after=1, hang_rate=0.0, hang_seconds=30.0,
+                 malformed_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.token_rate = token_rate
+        self.answer_tokens = answer_tokens
+        self.tokens_per_event = max(1, tokens_per_event)
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.retry_after = retry_after
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.malformed_rate = malformed_rate
+
+    def replace(self, **changes):
+        """A copy with some settings changed"""
+        copy = MockBehaviour.__new__(MockBehaviour)
+        copy.__dict__.update(self.__dict__, **changes)
+        return copy
+
+    def rate_limited(self, index):
+        """True if request number index (0-based) falls in a 429 burst"""
+        return bool(self.burst_every) and index % self.burst_every < self.burst_length
+
+    def answer(self, index):
+        """The answer's tokens; each carries its own leading space except the first"""
+        words = [_WORDS[(index + i) % len(_WORDS)] for i in range(self.answer_tokens)]
+        return [w if i == 0 else " " + w for i, w in enumerate(words)]
+
+
+def gemini_event(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}],
+            "modelVersion": "mock-gemini"}
+
+
+def groq_message(text):
+    return {"id": "chatcmpl-mock", "object": "chat.completion", "model": "mock-groq",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}]}
+
+
+def groq_delta(text):
+    return {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "model": "mock-groq",
+            "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]}
+
+
+def _truncated(obj):
+    encoded = json.dumps(obj)
+    return encoded[:len(encoded) // 2]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server.mock
+        path = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+
+        if ":generateContent" in path.path or ":streamGenerateContent" in path.path:
+            provider = GEMINI
+            stream = ":streamGenerateContent" in path.path
+            sse = stream and "alt=sse" in path.query
+        elif path.path.rstrip("/").endswith("/chat/completions"):
+            provider = GROQ
+            stream = sse = bool(body.get("stream"))
+        else:
+            self._send(404, b'{"error": {"code": 404, "message": "unknown endpoint"}}')
+            return
+
+        behaviour, index, rnd = server.begin(provider)
+        if behaviour.rate_limited(index):
+            self._send(429, b'{"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}}',
+                       {"Retry-After": str(behaviour.retry_after)})
+            return
+        if behaviour.hang_rate and rnd.random() < behaviour.hang_rate:
+            time.sleep(behaviour.hang_seconds)
+            self.close_connection = True
+            return
+
+        time.sleep(behaviour.latency + behaviour.jitter * rnd.random())
+        tokens = behaviour.answer(index)
+        malformed = behaviour.malformed_rate and rnd.random() < behaviour.malformed_rate
+        if stream:
+            self._stream(provider, behaviour, tokens, sse, malformed, rnd)
+            return
+
+        if behaviour.token_rate:
+            time.sleep(len(tokens) / behaviour.token_rate)
+        answer = (gemini_event if provider == GEMINI else groq_message)("".join(tokens))
+        self._send(200, (_truncated(answer) if malformed else json.dumps(answer)).encode("utf-8"))
+
+    def _send(self, status, data, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _stream(self, provider, behaviour, tokens, sse, malformed, rnd):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream" if sse else "application/json; charset=UTF-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        step = behaviour.tokens_per_event
+        pieces = ["".join(tokens[i:i + step]) for i in range(0, len(tokens), step)]
+        bad = rnd.randrange(len(pieces)) if malformed and pieces else -1
+        event_for = gemini_event if provider == GEMINI else groq_delta
+        for i, piece in enumerate(pieces):
+            if behaviour.token_rate:
+                time.sleep(step / behaviour.token_rate)
+            event = event_for(piece)
+            encoded = _truncated(event) if i == bad else json.dumps(event)
+            if sse:
+                self._chunk(f"data: {encoded}\r\n\r\n")
+            else:
+                self._chunk(("[" if i == 0 else ",\r\n") + encoded)
+        if sse:
+            if provider == GROQ:
+                self._chunk("data: [DONE]\n\n")
+        else:
+            self._chunk("]" if pieces else "[]")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class MockLLMServer:
+    """Threaded mock server on localhost; use as a context manager or start()/stop()"""
+
+    def __init__(self, gemini=None, groq=None, host="127.0.0.1", port=0, seed=1):
+        self.behaviours = {GEMINI: gemini or MockBehaviour(), GROQ: groq or MockBehaviour(latency=0.1)}
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self.requests = {GEMINI: 0, GROQ: 0}
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def gemini_endpoint(self, stream=False, sse=True, model="gemini-2.0-flash"):
+        method = "streamGenerateContent" + ("?alt=sse" if sse else "") if stream else "generateContent"
+        return f"{self.url}/v1beta/models/{model}:{method}"
+
+    def groq_endpoint(self):
+        return f"{self.url}/openai/v1/chat/completions"
+
+    def configure(self, provider, behaviour):
+        """Swap a provider's behaviour; its request count (and 429 bursts) start over"""
+        with self._lock:
+            self.behaviours[provider] = behaviour
+            self.requests[provider] = 0
+
+    def begin(self, provider):
+        """(behaviour, request index, per-request Random) for a new request"""
+        with self._lock:
+            index = self.requests[provider]
+            self.requests[provider] += 1
+            return self.behaviours[provider], index, random.Random(self._random.random())
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_behaviour_args(parser, provider, latency):
+    """Add the --<provider>-latency, --<provider>-token-rate, ... options to parser"""
+    group = parser.add_argument_group(provider)
+    group.add_argument(f"--{provider}-latency", type=float, default=latency, help="seconds before the response starts")
+    group.add_argument(f"--{provider}-jitter", type=float, default=0.0, help="up to this many extra seconds")
+    group.add_argument(f"--{provider}-token-rate", type=float, default=200.0, help="tokens per second (0 = instant)")
+    group.add_argument(f"--{provider}-tokens", type=int, default=40, help="tokens per answer")
+    group.add_argument(f"--{provider}-429-every", type=int, default=0, help="429 burst period in requests")
+    group.add_argument(f"--{provider}-429-burst", type=int, default=0, help="429s at the start of each period")
+    group.add_argument(f"--{provider}-hang-rate", type=float, default=0.0, help="share of requests never answered")
+    group.add_argument(f"--{provider}-malformed-rate", type=float, default=0.0, help="share of truncated JSON bodies")
+
+
+def behaviour_from_args(args, provider):
+    """MockBehaviour from the options add_behaviour_args added"""
+    get = lambda name: getattr(args, f"{provider}_{name}")
+    return MockBehaviour(latency=get("latency"), jitter=get("jitter"), token_rate=get("token_rate"),
+                         answer_tokens=get("tokens"), burst_every=get("429_every"), burst_length=get("429_burst"),
+                         hang_rate=get("hang_rate"), malformed_rate=get("malformed_rate"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve mock Gemini and Groq endpoints on localhost")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--seed", type=int, default=1)
+    add_behaviour_args(parser, GEMINI, 0.3)
+    add_behaviour_args(parser, GROQ, 0.1)
+    args = parser.parse_args(argv)
+
+    server = MockLLMServer(behaviour_from_args(args, GEMINI), behaviour_from_args(args, GROQ), args.host, args.port, args.seed)
+    server.start()
+    print(f"Mock LLM server on {server.url}. Point the clients at it with:")
+    print(f"  GEMINI_API_ENDPOINT={server.gemini_endpoint()}")
+    print(f"  (streaming: GEMINI_API_ENDPOINT={server.gemini_endpoint(stream=True)} and GEMINI_API_STREAM=true)")
+    print("  GEMINI_API_KEY=mock")
+    print("  GEMINI_API_KEY_HEADER=x-goog-api-key")
+    print(f"  GROQ_API_ENDPOINT={server.groq_endpoint()}")
+    print("  GROQ_API_KEY=mock")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,395 @@
+"""Routing benchmark driven by recorded utterances
+
+Replays the utterances in logs/assistant.jsonl plus the checked-in synthetic
+corpus (benchmarks/corpus.txt) through main.route_command and reports:
+- which handler claimed each utterance (LLM_VERDICT when none did)
+- per-handler match latency: every candidate route's match_* function, timed
+  on each utterance the dispatcher hands it ("seen")
+- p50/p99 end-to-end routing time (normalization + route_command, executors
+  included)
+- differences against a baseline JSON written by an earlier run
+
+Nothing leaves the process: speak/listen, subprocess, pyautogui, keyboard,
+pynput, webbrowser, os.startfile, ctypes DLL calls and HTTP (requests) are all
+replaced before the handlers are imported, HTTP answers 503, and time.sleep
+returns at once so UI settle delays do not count as routing time.
+
+Usage:
+    python -m benchmarks.routing_benchmark [--repeat 5] [--out report.json]
+    python -m benchmarks.routing_benchmark --save-baseline
+    python -m benchmarks.routing_benchmark --baseline benchmarks/routing_baseline.json
+
+Exits with 1 when an utterance is claimed by a different handler than in the
+baseline (or, with --fail-on-slowdown, when latency regressed).
+"""
+import argparse
+import builtins
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import types
+import webbrowser
+
+DEFAULT_LOG_PATH = os.path.join("logs", "assistant.jsonl")
+DEFAULT_CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.txt")
+DEFAULT_BASELINE_PATH = os.path.join("benchmarks", "routing_baseline.json")
+
+# Modules that drive the desktop; replaced wholesale so nothing is clicked or typed
+INERT_MODULES = ("pyautogui", "keyboard", "pynput", "pynput.keyboard", "pynput.mouse")
+# Audio libraries that locate their shared library through subprocess
+# (ctypes.util.find_library); loaded before subprocess is faked, or replaced
+# if they cannot load (no PortAudio): the benchmark never opens a stream
+AUDIO_MODULES = ("sounddevice",)
+
+
+class _Inert:
+    """Accepts any attribute access or call and does nothing"""
+
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __iter__(self):
+        return iter(())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __bool__(self):
+        return False
+
+
+class _InertModule(types.ModuleType):
+    def __getattr__(self, name):
+        return _Inert()
+
+
+class _FakePopen:
+    returncode = 0
+
+    def __init__(self, *args, **kwargs):
+        text = kwargs.get("text") or kwargs.get("universal_newlines")
+        self._empty = "" if text else b""
+        self.args = args[0] if args else kwargs.get("args")
+        self.stdin = _Inert()
+        self.stdout = None
+        self.stderr = None
+        self.pid = 0
+
+    def communicate(self, *args, **kwargs):
+        return self._empty, self._empty
+
+    def wait(self, *args, **kwargs):
+        return 0
+
+    def poll(self):
+        return 0
+
+    def kill(self):
+        pass
+
+    terminate = kill
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _fake_run(*args, **kwargs):
+    text = kwargs.get("text") or kwargs.get("universal_newlines")
+    empty = "" if text else b""
+    return subprocess.CompletedProcess(args[0] if args else kwargs.get("args"), 0, empty, empty)
+
+
+def _fake_check_output(*args, **kwargs):
+    return "" if kwargs.get("text") or kwargs.get("universal_newlines") else b""
+
+
+def install_stubs():
+    """Replace every side effect the handlers can trigger
+
+    Must run before main (and therefore the handlers) is imported, because
+    some handlers import pyautogui at module level. Returns the list that
+    collects spoken text.
+    """
+    for name in INERT_MODULES:
+        sys.modules[name] = _InertModule(name)
+    sys.modules["pynput"].keyboard = sys.modules["pynput.keyboard"]
+    sys.modules["pynput"].mouse = sys.modules["pynput.mouse"]
+    for name in AUDIO_MODULES:
+        try:
+            importlib.import_module(name)
+        except (ImportError, OSError):
+            sys.modules[name] = _InertModule(name)
+
+    subprocess.run = _fake_run
+    subprocess.call = lambda *args, **kwargs: 0
+    subprocess.check_call = lambda *args, **kwargs: 0
+    subprocess.check_output = _fake_check_output
+    subprocess.Popen = _FakePopen
+    for name in ("open", "open_new", "open_new_tab"):
+        setattr(webbrowser, name, lambda *args, **kwargs: True)
+    webbrowser.get = lambda *args, **kwargs: _Inert()
+    if hasattr(os, "startfile"):
+        os.startfile = lambda *args, **kwargs: None
+    time.sleep = lambda *args, **kwargs: None
+    builtins.input = lambda *args, **kwargs: ""
+
+    try:
+        import ctypes
+        for name in ("windll", "WinDLL", "oledll"):
+            if hasattr(ctypes, name):
+                setattr(ctypes, name, _Inert())
+    except ImportError:
+        pass
+
+    try:
+        import requests
+
+        def _offline(self, method, url, *args, **kwargs):
+            response = requests.Response()
+            response.status_code = 503
+            response.reason = "Service Unavailable (routing benchmark)"
+            response.url = url
+            response._content = b"{}"
+            return response
+
+        requests.Session.request = _offline
+    except ImportError:
+        pass
+    return []
+
+
+def _silence_voice(spoken):
+    """Point every imported speak/listen/log_interaction at in-memory fakes"""
+    from utils import voice_io, logger
+
+    replacements = {
+        id(voice_io.speak): lambda text, *args, **kwargs: spoken.append(text),
+        id(voice_io.speak_now): lambda text, *args, **kwargs: spoken.append(text),
+        id(voice_io.listen): lambda *args, **kwargs: "",
+        id(logger.log_interaction): lambda *args, **kwargs: None,
+    }
+    for name, module in list(sys.modules.items()):
+        if module is None or not (name == "main" or name.startswith(("handlers.", "utils.", "clients."))):
+            continue
+        for attr, value in list(vars(module).items()):
+            if id(value) in replacements:
+                setattr(module, attr, replacements[id(value)])
+
+
+def load_utterances(log_path=None, corpus_path=DEFAULT_CORPUS_PATH):
+    """Return the distinct utterances from the log and the corpus, in file order"""
+    from utils.intent_classifier import SKIPPED_SOURCES
+
+    utterances = []
+    if corpus_path and os.path.exists(corpus_path):
+        with open(corpus_path, encoding="utf-8") as f:
+            utterances.extend(line.strip() for line in f if line.strip() and not line.lstrip().startswith("#"))
+    if log_path and os.path.exists(log_path):
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                user = entry.get("user")
+                if isinstance(user, str) and user.strip() and entry.get("source", "") not in SKIPPED_SOURCES:
+                    utterances.append(user.strip())
+    return list(dict.fromkeys(utterances))
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q / 100.0 * (len(values) - 1))))]
+
+
+def _summary(samples_ms):
+    return {
+        "p50_ms": round(_percentile(samples_ms, 50), 4),
+        "p99_ms": round(_percentile(samples_ms, 99), 4),
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 4) if samples_ms else 0.0,
+        "max_ms": round(max(samples_ms), 4) if samples_ms else 0.0,
+    }
+
+
+def run(utterances, repeat=5, warm_cache=False):
+    """Route every utterance repeat times and return the report dict"""
+    spoken = install_stubs()
+    import main
+    from utils.route_cache import LLM_VERDICT
+    from utils.text_processing import normalize_command
+    _silence_voice(spoken)
+    # The reminder monitor polls with time.sleep, which is stubbed out above
+    from handlers import reminder_handler
+    reminder_handler.REMINDER_THREAD_STARTED = True
+
+    claimed = []
+    run_route = main._run_route
+
+    def recording_run_route(route, command):
+        result = run_route(route, command)
+        if main._route_result(route, result):
+            claimed.append(route.name)
+        return result
+
+    main._run_route = recording_run_route
+
+    claims = {}
+    end_to_end_ms = []
+    match_ms = {}
+    claim_counts = {}
+    # Handlers print progress; keep it out of the report (and the timings)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for utterance in utterances:
+            command = normalize_command(utterance)
+            for route in main.DISPATCHER.candidates(command):
+                if route.matcher is None:
+                    continue
+                samples = match_ms.setdefault(route.name, [])
+                for _ in range(max(1, repeat)):
+                    started = time.perf_counter()
+                    route.matcher(command)
+                    samples.append((time.perf_counter() - started) * 1000)
+
+            for attempt in range(max(1, repeat)):
+                if not warm_cache:
+                    main.ROUTE_CACHE.clear()
+                del claimed[:]
+                started = time.perf_counter()
+                main.route_command(normalize_command(utterance))
+                end_to_end_ms.append((time.perf_counter() - started) * 1000)
+                if attempt == 0:
+                    claims[utterance] = claimed[-1] if claimed else LLM_VERDICT
+            claim_counts[claims[utterance]] = claim_counts.get(claims[utterance], 0) + 1
+
+    handlers = {}
+    for name in sorted(set(match_ms) | set(claim_counts)):
+        samples = match_ms.get(name, [])
+        handlers[name] = dict(utterances=len(samples) // max(1, repeat), claims=claim_counts.get(name, 0),
+                              **_summary(samples))
+
+    return {
+        "meta": {
+            "utterances": len(utterances),
+            "repeat": repeat,
+            "warm_cache": warm_cache,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "intent_model": main.INTENT_MODEL is not None,
+        },
+        "end_to_end": _summary(end_to_end_ms),
+        "handlers": handlers,
+        "claims": claims,
+    }
+
+
+def compare(report, baseline, tolerance=0.5, min_delta_ms=0.05):
+    """Return (claim_changes, slowdowns) between report and a baseline report
+
+    claim_changes lists (utterance, before, after) for utterances present in
+    both runs. slowdowns lists (metric, before_ms, after_ms) for p50/p99 values
+    more than tolerance (0.5 = 50%) and at least min_delta_ms slower than the
+    baseline; the floor keeps microsecond jitter out of the list.
+    """
+    before_claims = baseline.get("claims", {})
+    claim_changes = [
+        (utterance, before_claims[utterance], after)
+        for utterance, after in report["claims"].items()
+        if utterance in before_claims and before_claims[utterance] != after
+    ]
+
+    pairs = [("end_to_end", baseline.get("end_to_end", {}), report["end_to_end"])]
+    for name, stats in report["handlers"].items():
+        if name in baseline.get("handlers", {}):
+            pairs.append((name, baseline["handlers"][name], stats))
+    slowdowns = []
+    for name, before, after in pairs:
+        for key in ("p50_ms", "p99_ms"):
+            old, new = before.get(key), after.get(key)
+            if old and new and new > old * (1 + tolerance) and new - old >= min_delta_ms:
+                slowdowns.append((f"{name} {key}", old, new))
+    return claim_changes, slowdowns
+
+
+def print_report(report, top=None):
+    e2e = report["end_to_end"]
+    meta = report["meta"]
+    print(f"{meta['utterances']} utterances x {meta['repeat']}  "
+          f"end-to-end p50 {e2e['p50_ms']:.3f} ms  p99 {e2e['p99_ms']:.3f} ms  max {e2e['max_ms']:.3f} ms")
+    print(f"{'handler':<28}{'seen':>7}{'claims':>8}{'match p50':>12}{'match p99':>12}")
+    rows = sorted(report["handlers"].items(), key=lambda item: -item[1]["p99_ms"])
+    for name, stats in rows[:top] if top else rows:
+        print(f"{name:<28}{stats['utterances']:>7}{stats['claims']:>8}{stats['p50_ms']:>12.4f}{stats['p99_ms']:>12.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark EchoMind command routing on recorded utterances")
+    parser.add_argument("--log", default=DEFAULT_LOG_PATH, help="interaction log to replay (JSONL)")
+    parser.add_argument("--no-log", action="store_true", help="only replay the synthetic corpus")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_PATH, help="synthetic corpus (one utterance per line)")
+    parser.add_argument("--repeat", type=int, default=5, help="route each utterance this many times")
+    parser.add_argument("--warm-cache", action="store_true", help="keep the routing cache between runs")
+    parser.add_argument("--out", help="write the full report (with per-utterance claims) as JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="baseline report to diff against")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p50/p99 slowdown (0.5 = 50%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    parser.add_argument("--fail-on-slowdown", action="store_true", help="exit 1 on latency regressions too")
+    parser.add_argument("--top", type=int, default=0, help="only list the N slowest handlers")
+    args = parser.parse_args(argv)
+
+    utterances = load_utterances(None if args.no_log else args.log, args.corpus)
+    if not utterances:
+        print("No utterances to replay")
+        return 1
+    report = run(utterances, repeat=args.repeat, warm_cache=args.warm_cache)
+    print_report(report, args.top)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.save_baseline:
+        directory = os.path.dirname(args.baseline)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    claim_changes, slowdowns = compare(report, baseline, args.tolerance, args.min_delta_ms)
+    new = [u for u in report["claims"] if u not in baseline.get("claims", {})]
+    print(f"\nAgainst {args.baseline}: {len(claim_changes)} claim changes, "
+          f"{len(slowdowns)} slowdowns, {len(new)} new utterances")
+    for utterance, before, after in claim_changes:
+        print(f"  CLAIM  {utterance!r}: {before} -> {after}")
+    for metric, before, after in slowdowns:
+        print(f"  SLOWER {metric}: {before:.4f} -> {after:.4f} ms")
+    if claim_changes or (slowdowns and args.fail_on_slowdown):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
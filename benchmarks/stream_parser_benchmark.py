@@ -0,0 +1,212 @@
+"""Micro-benchmark for the streamed-response parser
+
+Compares clients.stream_parser.StreamParser with the line-by-line parsing
+stream_generate used before it (regex search for "text", a new JSONDecoder
+per line, json.loads of the whole line as a fallback, and strip_json_noise on
+every chunk) on large streams:
+- synthetic Gemini SSE (streamGenerateContent?alt=sse), Gemini JSON array
+  (streamGenerateContent) and OpenAI-style SSE (chat/completions, stream:
+  true) streams of --events events each
+- any recorded raw response bodies passed with --stream (e.g. saved with
+  curl -N ... > gemini_stream.txt)
+
+The new parser is fed network-sized chunks (--chunk-size bytes) like
+iter_content() delivers them; the old one gets the lines iter_lines() would
+have produced. For synthetic streams both outputs are checked against the
+text that was encoded: the new parser must reproduce it exactly, while the
+old one is only compared ignoring whitespace, which it stripped from every
+chunk. Recorded streams have no reference, so there the two parsers are
+compared with each other.
+
+Usage:
+    python -m benchmarks.stream_parser_benchmark [--events 20000] [--repeat 5]
+    python -m benchmarks.stream_parser_benchmark --stream recorded_stream.txt
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+from clients.gemini_client import _extract_text_from_data, strip_json_noise
+from clients.stream_parser import StreamParser
+
+_WORDS = (
+    "the assistant streams its answer in small pieces so speech can start early while "
+    "the rest is still being generated, including numbers like 42 and 3.14, quotes \"like this\", "
+    "unicode café — naïve ☕ and the occasional\nnewline"
+).split(" ")
+
+
+def _deltas(count, seed=7):
+    rnd = random.Random(seed)
+    return [" ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(2, 9))) + " " for _ in range(count)]
+
+
+def gemini_sse(deltas):
+    return "".join(
+        "data: " + json.dumps({
+            "candidates": [{"content": {"parts": [{"text": d}], "role": "model"}, "index": 0}],
+            "usageMetadata": {"promptTokenCount": 12, "candidatesTokenCount": i, "totalTokenCount": 12 + i},
+            "modelVersion": "gemini-2.0-flash",
+        }) + "\r\n\r\n"
+        for i, d in enumerate(deltas)
+    ).encode("utf-8")
+
+
+def gemini_json_array(deltas):
+    return ("[" + ",\r\n".join(
+        json.dumps({"candidates": [{"content": {"parts": [{"text": d}], "role": "model"}, "index": 0}]}, indent=2)
+        for d in deltas
+    ) + "]").encode("utf-8")
+
+
+def openai_sse(deltas):
+    return ("".join(
+        "data: " + json.dumps({
+            "id": "chatcmpl-1", "object": "chat.completion.chunk", "model": "llama-3.1-8b-instant",
+            "choices": [{"index": 0, "delta": {"content": d}, "finish_reason": None}],
+        }) + "\n\n"
+        for d in deltas
+    ) + "data: [DONE]\n\n").encode("utf-8")
+
+
+def legacy_parse(lines):
+    """The per-line parsing stream_generate did before the incremental parser"""
+    out = []
+    for raw in lines:
+        if not raw:
+            continue
+        text_match = re.search(r'"text"\s*:\s*', raw)
+        if text_match:
+            try:
+                decoder = json.JSONDecoder()
+                text_content, _ = decoder.raw_decode(raw[text_match.end():])
+                if text_content and isinstance(text_content, str) and text_content.strip():
+                    cleaned = strip_json_noise(text_content)
+                    if cleaned and any(ch.isalnum() for ch in cleaned):
+                        out.append(cleaned)
+                continue
+            except Exception:
+                pass
+        try:
+            part = json.loads(raw)
+            extracted = _extract_text_from_data(part)
+            if extracted:
+                cleaned = strip_json_noise(extracted)
+                if cleaned and any(ch.isalnum() for ch in cleaned):
+                    out.append(cleaned)
+        except Exception:
+            pass
+    return out
+
+
+def new_parse(chunks):
+    parser = StreamParser()
+    out = []
+    for chunk in chunks:
+        out.extend(parser.feed(chunk))
+    out.extend(parser.close())
+    return out
+
+
+def _chunks(body, size):
+    view = memoryview(body)
+    return [view[i:i + size] for i in range(0, len(body), size)]
+
+
+def _lines(body):
+    # iter_lines(decode_unicode=True) splits on line breaks
+    return body.decode("utf-8").splitlines()
+
+
+def _best(fn, arg, repeat):
+    best_wall = best_cpu = float("inf")
+    result = None
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = fn(arg)
+        best_wall = min(best_wall, time.perf_counter() - wall)
+        best_cpu = min(best_cpu, time.process_time() - cpu)
+    return result, best_wall, best_cpu
+
+
+def _squash(pieces):
+    return "".join("".join(pieces).split())
+
+
+def bench(name, body, expected=None, chunk_size=1400, repeat=5):
+    """Time both parsers on one stream body; return a result dict
+
+    expected is the text encoded in body (None for recorded streams).
+    """
+    chunks = _chunks(body, chunk_size)
+    lines = _lines(body)
+    new_out, new_wall, new_cpu = _best(new_parse, chunks, repeat)
+    old_out, old_wall, old_cpu = _best(legacy_parse, lines, repeat)
+    mb = len(body) / 1e6
+    return {
+        "stream": name,
+        "bytes": len(body),
+        "deltas": len(new_out),
+        "new_ms": round(new_wall * 1000, 2),
+        "new_cpu_ms": round(new_cpu * 1000, 2),
+        "new_mb_s": round(mb / new_wall, 1) if new_wall else None,
+        "old_ms": round(old_wall * 1000, 2),
+        "old_cpu_ms": round(old_cpu * 1000, 2),
+        "old_mb_s": round(mb / old_wall, 1) if old_wall else None,
+        "speedup": round(old_wall / new_wall, 1) if new_wall else None,
+        "new_correct": "".join(new_out) == expected if expected is not None else None,
+        "old_correct": _squash(old_out) == _squash([expected]) if expected is not None else None,
+        "agree": _squash(new_out) == _squash(old_out),
+    }
+
+
+def print_report(results):
+    print(f"{'stream':<24}{'MB':>7}{'deltas':>8}{'new ms':>9}{'old ms':>9}{'new MB/s':>10}{'old MB/s':>10}"
+          f"{'speedup':>9}  correct (new/old)")
+    for r in results:
+        if r["new_correct"] is None:
+            correct = "n/a, parsers agree" if r["agree"] else "n/a, parsers differ"
+        else:
+            correct = f"{r['new_correct']}/{r['old_correct']}"
+        print(f"{r['stream']:<24}{r['bytes'] / 1e6:>7.2f}{r['deltas']:>8}{r['new_ms']:>9}{r['old_ms']:>9}"
+              f"{r['new_mb_s']:>10}{r['old_mb_s']:>10}{r['speedup']:>8}x  {correct}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the incremental LLM stream parser")
+    parser.add_argument("--events", type=int, default=20000, help="events per synthetic stream")
+    parser.add_argument("--chunk-size", type=int, default=1400, help="bytes per network chunk fed to the parser")
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    parser.add_argument("--stream", action="append", default=[], help="recorded raw stream body (repeatable)")
+    parser.add_argument("--no-synthetic", action="store_true", help="only benchmark the --stream files")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    streams = []
+    if not args.no_synthetic:
+        deltas = _deltas(args.events)
+        expected = "".join(deltas)
+        streams += [
+            ("gemini sse", gemini_sse(deltas), expected),
+            ("gemini json array", gemini_json_array(deltas), expected),
+            ("openai sse (groq)", openai_sse(deltas), expected),
+        ]
+    for path in args.stream:
+        with open(path, "rb") as f:
+            streams.append((os.path.basename(path), f.read(), None))
+
+    results = [bench(name, body, expected, args.chunk_size, args.repeat) for name, body, expected in streams]
+    print_report(results)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    # The new parser must reproduce every synthetic stream exactly
+    return 0 if all(r["new_correct"] is not False for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Asyncio HTTP sessions for the AI provider clients
+
+The async counterpart of http_pool.PooledSession. Each client owns one
+AsyncSession, which keeps one httpx.AsyncClient (a keep-alive connection
+pool) per event loop, so concurrent coroutines share open connections.
+
+httpx is optional. Without it, `available` is False and the clients' async
+functions run the blocking requests-based calls in worker threads instead.
+They behave the same, but a cancelled call only stops waiting: the thread
+finishes its request in the background.
+"""
+import asyncio
+import time
+import weakref
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from .http_pool import HTTP_POOL_SIZE
+from .rate_limit import read_seconds, shorten
+
+
+def _timeout(timeout):
+    """httpx.Timeout from a requests-style timeout (seconds or (connect, read))"""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+async def athrottle(limiter, timeout):
+    """rate_limit.throttle without blocking the event loop"""
+    if limiter.acquire(timeout=0):
+        return timeout
+    started = time.monotonic()
+    if not await asyncio.to_thread(limiter.acquire, read_seconds(timeout)):
+        return None
+    return shorten(timeout, time.monotonic() - started)
+
+
+async def iterate_in_thread(iterable):
+    """Async iterator over a blocking iterable (e.g. a requests-based stream)"""
+    done = object()
+    iterator = iter(iterable)
+    while True:
+        item = await asyncio.to_thread(next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+class AsyncSession:
+    """One pooled httpx.AsyncClient per running event loop"""
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE):
+        self.pool_size = max(1, int(pool_size))
+        self._clients = weakref.WeakKeyDictionary()  # loop -> httpx.AsyncClient
+        self.requests = 0
+
+    @property
+    def available(self):
+        return httpx is not None
+
+    def client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            limits = httpx.Limits(max_keepalive_connections=self.pool_size,
+                                  max_connections=self.pool_size * 4)
+            client = httpx.AsyncClient(limits=limits)
+            self._clients[loop] = client
+        return client
+
+    async def post(self, url, timeout=15.0, **kwargs):
+        self.requests += 1
+        return await self.client().post(url, timeout=_timeout(timeout), **kwargs)
+
+    def stream(self, url, timeout=15.0, **kwargs):
+        """async context manager yielding a streaming POST response"""
+        self.requests += 1
+        return self.client().stream("POST", url, timeout=_timeout(timeout), **kwargs)
+
+    async def aclose(self):
+        """Close this event loop's client"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
@@ -0,0 +1,158 @@
+"""Per-provider circuit breakers
+
+Each provider client owns one CircuitBreaker, shared by every request in the
+process. The breaker watches the outcomes of recent calls:
+
+- closed: requests go through. Outcomes and latencies are recorded in
+  sliding windows. The circuit opens after `failure_threshold` consecutive
+  failures, or when the error rate over the window reaches `error_rate`
+  (once at least `min_calls` outcomes are known). A 429 opens it right away.
+- open: allow() is False, so callers skip the provider (Gemini goes straight
+  to Groq) without sleeping. This lasts until the cooldown has passed. The
+  cooldown doubles on every failed probe, up to max_cooldown, and is never
+  shorter than a Retry-After the provider sent.
+- half-open: exactly one probe request is let through. Success closes the
+  circuit and failure opens it again.
+
+Calls slower than slow_call_seconds (0 disables this) count as failures for
+the error rate, so a provider that answers but takes forever is also avoided.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from .hedging import LatencyWindow
+
+# Defaults for every provider's breaker (cooldowns in seconds)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_ERROR_RATE = float(os.getenv("CIRCUIT_ERROR_RATE", "0.5"))
+CIRCUIT_COOLDOWN = float(os.getenv("CIRCUIT_COOLDOWN", "30"))
+CIRCUIT_MAX_COOLDOWN = float(os.getenv("CIRCUIT_MAX_COOLDOWN", "300"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "0"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe closed/open/half-open breaker with error-rate and latency windows"""
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, error_rate=CIRCUIT_ERROR_RATE,
+                 window=20, min_calls=6, cooldown=CIRCUIT_COOLDOWN, max_cooldown=CIRCUIT_MAX_COOLDOWN,
+                 slow_call_seconds=CIRCUIT_SLOW_CALL_SECONDS):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.slow_call_seconds = slow_call_seconds
+        self.latency = LatencyWindow(window)
+        self._outcomes = deque(maxlen=window)  # True = success
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._cooldown = cooldown
+        self._opened_at = 0.0
+        self._retry_at = 0.0
+        self._probe_started = None
+        self.opened = 0
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+
+    def allow(self):
+        """True if a request may be sent now (in half-open state: to the one probe)"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now >= self._retry_at:
+                self.state = HALF_OPEN
+                self._probe_started = None
+            if self.state == HALF_OPEN:
+                # A probe that never reported back (killed thread) must not block forever
+                if self._probe_started is None or now - self._probe_started > self._cooldown:
+                    self._probe_started = now
+                    return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, seconds=None):
+        """Report a successful call (seconds = its latency, if known)"""
+        if seconds is not None:
+            self.latency.add(seconds)
+            if self.slow_call_seconds and seconds > self.slow_call_seconds:
+                self.record_failure()
+                return
+        with self._lock:
+            self.successes += 1
+            self._outcomes.append(True)
+            self._consecutive_failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self._cooldown = self.base_cooldown
+                self._outcomes.clear()
+                self._probe_started = None
+
+    def record_failure(self, seconds=None, trip=False, retry_after=None):
+        """Report a failed call; trip=True (e.g. HTTP 429) opens the circuit at once"""
+        if seconds is not None:
+            self.latency.add(seconds)
+        with self._lock:
+            self.failures += 1
+            self._outcomes.append(False)
+            self._consecutive_failures += 1
+            if self.state == HALF_OPEN:
+                # Failed probe: back off further
+                self._cooldown = min(self.max_cooldown, self._cooldown * 2)
+                self._open(retry_after)
+                return
+            if self.state == OPEN:
+                return
+            failed = self._outcomes.count(False)
+            if (trip or self._consecutive_failures >= self.failure_threshold
+                    or (len(self._outcomes) >= self.min_calls
+                        and failed / len(self._outcomes) >= self.error_rate)):
+                self._open(retry_after)
+
+    def _open(self, retry_after=None):
+        now = time.monotonic()
+        cooldown = self._cooldown
+        if retry_after:
+            cooldown = max(cooldown, min(self.max_cooldown, float(retry_after)))
+        self.state = OPEN
+        self._opened_at = now
+        self._retry_at = now + cooldown
+        self._probe_started = None
+        self.opened += 1
+
+    def stats(self):
+        """Return the state, counters, error rate and latency percentiles"""
+        with self._lock:
+            outcomes = len(self._outcomes)
+            stats = {
+                "state": self.state,
+                "successes": self.successes,
+                "failures": self.failures,
+                "error_rate": (self._outcomes.count(False) / outcomes) if outcomes else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+            if self.state == OPEN:
+                stats["retry_in_s"] = round(max(0.0, self._retry_at - time.monotonic()), 1)
+        for q in (50, 95):
+            value = self.latency.percentile(q)
+            stats[f"p{q}_s"] = round(value, 3) if value is not None else None
+        return stats
+
+
+def retry_after_seconds(response):
+    """Seconds from a Retry-After header (None if absent or an HTTP date)"""
+    try:
+        value = response.headers.get("Retry-After")
+        return float(value) if value else None
+    except (AttributeError, TypeError, ValueError):
+        return None
@@ -9,12 +9,26 @@ Key Features:
 1. Primary: Google Gemini (2.0-Flash recommended).
 2. Fallback: Groq Llama 3.1 (triggered on Gemini quota limits).
 3. Support for both blocking (generate_response) and streaming (stream_generate).
+4. Asyncio versions (agenerate_response, astream_generate) that can be
+   cancelled and fanned out with asyncio.gather.
 """
 
+import asyncio
 import os
+import re
+import time
 from typing import Generator, Optional
 import requests
 
+from .async_http import AsyncSession, athrottle, iterate_in_thread
+from .circuit_breaker import CLOSED, CircuitBreaker, retry_after_seconds
+from .hedging import HedgedRequest
+from .http_pool import PooledSession
+from .provider_chain import Deadline, Provider, ProviderChain
+from .rate_limit import TokenBucket, throttle
+from .response_cache import ResponseCache
+from .stream_parser import StreamParser, iter_text
+
 
 class QuotaExceededError(Exception):
     """Raised when a provider reports quota/rate-limit (HTTP 429)."""
@@ -30,6 +44,56 @@ GEMINI_API_KEY_HEADER = os.getenv("GEMINI_API_KEY_HEADER")
 # Optional: control response formatting and prompt wrapping
 GEMINI_RESPONSE_MODE = os.getenv("GEMINI_RESPONSE_MODE", "").lower()  # e.g. 'plain_text'
 GEMINI_PROMPT_WRAPPER = os.getenv("GEMINI_PROMPT_WRAPPER", "").strip()
+# Client-side rate limit (requests per minute, 0 disables) and burst size
+GEMINI_RATE_LIMIT_RPM = float(os.getenv("GEMINI_RATE_LIMIT_RPM", "15"))
+GEMINI_RATE_LIMIT_BURST = int(os.getenv("GEMINI_RATE_LIMIT_BURST", "5"))
+# Response cache (see clients/response_cache.py); TTLs in seconds
+LLM_CACHE = os.getenv("LLM_CACHE", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("cache", "llm_responses.sqlite3"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "256"))
+LLM_CACHE_SHORT_TTL = float(os.getenv("LLM_CACHE_SHORT_TTL", "120"))
+LLM_CACHE_LONG_TTL = float(os.getenv("LLM_CACHE_LONG_TTL", str(7 * 24 * 3600)))
+# Total time budget per request in seconds: spoken answers and generated documents
+LLM_DEADLINE_VOICE = float(os.getenv("LLM_DEADLINE_VOICE", "6"))
+LLM_DEADLINE_DOCUMENT = float(os.getenv("LLM_DEADLINE_DOCUMENT", "60"))
+# Optional hedging: race Groq once Gemini is slower than its recent p95
+# (see clients/hedging.py); delays in seconds
+LLM_HEDGE = os.getenv("LLM_HEDGE", "").lower() in ("1", "true", "yes")
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "95"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))
+LLM_HEDGE_MAX_DELAY = float(os.getenv("LLM_HEDGE_MAX_DELAY", "8.0"))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "4.0"))
+
+# Returned when no provider could answer; never cached
+BACKEND_ERROR = "I'm having trouble connecting to my AI backend right now. Please try again in a moment."
+
+# Every Gemini HTTP request takes a token; callers only wait once the budget is spent
+RATE_LIMITER = TokenBucket(GEMINI_RATE_LIMIT_RPM, GEMINI_RATE_LIMIT_BURST)
+
+# Keep-alive connection pool shared by every Gemini request
+SESSION = PooledSession()
+# The same for the async API (one pool per event loop)
+ASYNC_SESSION = AsyncSession()
+
+# While open, requests skip Gemini and go straight to Groq
+BREAKER = CircuitBreaker("gemini")
+
+
+# Answers keyed by the user's prompt (not the date/time context), model and response mode
+RESPONSE_CACHE = ResponseCache(
+    LLM_CACHE_PATH, LLM_CACHE_SIZE, LLM_CACHE_SHORT_TTL, LLM_CACHE_LONG_TTL
+) if LLM_CACHE else None
+HEDGER = HedgedRequest(
+    "gemini", "groq", LLM_HEDGE_QUANTILE, LLM_HEDGE_MIN_DELAY, LLM_HEDGE_MAX_DELAY, LLM_HEDGE_DEFAULT_DELAY
+) if LLM_HEDGE else None
+_model_match = re.search(r"models/([^:/?]+)", GEMINI_API_ENDPOINT or "")
+CACHE_MODEL = _model_match.group(1) if _model_match else (GEMINI_API_ENDPOINT or "")
+CACHE_MODE = f"{GEMINI_RESPONSE_MODE}|{GEMINI_PROMPT_WRAPPER}"
+
+
+def warm_up():
+    """Open the Gemini connection in the background so the first request skips the handshake"""
+    return SESSION.warm_up(GEMINI_API_ENDPOINT)
 
 
 def _extract_text_from_data(data):
@@ -270,7 +334,45 @@ def stream_response_stub(prompt: str) -> Generator[str, None, None]:
         yield sample[i : i + 80]
 
 
-def call_http_endpoint(prompt: str, timeout: float = 15.0) -> Optional[str]:
+def _prompt_to_send(prompt: str) -> str:
+    """Optionally wrap the prompt to request plain-text responses"""
+    if GEMINI_RESPONSE_MODE == "plain_text":
+        if GEMINI_PROMPT_WRAPPER:
+            return GEMINI_PROMPT_WRAPPER + "\n\n" + prompt
+        return "Respond only with the final answer in plain text. Do not include JSON, metadata, or code fences.\n\n" + prompt
+    return prompt
+
+
+def _request_for(prompt: str, google: bool):
+    """(headers, payload) for a Google generateContent or generic endpoint request"""
+    if google:
+        # Google API requires x-goog-api-key header for API key authentication
+        headers = {"Content-Type": "application/json", "x-goog-api-key": GEMINI_API_KEY}
+        # Google generateContent expects `contents: [{parts: [{text: ...}]}]`
+        return headers, {"contents": [{"parts": [{"text": _prompt_to_send(prompt)}]}]}
+    # Support custom API key header (e.g., X-goog-api-key) or default to
+    # Authorization: Bearer <key> when GEMINI_API_KEY_HEADER is not provided.
+    if GEMINI_API_KEY_HEADER:
+        headers = {GEMINI_API_KEY_HEADER: GEMINI_API_KEY, "Content-Type": "application/json"}
+    else:
+        headers = {"Authorization": f"Bearer {GEMINI_API_KEY}", "Content-Type": "application/json"}
+    return headers, {"prompt": _prompt_to_send(prompt)}
+
+
+def _record(status, seconds, response=None):
+    """Feed one response status into RATE_LIMITER and BREAKER; raise QuotaExceededError on 429"""
+    if status == 429:
+        # Rate limit - the provider's budget is spent, so the bucket is too
+        RATE_LIMITER.drain()
+        BREAKER.record_failure(seconds, trip=True, retry_after=retry_after_seconds(response))
+        raise QuotaExceededError("Gemini quota exceeded (429)")
+    if status >= 400:
+        BREAKER.record_failure(seconds)
+    else:
+        BREAKER.record_success(seconds)
+
+
+def call_http_endpoint(prompt: str, timeout=15.0) -> Optional[str]:
     """Call a configured HTTP endpoint (if set) and try to extract a text reply.
 
     The function is intentionally permissive about response shape to support
@@ -283,329 +385,296 @@ def call_http_endpoint(prompt: str, timeout: float = 15.0) -> Optional[str]:
     if not GEMINI_API_KEY:
         raise RuntimeError("GEMINI_API_KEY must be set to call GEMINI_API_ENDPOINT")
 
-    # Support custom API key header (e.g., X-goog-api-key) or default to
-    # Authorization: Bearer <key> when GEMINI_API_KEY_HEADER is not provided.
-    if GEMINI_API_KEY_HEADER:
-        headers = {GEMINI_API_KEY_HEADER: GEMINI_API_KEY, "Content-Type": "application/json"}
-    else:
-        headers = {"Authorization": f"Bearer {GEMINI_API_KEY}", "Content-Type": "application/json"}
-    # Optionally wrap the prompt to request plain-text responses
-    prompt_to_send = prompt
-    if GEMINI_RESPONSE_MODE == "plain_text":
-        if GEMINI_PROMPT_WRAPPER:
-            prompt_to_send = GEMINI_PROMPT_WRAPPER + "\n\n" + prompt
-        else:
-            prompt_to_send = "Respond only with the final answer in plain text. Do not include JSON, metadata, or code fences.\n\n" + prompt
-
-    payload = {"prompt": prompt_to_send}
+    headers, payload = _request_for(prompt, google=False)
+    timeout = throttle(RATE_LIMITER, timeout)
+    if timeout is None:
+        return None  # no token within the budget: skip rather than overrun it
+    started = time.monotonic()
     try:
-        resp = requests.post(GEMINI_API_ENDPOINT, json=payload, headers=headers, timeout=timeout)
-        try:
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            if getattr(e, 'response', None) is not None and e.response.status_code == 429:
-                raise QuotaExceededError("Gemini quota exceeded (429)") from e
-            raise
-        # Try to extract a human-friendly text from the parsed JSON or raw
-        try:
-            data = resp.json()
-        except Exception:
-            data = None
-        extracted = _extract_text_from_data(data) if data is not None else None
-        if extracted:
-            return extracted
-        # Fallback to raw text if no extraction succeeded
-        return resp.text
-    except Exception:
-        # Bubble up the error to the caller for logging/handling
+        resp = SESSION.post(GEMINI_API_ENDPOINT, json=payload, headers=headers, timeout=timeout)
+    except requests.exceptions.RequestException:
+        # Connection errors and timeouts
+        BREAKER.record_failure(time.monotonic() - started)
         raise
+    _record(resp.status_code, time.monotonic() - started, resp)
+    resp.raise_for_status()
+    # Try to extract a human-friendly text from the parsed JSON or raw
+    try:
+        data = resp.json()
+    except Exception:
+        data = None
+    extracted = _extract_text_from_data(data) if data is not None else None
+    if extracted:
+        return extracted
+    # Fallback to raw text if no extraction succeeded
+    return resp.text
 
 
-def call_google_generate(prompt: str, timeout: float = 15.0, retry_count: int = 3) -> Optional[str]:
+def call_google_generate(prompt: str, timeout=15.0) -> Optional[str]:
     """Call Google Generative Language `generateContent` endpoint.
 
     Builds the request body matching the curl example and attempts to extract
     a useful text reply from the JSON response. This function does not embed
     any key; it uses GEMINI_API_KEY and GEMINI_API_KEY_HEADER from environment.
     
-    Retries on 429 (rate limit) errors with exponential backoff.
+    A 429 opens BREAKER and raises QuotaExceededError straight away instead of
+    sleeping through retries; later requests go to Groq until a probe succeeds.
     """
     if not GEMINI_API_ENDPOINT:
         return None
     if not GEMINI_API_KEY:
         raise RuntimeError("GEMINI_API_KEY must be set to call Google endpoint")
 
-    headers = {"Content-Type": "application/json"}
-    # Google API requires x-goog-api-key header for API key authentication
-    headers["x-goog-api-key"] = GEMINI_API_KEY
+    headers, payload = _request_for(prompt, google=True)
+    timeout = throttle(RATE_LIMITER, timeout)
+    if timeout is None:
+        return None  # no token within the budget: skip rather than overrun it
+    started = time.monotonic()
+    try:
+        resp = SESSION.post(GEMINI_API_ENDPOINT, json=payload, headers=headers, timeout=timeout)
+    except Exception:
+        # Timeouts, connection errors
+        BREAKER.record_failure(time.monotonic() - started)
+        return None
+    _record(resp.status_code, time.monotonic() - started, resp)
+    if resp.status_code >= 400:
+        return None
+    try:
+        data = resp.json()
+    except ValueError:
+        return None
 
-    # Google generateContent expects `contents: [{parts: [{text: ...}]}]`
-    prompt_to_send = prompt
-    if GEMINI_RESPONSE_MODE == "plain_text":
-        if GEMINI_PROMPT_WRAPPER:
-            prompt_to_send = GEMINI_PROMPT_WRAPPER + "\n\n" + prompt
-        else:
-            prompt_to_send = "Respond only with the final answer in plain text. Do not include JSON, metadata, or code fences.\n\n" + prompt
+    extracted = _extract_text_from_data(data)
+    if extracted:
+        return extracted
+    return resp.text
 
-    payload = {"contents": [{"parts": [{"text": prompt_to_send}]}]}
+
+__all__ = ["GEMINI_API_KEY", "GEMINI_API_ENDPOINT", "ensure_key", "stream_response_stub", "call_http_endpoint"]
+
+
+def _stream_request_for(prompt: str):
+    """(headers, payload) for a streaming request to GEMINI_API_ENDPOINT"""
+    # Check if it's a Google endpoint
+    is_google = "generativelanguage.googleapis.com" in GEMINI_API_ENDPOINT
     
-    import time
-    for attempt in range(retry_count):
-        try:
-            resp = requests.post(GEMINI_API_ENDPOINT, json=payload, headers=headers, timeout=timeout)
-            resp.raise_for_status()
-            data = resp.json()
-            extracted = _extract_text_from_data(data)
-            if extracted:
-                return extracted
-            return resp.text
-        except requests.exceptions.Timeout:
-            if attempt < retry_count - 1:
-                wait_time = 2 ** attempt  # Exponential backoff: 1, 2, 4 seconds
-                time.sleep(wait_time)
-            return None
-        except requests.exceptions.HTTPError as e:
-            status = None
-            if getattr(e, 'response', None) is not None:
-                status = e.response.status_code
-            if status == 429:
-                # Rate limit - retry with backoff
-                if attempt < retry_count - 1:
-                    wait_time = 2 ** (attempt + 1)  # More aggressive backoff for rate limits: 2, 4, 8 seconds
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    # Last attempt failed - signal quota exceeded to caller
-                    raise QuotaExceededError("Gemini quota exceeded (429)") from e
-            else:
-                return None
-        except Exception as e:
-            return None
+    headers = {"Content-Type": "application/json"}
+    # Google API requires x-goog-api-key header for API key authentication
+    if is_google:
+        headers["x-goog-api-key"] = GEMINI_API_KEY
+    else:
+        headers["Authorization"] = f"Bearer {GEMINI_API_KEY}"
     
-    return None
+    # Use proper payload format for Google API
+    prompt_to_send = _prompt_to_send(prompt)
+    if is_google:
+        return headers, {"contents": [{"parts": [{"text": prompt_to_send}]}]}
+    return headers, {"prompt": prompt_to_send}
 
 
-__all__ = ["GEMINI_API_KEY", "GEMINI_API_ENDPOINT", "ensure_key", "stream_response_stub", "call_http_endpoint"]
+def _deadline(deadline):
+    """Deadline for a request: a Deadline, seconds, or None for LLM_DEADLINE_VOICE"""
+    if isinstance(deadline, Deadline):
+        return deadline
+    return Deadline(LLM_DEADLINE_VOICE if deadline is None else deadline)
 
 
-def generate_response(prompt: str) -> str:
+def generate_response(prompt: str, deadline=None) -> str:
     """Convenience blocking helper that returns a full response string.
 
-    Fallback Logic:
-    1. Attempts to call the Gemini API first.
-    2. If Gemini reports a Quota Exceeded (429) error, it immediately calls Groq.
-    3. If the Gemini endpoint is down or times out, it also attempts Groq.
-    4. Returns a friendly error only if both providers fail.
+    deadline is the total budget for the request in seconds (default
+    LLM_DEADLINE_VOICE, use LLM_DEADLINE_DOCUMENT for long texts) or a
+    Deadline shared with the caller.
+
+    Answers come from RESPONSE_CACHE when the same prompt was asked before
+    (within its TTL); successful provider answers are stored there.
     """
-    # Inject current date into prompt for accurate time-based answers
-    import datetime
+    if RESPONSE_CACHE is not None:
+        cached = RESPONSE_CACHE.get(prompt, CACHE_MODEL, CACHE_MODE)
+        if cached is not None:
+            return cached
+
+    response = _generate_uncached(prompt, _deadline(deadline))
+
+    if RESPONSE_CACHE is not None and _is_answer(response):
+        RESPONSE_CACHE.put(prompt, response, CACHE_MODEL, CACHE_MODE)
+    return response
+
+
+def _with_context(prompt: str) -> str:
+    """Prepend the current date/time (and GEMINI_PROMPT_WRAPPER) to prompt"""
     from datetime import datetime as dt
     now = dt.now()
     current_date = now.strftime("%B %d, %Y")  # e.g., "November 05, 2025"
     current_time = now.strftime("%H:%M:%S")   # e.g., "14:30:45"
     
-    # Enhanced prompt with date/time context
-    enhanced_prompt = prompt
     if GEMINI_PROMPT_WRAPPER:
         # Replace placeholder dates if they exist, or prepend date info
         wrapper = GEMINI_PROMPT_WRAPPER
         # Add current date/time to wrapper if not already there
         if "current date" not in wrapper.lower():
             wrapper = f"Today's date is {current_date} and the current time is {current_time}. " + wrapper
-        enhanced_prompt = wrapper + "\n\n" + prompt
-    else:
-        enhanced_prompt = f"Today's date is {current_date} and the current time is {current_time}. " + prompt
-    
-    # If the configured endpoint looks like Google's Generative API or the key
-    # header indicates Google, try the Google-specific caller first.
-    try_google = False
+        return wrapper + "\n\n" + prompt
+    return f"Today's date is {current_date} and the current time is {current_time}. " + prompt
+
+
+def _is_google_endpoint():
+    """True if the endpoint or key header points at Google's Generative API"""
     if GEMINI_API_ENDPOINT and "generativelanguage.googleapis.com" in GEMINI_API_ENDPOINT:
-        try_google = True
-    if GEMINI_API_KEY_HEADER and "goog" in GEMINI_API_KEY_HEADER.lower():
-        try_google = True
+        return True
+    return bool(GEMINI_API_KEY_HEADER and "goog" in GEMINI_API_KEY_HEADER.lower())
 
-    if try_google and GEMINI_API_ENDPOINT:
-        try:
-            out = call_google_generate(enhanced_prompt)
-            if out is not None:
-                return out
-        except QuotaExceededError:
-            # Gemini quota exceeded — fall back to Groq
-            try:
-                from . import groq_client
-                groq_out = groq_client.generate_response(enhanced_prompt)
-                if groq_out:
-                    return groq_out
-            except Exception:
-                pass
-        except Exception:
-            # Don't print - let it continue to fallback
-            pass
 
-    # Try generic HTTP endpoint next (real provider)
-    if GEMINI_API_ENDPOINT:
-        try:
-            out = call_http_endpoint(enhanced_prompt)
-            if out is not None:
-                return out
-        except QuotaExceededError:
-            # Quota exceeded on generic endpoint - try Groq
-            try:
-                from . import groq_client
-                groq_out = groq_client.generate_response(enhanced_prompt)
-                if groq_out:
-                    return groq_out
-            except Exception:
-                pass
-        except Exception:
-            # On any other error from the primary provider, attempt Groq fallback
-            try:
-                from . import groq_client
-                groq_out = groq_client.generate_response(enhanced_prompt)
-                if groq_out:
-                    return groq_out
-            except Exception:
-                # final fallback: continue to return generic error below
-                pass
+def _is_answer(response):
+    from . import groq_client
+    return bool(response) and response not in (BACKEND_ERROR, groq_client.BACKEND_ERROR)
 
-    # If both API calls failed/returned None, return error message instead of stub
-    # Try one last fallback to Groq if configured
-    try:
-        from . import groq_client
-        groq_out = groq_client.generate_response(enhanced_prompt)
-        if groq_out:
-            return groq_out
-    except Exception:
-        pass
 
-    return "I'm having trouble connecting to my AI backend right now. Please try again in a moment."
+def _gemini_providers():
+    if not GEMINI_API_ENDPOINT:
+        return []
+    # Google's endpoint only understands the generateContent body, so the
+    # generic {"prompt": ...} caller is not worth a second attempt there
+    if _is_google_endpoint():
+        return [Provider("gemini", call_google_generate, BREAKER)]
+    return [Provider("gemini", call_http_endpoint, BREAKER)]
+
 
+def _groq_providers():
+    from . import groq_client
+    if not (groq_client.GROQ_API_ENDPOINT and groq_client.GROQ_API_KEY):
+        return []
+    return [Provider("groq", groq_client.complete, groq_client.BREAKER)]
 
-def stream_generate(prompt: str):
+
+GEMINI_CHAIN = ProviderChain(_gemini_providers())
+GROQ_CHAIN = ProviderChain(_groq_providers())
+# Gemini first, then Groq, all within one deadline
+CHAIN = ProviderChain(GEMINI_CHAIN.providers + GROQ_CHAIN.providers)
+
+
+def _generate_uncached(prompt: str, deadline: Deadline) -> str:
+    """Ask the providers, adding the current date/time to the prompt
+
+    Fallback Logic:
+    1. Attempts to call the Gemini API first, unless its circuit is open.
+    2. If Gemini reports a Quota Exceeded (429) error, is down or times out,
+       Groq is asked once.
+    3. Returns a friendly error only if both providers fail.
+
+    Every attempt shares the deadline's budget and is skipped if it could not
+    finish in time. With LLM_HEDGE enabled (and Groq configured) a healthy
+    Gemini is instead raced against Groq as soon as it is slower than its
+    recent p95, and the first answer wins.
+    """
+    enhanced_prompt = _with_context(prompt)
+    
+    if HEDGER is not None and BREAKER.state == CLOSED and GEMINI_CHAIN.providers and GROQ_CHAIN.providers:
+        out = HEDGER.run(
+            lambda: GEMINI_CHAIN.run(enhanced_prompt, deadline, _is_answer),
+            lambda: GROQ_CHAIN.run(enhanced_prompt, deadline, _is_answer),
+            is_valid=_is_answer,
+            timeout=deadline.remaining(),
+        )
+        return out if out else BACKEND_ERROR
+    
+    out = CHAIN.run(enhanced_prompt, deadline, _is_answer)
+    return out if out else BACKEND_ERROR
+
+
+def stream_generate(prompt: str, deadline=None):
     """Generator that yields incremental text chunks.
 
     Fallback Logic:
     - If Gemini streaming fails or is rate-limited, it automatically 
       switches to Groq to fulfill the request.
+    - deadline (as for generate_response) bounds the wait for the stream
+      and any blocking fallback.
     """
-    import re
-    import json as _json
-    import datetime
-    from datetime import datetime as dt
-    
-    # Inject current date into prompt for accurate time-based answers
-    now = dt.now()
-    current_date = now.strftime("%B %d, %Y")  # e.g., "November 05, 2025"
-    current_time = now.strftime("%H:%M:%S")   # e.g., "14:30:45"
+    # A cached answer is yielded whole
+    if RESPONSE_CACHE is not None:
+        cached = RESPONSE_CACHE.get(prompt, CACHE_MODEL, CACHE_MODE)
+        if cached is not None:
+            yield cached
+            return
     
     # Enhanced prompt with date/time context
-    enhanced_prompt = prompt
-    if GEMINI_PROMPT_WRAPPER:
-        wrapper = GEMINI_PROMPT_WRAPPER
-        # Add current date/time to wrapper if not already there
-        if "current date" not in wrapper.lower():
-            wrapper = f"Today's date is {current_date} and the current time is {current_time}. " + wrapper
-        enhanced_prompt = wrapper + "\n\n" + prompt
-    else:
-        enhanced_prompt = f"Today's date is {current_date} and the current time is {current_time}. " + prompt
+    enhanced_prompt = _with_context(prompt)
+    deadline = _deadline(deadline)
     
     stream_flag = os.getenv("GEMINI_API_STREAM", "").lower() in ("1", "true", "yes")
     
-    if stream_flag and GEMINI_API_ENDPOINT and GEMINI_API_KEY:
-        # Check if it's a Google endpoint
-        is_google = "generativelanguage.googleapis.com" in GEMINI_API_ENDPOINT
-        
-        headers = {"Content-Type": "application/json"}
-        # Google API requires x-goog-api-key header for API key authentication
-        if is_google:
-            headers["x-goog-api-key"] = GEMINI_API_KEY
-        else:
-            headers["Authorization"] = f"Bearer {GEMINI_API_KEY}"
-        
-        # Use proper payload format for Google API
-        prompt_to_send = enhanced_prompt
-        if GEMINI_RESPONSE_MODE == "plain_text":
-            if GEMINI_PROMPT_WRAPPER:
-                prompt_to_send = GEMINI_PROMPT_WRAPPER + "\n\n" + enhanced_prompt
-            else:
-                prompt_to_send = "Respond only with the final answer in plain text. Do not include JSON, metadata, or code fences.\n\n" + enhanced_prompt
-
-        if is_google:
-            payload = {"contents": [{"parts": [{"text": prompt_to_send}]}]}
-        else:
-            payload = {"prompt": prompt_to_send}
+    if stream_flag and GEMINI_API_ENDPOINT and GEMINI_API_KEY and not BREAKER.allow():
+        # Gemini's circuit is open - stream from Groq without waiting on Gemini
+        try:
+            from . import groq_client
+            for chunk in groq_client.stream_generate(prompt, deadline.timeout()):
+                yield chunk
+            return
+        except Exception:
+            pass
+    elif stream_flag and GEMINI_API_ENDPOINT and GEMINI_API_KEY:
+        headers, payload = _stream_request_for(enhanced_prompt)
         
         stream_success = False
-        try:
-            with requests.post(GEMINI_API_ENDPOINT, json=payload, headers=headers, stream=True, timeout=30) as resp:
-                resp.raise_for_status()
+        streamed = []
+        # Capped so that Groq still fits in the budget if Gemini hangs; no
+        # rate-limit token within it skips straight to Groq
+        timeout = throttle(RATE_LIMITER, CHAIN.timeout_for(0, deadline))
+        if timeout is not None:
+            started = time.monotonic()
+            try:
+                with SESSION.post(GEMINI_API_ENDPOINT, json=payload, headers=headers, stream=True,
+                                  timeout=timeout) as resp:
+                    resp.raise_for_status()
                 
-                chunk_count = 0
-                for raw in resp.iter_lines(decode_unicode=True):
-                    if not raw:
-                        continue
-                    
-                    # IMPROVED: Extract "text": "..." by finding the field and then JSON-parsing it
-                    # Look for "text": followed by a colon and potential whitespace, then capture until end of field
-                    text_match = re.search(r'"text"\s*:\s*', raw)
-                    if text_match:
-                        # Start position after "text":
-                        start_pos = text_match.end()
-                        # Try to extract the JSON string value starting at this position
-                        try:
-                            # Use json.JSONDecoder to properly parse the string value
-                            decoder = _json.JSONDecoder()
-                            text_content, _ = decoder.raw_decode(raw[start_pos:])
-                            
-                            # text_content is now the properly unescaped string
-                            if text_content and isinstance(text_content, str):
-                                if text_content.strip():  # Only if non-empty
-                                    cleaned = strip_json_noise(text_content)
-                                    if cleaned and any(ch.isalnum() for ch in cleaned):
-                                        yield cleaned
-                                        chunk_count += 1
-                                        stream_success = True
-                            continue
-                        except Exception as e:
-                            # Fall through to try other parsing methods
-                            pass
-                    
-                    # Try parsing entire line as complete JSON
-                    try:
-                        part = _json.loads(raw)
-                        extracted = _extract_text_from_data(part)
-                        if extracted:
-                            cleaned = strip_json_noise(extracted)
-                            if cleaned and any(ch.isalnum() for ch in cleaned):
-                                yield cleaned
-                                chunk_count += 1
-                                stream_success = True
-                        continue
-                    except Exception:
-                        pass  # Not valid JSON, skip
+                    # Text deltas as the bytes arrive (SSE, JSON array or plain text)
+                    for text in iter_text(resp.iter_content(chunk_size=None)):
+                        streamed.append(text)
+                        yield text
+                        stream_success = True
+                    # A success only once the whole answer has arrived
+                    BREAKER.record_success(time.monotonic() - started)
                 
-                if stream_success:
-                    return  # Successfully streamed
-        except requests.exceptions.HTTPError as e:
-            try:
-                status = e.response.status_code if getattr(e, 'response', None) is not None else None
-            except Exception:
-                status = None
-            if status == 429:
-                # Quota - try streaming from Groq instead
+                    if stream_success:
+                        if RESPONSE_CACHE is not None:
+                            RESPONSE_CACHE.put(prompt, "".join(streamed), CACHE_MODEL, CACHE_MODE)
+                        return  # Successfully streamed
+            except requests.exceptions.HTTPError as e:
                 try:
-                    from . import groq_client
-                    for chunk in groq_client.stream_generate(prompt):
-                        yield chunk
-                    return
+                    status = e.response.status_code if getattr(e, 'response', None) is not None else None
                 except Exception:
-                    pass
-        except Exception as e:
-            pass
+                    status = None
+                if status == 429:
+                    RATE_LIMITER.drain()
+                    BREAKER.record_failure(time.monotonic() - started, trip=True,
+                                           retry_after=retry_after_seconds(e.response))
+                    # Quota - try streaming from Groq instead
+                    try:
+                        from . import groq_client
+                        for chunk in groq_client.stream_generate(prompt, deadline.timeout()):
+                            yield chunk
+                        return
+                    except Exception:
+                        pass
+                else:
+                    BREAKER.record_failure(time.monotonic() - started)
+            except Exception as e:
+                BREAKER.record_failure(time.monotonic() - started)
+        if streamed:
+            # A stream that broke off is not repeated (speak_stream has already
+            # spoken it), nor cached
+            return
+        from . import groq_client
+        if groq_client.GROQ_API_ENDPOINT and groq_client.GROQ_API_KEY:
+            # Gemini failed or timed out - stream from Groq with the budget kept for it
+            for chunk in groq_client.stream_generate(prompt, deadline.timeout()):
+                yield chunk
+            return
 
     # Fallback: use blocking call instead
     try:
-        response = generate_response(prompt)
+        response = generate_response(prompt, deadline)
         if response:
             yield response
             return
@@ -615,3 +684,137 @@ def stream_generate(prompt: str):
     # Last resort: inform user of API issue
     yield "I'm having trouble reaching the AI service right now. Please try again in a moment."
 
+
+async def _acall_gemini(prompt: str, timeout=15.0) -> Optional[str]:
+    """Async call_google_generate / call_http_endpoint over ASYNC_SESSION"""
+    google = _is_google_endpoint()
+    if not ASYNC_SESSION.available:
+        call = call_google_generate if google else call_http_endpoint
+        return await asyncio.to_thread(call, prompt, timeout)
+    if not GEMINI_API_KEY:
+        raise RuntimeError("GEMINI_API_KEY must be set to call GEMINI_API_ENDPOINT")
+
+    headers, payload = _request_for(prompt, google)
+    timeout = await athrottle(RATE_LIMITER, timeout)
+    if timeout is None:
+        return None
+    started = time.monotonic()
+    try:
+        resp = await ASYNC_SESSION.post(GEMINI_API_ENDPOINT, timeout, json=payload, headers=headers)
+    except Exception:
+        BREAKER.record_failure(time.monotonic() - started)
+        return None
+    _record(resp.status_code, time.monotonic() - started, resp)
+    if resp.status_code >= 400:
+        return None
+    try:
+        data = resp.json()
+    except ValueError:
+        return resp.text
+    return _extract_text_from_data(data) or resp.text
+
+
+def _async_providers():
+    from . import groq_client
+    providers = []
+    if GEMINI_API_ENDPOINT:
+        providers.append(Provider("gemini", _acall_gemini, BREAKER))
+    if groq_client.GROQ_API_ENDPOINT and groq_client.GROQ_API_KEY:
+        providers.append(Provider("groq", groq_client.acomplete, groq_client.BREAKER))
+    return providers
+
+
+ASYNC_CHAIN = ProviderChain(_async_providers())
+
+
+async def agenerate_response(prompt: str, deadline=None) -> str:
+    """Async generate_response(): same cache, circuits and deadline, no threads
+
+    Cancelling the task cancels the request in flight. Several prompts can be
+    asked at once with asyncio.gather.
+    """
+    if RESPONSE_CACHE is not None:
+        cached = RESPONSE_CACHE.get(prompt, CACHE_MODEL, CACHE_MODE)
+        if cached is not None:
+            return cached
+
+    response = await ASYNC_CHAIN.arun(_with_context(prompt), _deadline(deadline), _is_answer)
+    if not response:
+        return BACKEND_ERROR
+    if RESPONSE_CACHE is not None:
+        RESPONSE_CACHE.put(prompt, response, CACHE_MODEL, CACHE_MODE)
+    return response
+
+
+async def astream_generate(prompt: str, deadline=None):
+    """Async stream_generate(): yields text chunks as they arrive"""
+    from . import groq_client
+    
+    if not ASYNC_SESSION.available:
+        async for chunk in iterate_in_thread(stream_generate(prompt, deadline)):
+            yield chunk
+        return
+    
+    if RESPONSE_CACHE is not None:
+        cached = RESPONSE_CACHE.get(prompt, CACHE_MODEL, CACHE_MODE)
+        if cached is not None:
+            yield cached
+            return
+    
+    deadline = _deadline(deadline)
+    stream_flag = os.getenv("GEMINI_API_STREAM", "").lower() in ("1", "true", "yes")
+    
+    if stream_flag and GEMINI_API_ENDPOINT and GEMINI_API_KEY:
+        quota = not BREAKER.allow()
+        streamed = []
+        finished = False
+        if not quota:
+            # Capped so that Groq still fits in the budget if Gemini hangs; no
+            # rate-limit token within it counts as rate-limited
+            timeout = await athrottle(RATE_LIMITER, CHAIN.timeout_for(0, deadline))
+            quota = timeout is None
+        if not quota:
+            headers, payload = _stream_request_for(_with_context(prompt))
+            started = time.monotonic()
+            try:
+                async with ASYNC_SESSION.stream(GEMINI_API_ENDPOINT, timeout,
+                                                json=payload, headers=headers) as resp:
+                    if resp.status_code >= 400:
+                        try:
+                            _record(resp.status_code, time.monotonic() - started, resp)
+                        except QuotaExceededError:
+                            quota = True
+                    else:
+                        parser = StreamParser()
+                        async for raw in resp.aiter_bytes():
+                            for text in parser.feed(raw):
+                                streamed.append(text)
+                                yield text
+                            if parser.done:
+                                break
+                        for text in parser.close():
+                            streamed.append(text)
+                            yield text
+                        finished = True
+                        BREAKER.record_success(time.monotonic() - started)
+            except Exception:
+                BREAKER.record_failure(time.monotonic() - started)
+        if quota:
+            # Rate-limited or circuit open - stream from Groq instead
+            async for chunk in groq_client.astream_generate(prompt, deadline.timeout()):
+                yield chunk
+            return
+        if streamed:
+            # A stream that broke off is not repeated, nor cached
+            if finished and RESPONSE_CACHE is not None:
+                RESPONSE_CACHE.put(prompt, "".join(streamed), CACHE_MODEL, CACHE_MODE)
+            return
+        if groq_client.GROQ_API_ENDPOINT and groq_client.GROQ_API_KEY:
+            # Gemini failed or timed out - stream from Groq with the budget kept for it
+            async for chunk in groq_client.astream_generate(prompt, deadline.timeout()):
+                yield chunk
+            return
+    
+    # Fallback: the whole answer at once
+    yield await agenerate_response(prompt, deadline)
+
@@ -7,18 +7,51 @@ hits rate limits (QuotaExceeded) or encounter errors.
 
 It implements the same interface (`generate_response` and `stream_generate`)
 as the Gemini client, making them drop-in replacements for each other.
+stream_generate streams real token deltas from the OpenAI-compatible
+chat/completions endpoint, so a Gemini fallback still speaks incrementally.
 """
+import asyncio
 import os
+import time
 from typing import Optional, Generator
-import requests
 import json
 
+from .async_http import AsyncSession, athrottle, iterate_in_thread
+from .circuit_breaker import CircuitBreaker, retry_after_seconds
+from .http_pool import PooledSession
+from .rate_limit import TokenBucket, throttle
+from .stream_parser import StreamParser, iter_text
+
 # Read config from environment
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_API_ENDPOINT = os.getenv("GROQ_API_ENDPOINT")
 GROQ_RESPONSE_MODE = os.getenv("GROQ_RESPONSE_MODE", "").lower()
 # Optional default model to use for OpenAI-compatible Groq endpoints
 GROQ_MODEL = os.getenv("GROQ_MODEL", "Ilama-3.1-8b-instant")
+# Client-side rate limit (requests per minute, 0 disables) and burst size
+GROQ_RATE_LIMIT_RPM = float(os.getenv("GROQ_RATE_LIMIT_RPM", "30"))
+GROQ_RATE_LIMIT_BURST = int(os.getenv("GROQ_RATE_LIMIT_BURST", "5"))
+
+# Returned when Groq could not answer
+BACKEND_ERROR = "I'm having trouble connecting to the groq.ai backend right now."
+# Yielded by the streaming functions when Groq could not answer
+STREAM_ERROR = "I'm having trouble reaching the groq.ai service right now."
+
+# Every Groq HTTP request takes a token; callers only wait once the budget is spent
+RATE_LIMITER = TokenBucket(GROQ_RATE_LIMIT_RPM, GROQ_RATE_LIMIT_BURST)
+
+# Keep-alive connection pool, so a fallback does not pay for a fresh handshake
+SESSION = PooledSession()
+# The same for the async API (one pool per event loop)
+ASYNC_SESSION = AsyncSession()
+
+# While open, Groq is not called at all (the caller gets BACKEND_ERROR at once)
+BREAKER = CircuitBreaker("groq")
+
+
+def warm_up():
+    """Open the Groq connection in the background so a fallback skips the handshake"""
+    return SESSION.warm_up(GROQ_API_ENDPOINT)
 
 
 def _extract_text_from_data(data):
@@ -97,19 +130,8 @@ def normalize_response(raw):
     return str(raw)
 
 
-def call_http_endpoint(prompt: str, timeout: float = 15.0) -> Optional[str]:
-    """Call configured Groq HTTP endpoint and return extracted text or raise.
-
-    This helper supports both a full `/responses` URL in `GROQ_API_ENDPOINT`
-    or a base OpenAI-compatible URL like `https://api.groq.com/openai/v1`.
-    In the latter case it will POST to `<GROQ_API_ENDPOINT>/responses` with
-    an OpenAI-compatible payload `{model, input}`.
-    """
-    if not GROQ_API_ENDPOINT:
-        return None
-    if not GROQ_API_KEY:
-        raise RuntimeError("GROQ_API_KEY is not set.")
-
+def _request_for(prompt: str):
+    """(url, headers, payload) for one Groq request"""
     headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
 
     # If using the standard OpenAI-compatible completions endpoint
@@ -130,88 +152,271 @@ def call_http_endpoint(prompt: str, timeout: float = 15.0) -> Optional[str]:
             "model": GROQ_MODEL,
             "messages": [{"role": "user", "content": prompt}]
         }
+    return url, headers, payload
+
+
+def _extract_reply(data):
+    """Text from a parsed Groq / OpenAI-compatible response body, or None"""
+    if data is None:
+        return None
+    # 1) Standard OpenAI Chat Completions: choices -> [0] -> message -> content
+    if isinstance(data, dict) and 'choices' in data and isinstance(data['choices'], list) and data['choices']:
+        choice = data['choices'][0]
+        if isinstance(choice, dict):
+            msg = choice.get('message') or {}
+            if isinstance(msg, dict) and 'content' in msg and isinstance(msg['content'], str):
+                return msg['content'].strip()
+            # Fallback for old completions API
+            if 'text' in choice and isinstance(choice['text'], str):
+                return choice['text'].strip()
+
+    # 2) SDK-like: response.output_text
+    if isinstance(data, dict) and 'output_text' in data and isinstance(data['output_text'], str):
+        return data['output_text'].strip()
+
+    # 3) Other potential formats (Gemini-like output structure?)
+    if isinstance(data, dict) and 'output' in data and isinstance(data['output'], list) and data['output']:
+        o0 = data['output'][0]
+        if isinstance(o0, dict) and 'content' in o0 and isinstance(o0['content'], list) and o0['content']:
+            c0 = o0['content'][0]
+            if isinstance(c0, dict) and 'text' in c0 and isinstance(c0['text'], str):
+                return c0['text'].strip()
 
+    # Fallback: try a permissive extraction
+    return _extract_text_from_data(data)
+
+
+def _record(status, seconds, response=None):
+    """Feed one response status into RATE_LIMITER and BREAKER"""
+    if status == 429:
+        RATE_LIMITER.drain()
+        BREAKER.record_failure(seconds, trip=True, retry_after=retry_after_seconds(response))
+    elif status >= 400:
+        BREAKER.record_failure(seconds)
+    else:
+        BREAKER.record_success(seconds)
+
+
+def call_http_endpoint(prompt: str, timeout=15.0) -> Optional[str]:
+    """Call configured Groq HTTP endpoint and return extracted text or raise.
+
+    This helper supports both a full `/responses` URL in `GROQ_API_ENDPOINT`
+    or a base OpenAI-compatible URL like `https://api.groq.com/openai/v1`.
+    In the latter case it will POST to `<GROQ_API_ENDPOINT>/responses` with
+    an OpenAI-compatible payload `{model, input}`.
+    """
+    if not GROQ_API_ENDPOINT:
+        return None
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY is not set.")
+
+    url, headers, payload = _request_for(prompt)
+
+    timeout = throttle(RATE_LIMITER, timeout)
+    if timeout is None:
+        return None  # no token within the budget: skip rather than overrun it
+    started = time.monotonic()
     try:
-        resp = requests.post(url, json=payload, headers=headers, timeout=timeout)
-        status = resp.status_code
-        text = resp.text
-        # Attempt to parse JSON body when possible
+        resp = SESSION.post(url, json=payload, headers=headers, timeout=timeout)
+    except Exception:
+        BREAKER.record_failure(time.monotonic() - started)
+        raise
+    _record(resp.status_code, time.monotonic() - started, resp)
+    text = resp.text
+    # Attempt to parse JSON body when possible
+    try:
+        data = resp.json()
+    except Exception:
+        data = None
+
+    # Raise on HTTP errors to let caller decide fallback behaviour
+    resp.raise_for_status()
+
+    # Try to extract common response shapes used by Groq / OpenAI-compatible APIs
+    extracted = _extract_reply(data)
+    if extracted:
+        return extracted
+
+    return text
+
+
+def _prompt_to_send(prompt: str) -> str:
+    # Optionally wrap prompt to request plain text
+    if GROQ_RESPONSE_MODE == "plain_text":
+        return "Respond only with the final answer in plain text. Do not include JSON, metadata, or code fences.\n\n" + prompt
+    return prompt
+
+
+def complete(prompt: str, timeout=15.0) -> Optional[str]:
+    """One Groq request without the circuit check (ProviderChain does that); None if unconfigured"""
+    if not GROQ_API_ENDPOINT:
+        return None
+    out = call_http_endpoint(_prompt_to_send(prompt), timeout=timeout)
+    return normalize_response(out) if out is not None else None
+
+
+def generate_response(prompt: str, timeout=15.0) -> str:
+    """Blocking call returning best-effort text from Groq endpoint."""
+    if GROQ_API_ENDPOINT and BREAKER.allow():
         try:
-            data = resp.json()
+            out = complete(prompt, timeout)
+            if out is not None:
+                return out
         except Exception:
-            data = None
+            pass
 
-        # Raise on HTTP errors to let caller decide fallback behaviour
+    return BACKEND_ERROR
 
-        # Raise on HTTP errors to let caller decide fallback behaviour
+
+def _stream_request_for(prompt: str):
+    """(url, headers, payload) for a streamed chat/completions request, or None
+
+    Only the OpenAI-compatible chat/completions API streams; a `/responses`
+    endpoint is answered in one piece.
+    """
+    url, headers, payload = _request_for(_prompt_to_send(prompt))
+    if "messages" not in payload:
+        return None
+    payload["stream"] = True
+    headers["Accept"] = "text/event-stream"
+    return url, headers, payload
+
+
+def stream_generate(prompt: str, timeout=15.0) -> Generator[str, None, None]:
+    """Yield the answer's text deltas as Groq generates them (chat/completions, stream: true)
+
+    A stream that breaks off after some text has been yielded just ends; the
+    partial answer is not repeated.
+    """
+    request = _stream_request_for(prompt) if GROQ_API_ENDPOINT and GROQ_API_KEY else None
+    if request is None:
+        # Nothing to stream from: the blocking answer in one piece
         try:
-            resp.raise_for_status()
+            resp = generate_response(prompt, timeout)
+            if resp:
+                yield resp
+                return
         except Exception:
-            raise
-
-        # Try to extract common response shapes used by Groq / OpenAI-compatible APIs
-        if data is not None:
-             # 1) Standard OpenAI Chat Completions: choices -> [0] -> message -> content
-            if isinstance(data, dict) and 'choices' in data and isinstance(data['choices'], list) and data['choices']:
-                choice = data['choices'][0]
-                if isinstance(choice, dict):
-                    msg = choice.get('message') or {}
-                    if isinstance(msg, dict) and 'content' in msg and isinstance(msg['content'], str):
-                        return msg['content'].strip()
-                    # Fallback for old completions API
-                    if 'text' in choice and isinstance(choice['text'], str):
-                        return choice['text'].strip()
-
-            # 2) SDK-like: response.output_text
-            if isinstance(data, dict) and 'output_text' in data and isinstance(data['output_text'], str):
-                return data['output_text'].strip()
-
-            # 3) Other potential formats (Gemini-like output structure?)
-            if isinstance(data, dict) and 'output' in data and isinstance(data['output'], list) and data['output']:
-                o0 = data['output'][0]
-                if isinstance(o0, dict) and 'content' in o0 and isinstance(o0['content'], list) and o0['content']:
-                    c0 = o0['content'][0]
-                    if isinstance(c0, dict) and 'text' in c0 and isinstance(c0['text'], str):
-                        return c0['text'].strip()
-
-        # Fallback: try a permissive extraction
-        extracted = _extract_text_from_data(data) if data is not None else None
-        if extracted:
-            return extracted
-
-        return text
+            pass
+        yield STREAM_ERROR
+        return
+
+    if not BREAKER.allow():
+        yield STREAM_ERROR
+        return
+
+    url, headers, payload = request
+    streamed = False
+    timeout = throttle(RATE_LIMITER, timeout)
+    if timeout is None:
+        yield STREAM_ERROR
+        return
+    started = time.monotonic()
+    try:
+        with SESSION.post(url, json=payload, headers=headers, stream=True, timeout=timeout) as resp:
+            if resp.status_code >= 400:
+                _record(resp.status_code, time.monotonic() - started, resp)
+            else:
+                for text in iter_text(resp.iter_content(chunk_size=None)):
+                    streamed = True
+                    yield text
+                # A success only once the whole answer has arrived
+                BREAKER.record_success(time.monotonic() - started)
     except Exception:
+        BREAKER.record_failure(time.monotonic() - started)
+    if not streamed:
+        yield STREAM_ERROR
+
+
+async def acall_http_endpoint(prompt: str, timeout=15.0) -> Optional[str]:
+    """Async call_http_endpoint over ASYNC_SESSION (a worker thread without httpx)"""
+    if not GROQ_API_ENDPOINT:
+        return None
+    if not ASYNC_SESSION.available:
+        return await asyncio.to_thread(call_http_endpoint, prompt, timeout)
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY is not set.")
+
+    url, headers, payload = _request_for(prompt)
+    timeout = await athrottle(RATE_LIMITER, timeout)
+    if timeout is None:
+        return None
+    started = time.monotonic()
+    try:
+        resp = await ASYNC_SESSION.post(url, timeout, json=payload, headers=headers)
+    except Exception:
+        BREAKER.record_failure(time.monotonic() - started)
         raise
+    _record(resp.status_code, time.monotonic() - started, resp)
+    resp.raise_for_status()
+    try:
+        data = resp.json()
+    except ValueError:
+        data = None
+    return _extract_reply(data) or resp.text
 
 
-def generate_response(prompt: str) -> str:
-    """Blocking call returning best-effort text from Groq endpoint."""
-    # Optionally wrap prompt to request plain text
-    prompt_to_send = prompt
-    if GROQ_RESPONSE_MODE == "plain_text":
-        prompt_to_send = "Respond only with the final answer in plain text. Do not include JSON, metadata, or code fences.\n\n" + prompt
+async def acomplete(prompt: str, timeout=15.0) -> Optional[str]:
+    """Async complete()"""
+    if not GROQ_API_ENDPOINT:
+        return None
+    out = await acall_http_endpoint(_prompt_to_send(prompt), timeout=timeout)
+    return normalize_response(out) if out is not None else None
+
 
-    if GROQ_API_ENDPOINT:
+async def agenerate_response(prompt: str, timeout=15.0) -> str:
+    """Async generate_response(); cancelling the task cancels the request"""
+    if GROQ_API_ENDPOINT and BREAKER.allow():
         try:
-            out = call_http_endpoint(prompt_to_send)
+            out = await acomplete(prompt, timeout)
             if out is not None:
-                return normalize_response(out)
+                return out
         except Exception:
             pass
 
-    return "I'm having trouble connecting to the groq.ai backend right now."
+    return BACKEND_ERROR
+
+
+async def astream_generate(prompt: str, timeout=15.0):
+    """Async stream_generate()"""
+    request = _stream_request_for(prompt) if GROQ_API_ENDPOINT and GROQ_API_KEY else None
+    if not ASYNC_SESSION.available or request is None:
+        async for chunk in iterate_in_thread(stream_generate(prompt, timeout)):
+            yield chunk
+        return
 
+    if not BREAKER.allow():
+        yield STREAM_ERROR
+        return
 
-def stream_generate(prompt: str) -> Generator[str, None, None]:
-    """Simple streaming wrapper — Groq fallback yields a single final response."""
+    url, headers, payload = request
+    streamed = False
+    timeout = await athrottle(RATE_LIMITER, timeout)
+    if timeout is None:
+        yield STREAM_ERROR
+        return
+    started = time.monotonic()
     try:
-        resp = generate_response(prompt)
-        if resp:
-            yield resp
-            return
+        async with ASYNC_SESSION.stream(url, timeout, json=payload, headers=headers) as resp:
+            if resp.status_code >= 400:
+                _record(resp.status_code, time.monotonic() - started, resp)
+            else:
+                parser = StreamParser()
+                async for raw in resp.aiter_bytes():
+                    for text in parser.feed(raw):
+                        streamed = True
+                        yield text
+                    if parser.done:
+                        break
+                for text in parser.close():
+                    streamed = True
+                    yield text
+                BREAKER.record_success(time.monotonic() - started)
     except Exception:
-        pass
-    yield "I'm having trouble reaching the groq.ai service right now."
+        BREAKER.record_failure(time.monotonic() - started)
+    if not streamed:
+        yield STREAM_ERROR
 
 
-__all__ = ["GROQ_API_KEY", "GROQ_API_ENDPOINT", "generate_response", "stream_generate"]
+__all__ = ["GROQ_API_KEY", "GROQ_API_ENDPOINT", "complete", "generate_response", "stream_generate",
+           "acomplete", "agenerate_response", "astream_generate"]
@@ -0,0 +1,165 @@
+"""Hedged requests across two providers
+
+The primary provider is called first. If it has not answered within the
+hedge delay, the same prompt is sent to the backup as well and whichever
+valid answer arrives first is used. The loser is cancelled if it has not
+started yet and otherwise abandoned: its result is ignored, but its
+latency still feeds the statistics.
+
+The hedge delay is the primary's recent p95 latency (configurable quantile),
+clamped to [min_delay, max_delay]. Until enough samples exist default_delay
+is used. For a non-streaming generateContent call the first byte arrives
+with the whole answer, so the primary's response time is the first-byte
+time.
+
+Per-provider counters: requests, wins, errors and abandoned, plus how many
+calls were hedged.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class LatencyWindow:
+    """Sliding window of recent latencies (seconds)"""
+
+    def __init__(self, size=50):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, q):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(q / 100.0 * (len(samples) - 1))))]
+
+
+class HedgedRequest:
+    """Runs primary_fn, hedging with backup_fn once the primary is slower than usual"""
+
+    def __init__(self, primary="gemini", backup="groq", quantile=95, min_delay=1.0, max_delay=8.0,
+                 default_delay=4.0, min_samples=5, max_workers=4):
+        self.names = (primary, backup)
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.latency = LatencyWindow()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedged-llm")
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self._counters = {name: {"requests": 0, "wins": 0, "errors": 0, "abandoned": 0} for name in self.names}
+
+    def delay(self):
+        """Seconds to wait for the primary before hedging"""
+        if len(self.latency) < self.min_samples:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, self.latency.percentile(self.quantile)))
+
+    def _count(self, name, key):
+        with self._lock:
+            self._counters[name][key] += 1
+
+    def _submit(self, name, fn, is_valid):
+        self._count(name, "requests")
+        started = time.monotonic()
+
+        def _call():
+            try:
+                result = fn()
+            except Exception:
+                result = None
+            if name == self.names[0]:
+                self.latency.add(time.monotonic() - started)
+            if not is_valid(result):
+                self._count(name, "errors")
+                return None
+            return result
+
+        return self._executor.submit(_call)
+
+    def run(self, primary_fn, backup_fn, is_valid=bool, timeout=None):
+        """Return the first valid answer (or None if neither provider produced one)
+
+        timeout bounds the whole call; whatever is still running then is abandoned.
+        """
+        primary, backup = self.names
+        give_up = None if timeout is None else time.monotonic() + timeout
+
+        def _left():
+            return None if give_up is None else max(0.0, give_up - time.monotonic())
+
+        with self._lock:
+            self.calls += 1
+        first = self._submit(primary, primary_fn, is_valid)
+        delay = self.delay() if give_up is None else min(self.delay(), _left())
+        done, _ = wait([first], timeout=delay)
+        if done:
+            result = first.result()
+            if result is not None:
+                self._count(primary, "wins")
+                return result
+            # The primary failed fast - the backup is a plain fallback, not a hedge
+            second = self._submit(backup, backup_fn, is_valid)
+            done, _ = wait([second], timeout=_left())
+            if not done:
+                self._abandon({second: backup})
+                return None
+            result = second.result()
+            if result is not None:
+                self._count(backup, "wins")
+            return result
+        if give_up is not None and _left() <= 0:
+            self._abandon({first: primary})
+            return None
+
+        with self._lock:
+            self.hedged += 1
+        second = self._submit(backup, backup_fn, is_valid)
+        pending = {first: primary, second: backup}
+        while pending:
+            done, _ = wait(list(pending), timeout=_left(), return_when=FIRST_COMPLETED)
+            if not done:
+                self._abandon(pending)
+                return None
+            for future in done:
+                name = pending.pop(future)
+                result = future.result()
+                if result is not None:
+                    self._count(name, "wins")
+                    self._abandon(pending)
+                    return result
+        return None
+
+    def _abandon(self, pending):
+        for future, name in pending.items():
+            future.cancel()
+            self._count(name, "abandoned")
+
+    def stats(self):
+        """Return hedge rate, current delay and per-provider counters"""
+        with self._lock:
+            stats = {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_rate": (self.hedged / self.calls) if self.calls else 0.0,
+                "delay_s": round(self.delay(), 3),
+            }
+            for name, counters in self._counters.items():
+                stats[name] = dict(counters)
+            return stats
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
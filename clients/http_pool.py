@@ -0,0 +1,127 @@
+"""Long-lived HTTP sessions for the AI provider clients
+
+Every client owns one PooledSession: a requests.Session with a sized
+keep-alive connection pool, so consecutive LLM turns (and the Groq fallback)
+reuse an open TCP+TLS connection instead of handshaking each time.
+
+warm_up(url) opens the connection in the background (main.py does this while
+the greeting is spoken). Providers close idle connections after a while, so
+the session re-warms every HTTP_REWARM_SECONDS of inactivity for as long as
+the assistant has been used within the last HTTP_KEEPALIVE_MAX_IDLE seconds.
+Warm-up requests are HEAD requests to the host root: they cost no quota and
+never take a rate-limit token.
+"""
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connections kept open per host (concurrent requests beyond this still work,
+# they just are not pooled)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "4"))
+# Re-warm after this many idle seconds (0 disables re-warming)
+HTTP_REWARM_SECONDS = float(os.getenv("HTTP_REWARM_SECONDS", "45"))
+# Stop re-warming when the assistant has not made a real request for this long
+HTTP_KEEPALIVE_MAX_IDLE = float(os.getenv("HTTP_KEEPALIVE_MAX_IDLE", "600"))
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+class PooledSession:
+    """requests.Session with a sized keep-alive pool that can warm itself up"""
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, rewarm_seconds=HTTP_REWARM_SECONDS,
+                 max_idle=HTTP_KEEPALIVE_MAX_IDLE):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(1, int(pool_size)))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.rewarm_seconds = rewarm_seconds
+        self.max_idle = max_idle
+
+        self._lock = threading.Lock()
+        self._origins = set()
+        self._last_activity = time.monotonic()  # any traffic, warm-ups included
+        self._last_used = self._last_activity   # real requests only
+        self._keeper = None
+        self._closed = threading.Event()
+        self.requests = 0
+        self.warmups = 0
+        self.warm_failures = 0
+        self.last_warm_ms = None
+
+    def post(self, url, **kwargs):
+        """requests.post over the pooled connection"""
+        with self._lock:
+            self.requests += 1
+            self._last_activity = self._last_used = time.monotonic()
+        try:
+            return self.session.post(url, **kwargs)
+        finally:
+            self._last_activity = time.monotonic()
+
+    def warm(self, url, timeout=5.0):
+        """Open (or refresh) the pooled connection to url's host; returns True on success"""
+        started = time.monotonic()
+        try:
+            self.session.head(_origin(url), timeout=timeout, allow_redirects=False)
+        except requests.RequestException:
+            with self._lock:
+                self.warm_failures += 1
+            return False
+        finished = time.monotonic()
+        with self._lock:
+            self.warmups += 1
+            self.last_warm_ms = round((finished - started) * 1000, 1)
+            self._last_activity = finished
+        return True
+
+    def warm_up(self, url):
+        """Warm the connection to url in the background and keep it warm while in use"""
+        if not url:
+            return None
+        with self._lock:
+            self._origins.add(_origin(url))
+            if self.rewarm_seconds > 0 and self._keeper is None:
+                self._keeper = threading.Thread(target=self._keep_warm, daemon=True, name="http-keepalive")
+                self._keeper.start()
+        thread = threading.Thread(target=self.warm, args=(url,), daemon=True, name="http-warmup")
+        thread.start()
+        return thread
+
+    def _keep_warm(self):
+        wait = self.rewarm_seconds
+        while not self._closed.wait(wait):
+            now = time.monotonic()
+            idle = now - self._last_activity
+            if idle < self.rewarm_seconds:
+                wait = self.rewarm_seconds - idle
+                continue
+            wait = self.rewarm_seconds
+            if now - self._last_used > self.max_idle:
+                # Nobody is talking to the assistant; let the connection go
+                continue
+            with self._lock:
+                origins = list(self._origins)
+            for origin in origins:
+                self.warm(origin)
+
+    def stats(self):
+        """Return request/warm-up counters"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "warmups": self.warmups,
+                "warm_failures": self.warm_failures,
+                "last_warm_ms": self.last_warm_ms,
+            }
+
+    def close(self):
+        self._closed.set()
+        self.session.close()
@@ -0,0 +1,160 @@
+"""Provider chain with a per-request deadline budget
+
+A request gets one total deadline (e.g. 6 s for a spoken answer, 60 s for a
+document), instead of every attempt having its own 15 s timeout. The
+providers are tried in order. Each attempt gets the remaining budget as its
+(connect, read) timeout, capped at the provider's own maximum.
+
+An attempt is never started if it cannot finish in time. It is skipped when
+less time is left than the provider's min_seconds. A fallback attempt (one
+after an attempt that already ran) is also skipped when less time is left
+than the provider's recent median latency, as tracked by its circuit breaker.
+The first attempt always gets its chance, so a slow provider is not starved
+of the samples that would show it recovering. Attempts are also skipped
+while their breaker is open.
+
+An attempt with fallbacks after it is cut short so that they stay in the
+budget: it gets the remaining time minus what the most demanding fallback
+needs to be admitted (plus FALLBACK_MARGIN). A hung Gemini no longer eats
+the whole voice deadline and leaves Groq skipped.
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+from .circuit_breaker import OPEN
+
+# Connect timeout for every attempt (the read timeout is whatever budget is left)
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "3.05"))
+# Extra budget kept for a fallback: a timed-out attempt returns a little late
+FALLBACK_MARGIN = 0.25
+
+
+class Deadline:
+    """Absolute point in time a request has to be answered by"""
+
+    def __init__(self, seconds):
+        self.seconds = float(seconds)
+        self.expires = time.monotonic() + self.seconds
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self, cap=None):
+        """(connect, read) timeout for an attempt that must end by the deadline"""
+        read = self.remaining()
+        if cap is not None:
+            read = min(read, cap)
+        return (min(LLM_CONNECT_TIMEOUT, read), read)
+
+
+class Provider(NamedTuple):
+    """One attempt in a chain"""
+    name: str
+    call: Callable            # call(prompt, timeout) -> text or None; may raise
+    breaker: Optional[object] = None  # CircuitBreaker gating this attempt
+    min_seconds: float = 0.5  # do not start with less budget than this
+    max_seconds: Optional[float] = None  # per-attempt cap, whatever the budget
+
+
+class ProviderChain:
+    """Tries providers in order within one Deadline"""
+
+    def __init__(self, providers):
+        self.providers = list(providers)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.attempts = 0
+        self.skipped_open = 0
+        self.skipped_deadline = 0
+        self.exhausted = 0
+
+    def _count(self, key):
+        with self._lock:
+            setattr(self, key, getattr(self, key) + 1)
+
+    def _needed(self, provider, fallback):
+        needed = provider.min_seconds
+        if fallback and provider.breaker is not None:
+            typical = provider.breaker.latency.percentile(50)
+            if typical is not None:
+                needed = max(needed, typical)
+        return needed
+
+    def _reserve(self, index):
+        """Budget to keep for the providers after providers[index] (0 if there are none)"""
+        needs = [self._needed(p, True) for p in self.providers[index + 1:]
+                 if p.breaker is None or p.breaker.state != OPEN]
+        return max(needs) + FALLBACK_MARGIN if needs else 0.0
+
+    def timeout_for(self, index, deadline):
+        """(connect, read) timeout for an attempt on providers[index] within deadline"""
+        provider = self.providers[index]
+        cap = provider.max_seconds
+        reserve = self._reserve(index)
+        if reserve:
+            share = max(provider.min_seconds, deadline.remaining() - reserve)
+            cap = share if cap is None else min(cap, share)
+        return deadline.timeout(cap)
+
+    def _admit(self, provider, deadline, attempted):
+        """True if provider may be attempted now (counts the skip otherwise)"""
+        if deadline.remaining() < self._needed(provider, attempted):
+            self._count("skipped_deadline")
+            return False
+        if provider.breaker is not None and not provider.breaker.allow():
+            self._count("skipped_open")
+            return False
+        self._count("attempts")
+        return True
+
+    def run(self, prompt, deadline, is_valid=bool):
+        """Return the first valid answer, or None if every attempt failed or was skipped"""
+        self._count("requests")
+        attempted = False
+        for index, provider in enumerate(self.providers):
+            if not self._admit(provider, deadline, attempted):
+                continue
+            attempted = True
+            try:
+                out = provider.call(prompt, self.timeout_for(index, deadline))
+            except Exception:
+                out = None
+            if is_valid(out):
+                return out
+        self._count("exhausted")
+        return None
+
+    async def arun(self, prompt, deadline, is_valid=bool):
+        """run() for coroutine providers; an attempt still running at the deadline is cancelled"""
+        self._count("requests")
+        attempted = False
+        for index, provider in enumerate(self.providers):
+            if not self._admit(provider, deadline, attempted):
+                continue
+            attempted = True
+            try:
+                timeout = self.timeout_for(index, deadline)
+                out = await asyncio.wait_for(provider.call(prompt, timeout),
+                                             min(deadline.remaining(), timeout[1] + FALLBACK_MARGIN / 2))
+            except Exception:
+                out = None
+            if is_valid(out):
+                return out
+        self._count("exhausted")
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "attempts": self.attempts,
+                "skipped_open": self.skipped_open,
+                "skipped_deadline": self.skipped_deadline,
+                "exhausted": self.exhausted,
+            }
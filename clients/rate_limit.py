@@ -0,0 +1,92 @@
+"""Token-bucket rate limiting for the AI provider clients
+
+Each provider gets one bucket that refills at its requests-per-minute limit
+and holds at most `burst` tokens. A request takes one token; callers only
+wait when the bucket is empty, so normal conversational use never sleeps.
+throttle() bounds that wait by the request's own timeout, so a busy bucket
+skips the request instead of overrunning the caller's deadline.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket (rate in requests per minute)"""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = max(0.0, float(rate_per_minute)) / 60.0  # tokens per second
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Take one token, sleeping only while the bucket is empty
+
+        A rate of 0 disables limiting. Returns False if no token became
+        available within timeout seconds.
+        """
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    if waited:
+                        self.waits += 1
+                        self.waited_seconds += waited
+                    return True
+                delay = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(delay)
+            waited += delay
+
+    def drain(self):
+        """Empty the bucket, e.g. after the provider answered HTTP 429"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = 0.0
+
+
+def shorten(timeout, seconds):
+    """A requests-style timeout (seconds or (connect, read)) with seconds taken
+    off the read part; None if nothing is left"""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        read -= seconds
+        return (min(connect, read), read) if read > 0 else None
+    timeout -= seconds
+    return timeout if timeout > 0 else None
+
+
+def read_seconds(timeout):
+    """The read part of a requests-style timeout"""
+    return timeout[1] if isinstance(timeout, tuple) else timeout
+
+
+def throttle(limiter, timeout):
+    """Take a token from limiter, waiting at most timeout's read budget
+
+    Returns timeout less the time spent waiting, or None if no token came in
+    time (the request should be skipped).
+    """
+    started = time.monotonic()
+    if not limiter.acquire(timeout=read_seconds(timeout)):
+        return None
+    return shorten(timeout, time.monotonic() - started)
@@ -0,0 +1,199 @@
+"""Persistent cache for LLM responses
+
+Keys are built from the normalized user prompt plus the model and response
+mode. The volatile "today's date is ... current time is ..." context that the
+clients add to every request is not part of the key, otherwise no two
+prompts would ever match.
+
+How long an answer stays valid depends on the question:
+- creative requests (jokes, stories, poems, ...) are never cached, so asking
+  again gives a new answer
+- clock questions ("what time is it in tokyo") are never cached either
+- time-sensitive questions (today, now, latest, weather, score, ...) expire
+  after a short TTL
+- questions whose answer depends on the date ("what year is it", "how old is
+  ...", "how many days until christmas") expire at the next local midnight
+- everything else expires after a long TTL
+
+Two tiers: an in-memory LRU in front of an SQLite file that survives
+restarts. A disk hit is promoted into memory. Hit/miss counters per tier are
+available from stats().
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# Requests where a repeated answer would be wrong or boring
+CREATIVE_RE = re.compile(
+    r"\b(write|compose|joke|jokes|story|poem|poems|song|lyrics|essay|random|surprise|riddle|rap)\b"
+)
+# Questions whose answer changes within minutes or hours
+TIME_SENSITIVE_RE = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|now|current|currently|latest|recent|news|live|"
+    r"weather|temperature|forecast|score|scores|price|prices|stock|stocks|rate|time|date|"
+    r"this (?:week|month|year)|right now)\b"
+)
+# The current time of day: stale after seconds
+CLOCK_RE = re.compile(
+    r"\b(what time|what's the time|whats the time|time is it|the time in|time now|current time|local time|clock)\b"
+)
+# Answers that hold until the date changes
+DATE_SENSITIVE_RE = re.compile(
+    r"\b(day|days|week|weeks|weekend|month|months|year|years|until|till|how long|how old|age|aged|"
+    r"birthday|leap|christmas|holiday|holidays|anniversary|ago)\b"
+)
+
+_SPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.]+$")
+
+
+def normalize_prompt(prompt):
+    """Lowercase, collapse whitespace and drop trailing ?/!/. so trivial variants share a key"""
+    text = _SPACE_RE.sub(" ", str(prompt).strip().lower())
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+def _until_midnight():
+    """Seconds until the local date changes"""
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(1.0, (midnight - now).total_seconds())
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + SQLite) cache of LLM answers with per-prompt TTLs"""
+
+    def __init__(self, path=None, maxsize=256, short_ttl=120.0, long_ttl=7 * 24 * 3600.0):
+        self.maxsize = maxsize
+        self.short_ttl = short_ttl
+        self.long_ttl = long_ttl
+        self._memory = OrderedDict()  # key -> (expires_at, response)
+        self._lock = threading.Lock()
+        self._db = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.expired = 0
+        if path:
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, prompt TEXT, response TEXT, expires REAL)"
+                )
+                self._db.execute("DELETE FROM responses WHERE expires < ?", (time.time(),))
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"LLM response cache: disk tier disabled ({e})")
+                self._db = None
+
+    def ttl_for(self, prompt):
+        """Seconds an answer to prompt stays valid (0 = do not cache)"""
+        text = normalize_prompt(prompt)
+        if not text or CREATIVE_RE.search(text) or CLOCK_RE.search(text):
+            return 0
+        if TIME_SENSITIVE_RE.search(text):
+            return self.short_ttl
+        if DATE_SENSITIVE_RE.search(text):
+            return min(self.long_ttl, _until_midnight())
+        return self.long_ttl
+
+    @staticmethod
+    def key(prompt, model="", mode=""):
+        material = json.dumps([normalize_prompt(prompt), model or "", mode or ""], ensure_ascii=False)
+        return hashlib.sha1(material.encode("utf-8")).hexdigest()
+
+    def get(self, prompt, model="", mode=""):
+        """Return the cached response, or None on a miss"""
+        if self.ttl_for(prompt) <= 0:
+            return None
+        key = self.key(prompt, model, mode)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._memory[key]
+                self.expired += 1
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT response, expires FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is not None:
+                    response, expires = row
+                    if expires > now:
+                        self._remember(key, expires, response)
+                        self.disk_hits += 1
+                        return response
+                    self.expired += 1
+
+            self.misses += 1
+            return None
+
+    def put(self, prompt, response, model="", mode=""):
+        """Store response for prompt (ignored for uncacheable prompts or empty responses)"""
+        ttl = self.ttl_for(prompt)
+        if ttl <= 0 or not response or not str(response).strip():
+            return
+        key = self.key(prompt, model, mode)
+        expires = time.time() + ttl
+        with self._lock:
+            self._remember(key, expires, response)
+            self.stores += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses (key, prompt, response, expires) VALUES (?, ?, ?, ?)",
+                        (key, normalize_prompt(prompt), response, expires),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"LLM response cache: could not persist entry ({e})")
+
+    def _remember(self, key, expires, response):
+        self._memory[key] = (expires, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM responses")
+                    self._db.commit()
+                except sqlite3.Error:
+                    pass
+
+    def stats(self):
+        """Return hit/miss counters per tier and the overall hit rate"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_size": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (hits / lookups) if lookups else 0.0,
+                "stores": self.stores,
+                "expired": self.expired,
+            }
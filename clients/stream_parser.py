@@ -0,0 +1,244 @@
+"""Incremental parser for streamed LLM responses
+
+Feed it the raw bytes as they arrive and it returns the text deltas in them.
+Three wire formats are recognised from the first non-blank character:
+
+- SSE, as sent by Gemini `streamGenerateContent?alt=sse` and by
+  OpenAI-compatible `chat/completions` with `stream: true` (Groq). Each
+  event is one or more `data:` lines ended by a blank line, and
+  `data: [DONE]` ends the stream.
+- a JSON array, as sent by `streamGenerateContent` without `alt=sse`:
+  `[{...},\r\n{...}]`, arriving over time.
+- anything else is treated as plain text and passed through unchanged.
+
+Every event is JSON-decoded exactly once and only its text delta is
+returned. Deltas are not stripped or cleaned, so the pieces concatenate back
+into the exact answer (clean whole sentences afterwards, as speak_stream does).
+"""
+import codecs
+import json
+
+SSE = "sse"
+JSON_ARRAY = "json"
+TEXT = "text"
+
+_SSE_FIELDS = ("data:", "event:", "id:", "retry:", ":")
+_DECODER = json.JSONDecoder()
+
+
+def text_delta(event):
+    """Text carried by one decoded event, or None
+
+    Understands Gemini candidates (content.parts[].text), OpenAI chat deltas
+    and messages (choices[0].delta/message.content), completions
+    (choices[0].text) and plain {"text"|"content"|"response": ...} objects.
+    """
+    if not isinstance(event, dict):
+        return event if isinstance(event, str) else None
+
+    candidates = event.get("candidates")
+    if isinstance(candidates, list) and candidates:
+        content = candidates[0].get("content") if isinstance(candidates[0], dict) else None
+        parts = content.get("parts") if isinstance(content, dict) else None
+        if isinstance(parts, list):
+            texts = [part["text"] for part in parts
+                     if isinstance(part, dict) and isinstance(part.get("text"), str)]
+            return "".join(texts) if texts else None
+        return None
+
+    choices = event.get("choices")
+    if isinstance(choices, list) and choices:
+        choice = choices[0]
+        if not isinstance(choice, dict):
+            return None
+        message = choice.get("delta") or choice.get("message")
+        if isinstance(message, dict):
+            content = message.get("content")
+            return content if isinstance(content, str) else None
+        text = choice.get("text")
+        return text if isinstance(text, str) else None
+
+    for key in ("text", "content", "response"):
+        value = event.get(key)
+        if isinstance(value, str):
+            return value
+    return None
+
+
+class StreamParser:
+    """Turns the bytes of a streamed response into text deltas, one feed() at a time"""
+
+    def __init__(self, fmt=None):
+        self.format = fmt            # SSE / JSON_ARRAY / TEXT, detected when None
+        self.done = False            # [DONE] seen or the JSON array closed
+        self.events = 0
+        self.errors = 0              # events that were not valid JSON
+        self._utf8 = codecs.getincrementaldecoder("utf-8")("replace")
+        self._buffer = ""
+        self._pos = 0                # start of the unconsumed part of _buffer
+        self._data = []              # data: lines of the SSE event being read
+
+    def feed(self, chunk):
+        """Parse the next piece of the stream (bytes or str); return the new text deltas"""
+        if self.done or not chunk:
+            return []
+        text = self._utf8.decode(chunk) if isinstance(chunk, (bytes, bytearray, memoryview)) else chunk
+        if self.format is None:
+            self._buffer += text
+            self.format = self._detect(self._buffer)
+            if self.format is None:
+                return []
+            text, self._buffer = self._buffer, ""
+        if self.format == TEXT:
+            return [text]
+        if self._pos:
+            # Drop what has been consumed once, rather than slicing per event
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += text
+        if self.format == SSE:
+            return self._parse_sse(final=False)
+        if "}" not in text and "]" not in text:
+            return []  # no object can have been completed by this chunk
+        return self._parse_json_array()
+
+    def close(self):
+        """End of stream: return whatever complete text is still buffered"""
+        tail = self._utf8.decode(b"", final=True)
+        if self.format is None:
+            self.format = self._detect(self._buffer + tail, final=True)
+            if self.format == TEXT:
+                return [self._buffer + tail] if (self._buffer + tail) else []
+            tail, self._buffer = self._buffer + tail, ""
+        if tail:
+            return self.feed(tail) + self.close()
+        if self.done:
+            return []
+        if self.format == SSE:
+            self._buffer += "\n\n"
+            return self._parse_sse(final=True)
+        if self.format == JSON_ARRAY:
+            out = self._parse_json_array()
+            if not self.done and self._buffer[self._pos:].strip(" \t\r\n,]"):
+                self.errors += 1  # truncated or malformed last object
+            self.done = True
+            return out
+        return []
+
+    @staticmethod
+    def _detect(text, final=False):
+        stripped = text.lstrip()
+        if not stripped:
+            return TEXT if final else None
+        if stripped[0] in "[{":
+            return JSON_ARRAY
+        if stripped.startswith(_SSE_FIELDS):
+            return SSE
+        if not final and len(stripped) < 6 and any(f.startswith(stripped) for f in _SSE_FIELDS):
+            return None  # could still become "data:"
+        return TEXT
+
+    def _dispatch(self, payload, out):
+        self.events += 1
+        if payload == "[DONE]":
+            self.done = True
+            return
+        if payload[:1].isspace():
+            payload = payload.strip()
+        try:
+            event, end = _DECODER.raw_decode(payload)
+            if end != len(payload) and payload[end:].strip():
+                raise ValueError("extra data after the event")
+        except ValueError:
+            if "\n" in payload:
+                # Servers that never send the blank line: one event per data: line
+                for line in payload.split("\n"):
+                    self._dispatch(line, out)
+                self.events -= 1
+            else:
+                self.errors += 1
+            return
+        delta = text_delta(event)
+        if delta:
+            out.append(delta)
+
+    def _parse_sse(self, final):
+        out = []
+        end = self._buffer.rfind("\n")
+        if end < self._pos:
+            return out  # no complete line yet
+        # All complete lines at once: one split instead of a find per line
+        lines = self._buffer[self._pos:end].split("\n")
+        self._pos = end + 1
+        data = self._data
+        for line in lines:
+            if line and line[-1] == "\r":
+                line = line[:-1]
+            if not line:
+                if data:
+                    payload = data[0] if len(data) == 1 else "\n".join(data)
+                    data.clear()
+                    self._dispatch(payload, out)
+                    if self.done:
+                        break
+            elif line.startswith("data:"):
+                data.append(line[6:] if line.startswith("data: ") else line[5:])
+            # event:, id:, retry: and :comment lines carry no text
+        if final:
+            self._buffer, self._pos = "", 0
+        return out
+
+    @staticmethod
+    def _next_object(buffer, pos):
+        start = buffer.find("\n", pos)
+        while start >= 0:
+            start += 1
+            if buffer.startswith(",", start):
+                start += 1
+            if buffer.startswith("{", start):
+                return start
+            start = buffer.find("\n", start)
+        return -1
+
+    def _parse_json_array(self):
+        out = []
+        buffer = self._buffer
+        pos = self._pos
+        size = len(buffer)
+        while not self.done:
+            while pos < size and buffer[pos] in " \t\r\n,[":
+                pos += 1
+            if pos >= size:
+                break
+            if buffer[pos] == "]":
+                self.done = True
+                pos += 1
+                break
+            try:
+                event, pos = _DECODER.raw_decode(buffer, pos)
+            except ValueError:
+                # Incomplete object: wait for more data. But if another
+                # top-level object (a "{" at the start of a line) has already
+                # begun, this one is malformed: skip it.
+                restart = self._next_object(buffer, pos)
+                if restart < 0:
+                    break
+                self.errors += 1
+                pos = restart
+                continue
+            self.events += 1
+            delta = text_delta(event)
+            if delta:
+                out.append(delta)
+        self._pos = pos
+        return out
+
+
+def iter_text(chunks, fmt=None):
+    """Text deltas from an iterable of raw chunks (e.g. response.iter_content(None))"""
+    parser = StreamParser(fmt)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    yield from parser.close()
@@ -97,5 +97,56 @@ WEATHER_CITY_BLACKLIST = ("current", "what", "tell", "give", "show", "get", "fin
 # Exit keywords
 EXIT_KEYWORDS = ["exit", "quit", "stop", "bye", "goodbye", "terminate"]
 
+# Maximum number of routing verdicts kept by the route cache
+ROUTE_CACHE_SIZE = int(os.getenv("ROUTE_CACHE_SIZE", "256"))
+
+# Trained intent classifier (python -m utils.intent_classifier train). When the
+# file exists, the top-k routes it is confident about are tried first.
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", os.path.join("models", "intent_model.npz"))
+INTENT_TOP_K = int(os.getenv("INTENT_TOP_K", "3"))
+INTENT_MIN_CONFIDENCE = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.5"))
+
+# Opt-in: send the Gemini request while local routing is still running when
+# the command is likely to fall through to the LLM
+SPECULATIVE_LLM = os.getenv("SPECULATIVE_LLM", "").lower() in ("1", "true", "yes")
+
+# Split "do X and Y, then Z" into steps and run the independent ones
+# concurrently (see utils/multi_intent.py)
+MULTI_INTENT = os.getenv("MULTI_INTENT", "true").lower() in ("1", "true", "yes")
+MULTI_INTENT_WORKERS = int(os.getenv("MULTI_INTENT_WORKERS", "4"))
+
+# Always-on microphone (see utils/audio_capture.py): keep one input stream
+# open and record the last MIC_RING_SECONDS into a ring buffer. listen()
+# continues where the previous one stopped (after the assistant's own
+# speech), but takes at most MIC_BACKLOG_SECONDS recorded before it was called.
+# Utterances are read as views of the ring, so keep it longer than a listen
+# can take (timeout + phrase limit, 20 s).
+MIC_ALWAYS_ON = os.getenv("MIC_ALWAYS_ON", "true").lower() in ("1", "true", "yes")
+MIC_RING_SECONDS = float(os.getenv("MIC_RING_SECONDS", "30"))
+MIC_BACKLOG_SECONDS = float(os.getenv("MIC_BACKLOG_SECONDS", "3"))
+MIC_BLOCK_SIZE = int(os.getenv("MIC_BLOCK_SIZE", "1024"))
+
+# Background noise-floor estimate (see utils/noise_floor.py) that sets the
+# speech threshold instead of calibrating for 1.5 s on every listen; saved
+# to NOISE_FLOOR_PATH at most every NOISE_FLOOR_SAVE_SECONDS
+NOISE_FLOOR_PATH = os.getenv("NOISE_FLOOR_PATH", os.path.join("cache", "noise_floor.json"))
+NOISE_FLOOR_RATIO = float(os.getenv("NOISE_FLOOR_RATIO", "2.5"))
+NOISE_FLOOR_MIN_THRESHOLD = float(os.getenv("NOISE_FLOOR_MIN_THRESHOLD", "150"))
+NOISE_FLOOR_SAVE_SECONDS = float(os.getenv("NOISE_FLOOR_SAVE_SECONDS", "60"))
+
+# End utterances with the NumPy voice activity detector (utils/vad.py)
+# instead of waiting 1.2 s of silence. Aggressiveness 0-3: higher ends
+# sooner but may cut off slow speakers; VAD_HANGOVER_MS overrides its pause
+# length (0 = the level's default).
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() in ("1", "true", "yes")
+VAD_AGGRESSIVENESS = int(os.getenv("VAD_AGGRESSIVENESS", "0"))
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "0"))
+
+# Text-to-speech worker (see utils/tts.py): one long-lived voice speaking a
+# queue. "auto" uses pyttsx3 when it works, "command" one espeak/say/SAPI
+# process per utterance. TTS_RATE is pyttsx3's words per minute (0 = default).
+TTS_ENGINE = os.getenv("TTS_ENGINE", "auto").lower()
+TTS_RATE = int(os.getenv("TTS_RATE", "0"))
+
 # Thank you keywords
 THANK_YOU_KEYWORDS = ["thank you", "thanks", "thankyou", "thx", "thank"]
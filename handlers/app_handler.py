@@ -7,8 +7,9 @@ import sys
 import winreg
 from config.settings import OS, COMMON_APPS
 from utils.voice_io import speak, listen, speak_stream
-from utils.text_processing import clean_connector_words
+from utils.text_processing import as_command, clean_connector_words
 from utils.logger import log_interaction
+from handlers.match import Match
 
 
 def find_installed_apps_windows():
@@ -93,14 +94,15 @@ def find_installed_apps():
         # macOS and others will use default approach
         return {}
 
-def handle_app_opening(command):
-    """Handle application opening commands"""
+def match_app_opening(command):
+    """Recognise app launch requests and split off any follow-up text"""
+    command = as_command(command)
     if not re.search(r'\b(open|launch|start)\b', command, re.IGNORECASE):
-        return False
+        return None
     
     app = None
     remaining_text = None
-    command_lower = command.lower()
+    command_lower = command.lowered
     
     # Extract app name from command
     for prefix in ["open ", "launch ", "start "]:
@@ -124,6 +126,15 @@ def handle_app_opening(command):
     if remaining_text:
         remaining_text = clean_connector_words(remaining_text)
     
+    return Match("open_app", command, {"app": app, "remaining_text": remaining_text})
+
+
+def execute_app_opening(match):
+    """Launch the app (asking for its name if needed) and run any follow-up text"""
+    command = match.command
+    app = match.slots["app"]
+    remaining_text = match.slots["remaining_text"]
+    
     if not app:
         speak("Which app would you like to open?")
         app = listen()
@@ -153,7 +164,6 @@ def handle_app_opening(command):
                 log_interaction(command, f"Opening {app}", source="local")
                 
                 # Proactive follow-up
-                time.sleep(1)
                 speak("I am listening to you.... please tell me what to do next")
                 
                 # If there's remaining text, process it with Gemini
@@ -174,6 +184,12 @@ def handle_app_opening(command):
     return False
 
 
+def handle_app_opening(command):
+    """Handle application opening commands"""
+    match = match_app_opening(command)
+    return execute_app_opening(match) if match else False
+
+
 def _open_app_with_windows_search(app, command, remaining_text):
     """Open app using Windows Search (Windows key + S)
     
@@ -205,7 +221,6 @@ def _open_app_with_windows_search(app, command, remaining_text):
         log_interaction(command, f"Opening {app} via Windows Search", source="windows_search")
         
         # Proactive follow-up
-        time.sleep(1)
         speak("I am listening to you.... please tell me what to do next")
         
         # If there's remaining text, process it
@@ -260,7 +275,6 @@ def _open_app_legacy(app, app_clean, command, remaining_text):
                 log_interaction(command, f"Opening {app}", source="local")
                 
                 # Proactive follow-up
-                time.sleep(1)
                 speak("I am listening to you.... please tell me what to do next")
                 
                 # If there's remaining text, process it
@@ -322,17 +336,10 @@ def _process_remaining_text(text):
     if stream_flag:
         try:
             gen = gemini_client.stream_generate(text)
-            final_text = speak_stream(gen)
-            
-            if not final_text:
-                return True
+            final_text = speak_stream(gen, clean=gemini_client.strip_json_noise)
             
-            cleaned = gemini_client.normalize_response(final_text)
-            final_clean = gemini_client.strip_json_noise(cleaned)
-            
-            if final_clean:
-                speak(final_clean)
-                log_interaction(text, final_clean, source="gemini_stream")
+            if final_text:
+                log_interaction(text, final_text, source="gemini_stream")
                 
         except Exception as e:
             print(f"Streaming error: {e}")
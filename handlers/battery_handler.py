@@ -3,6 +3,8 @@ import threading
 import time
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 from config.settings import OS
 
 # Track battery state
@@ -199,19 +201,20 @@ def stop_battery_monitoring():
     monitoring = False
 
 
-def handle_battery_status(command):
-    """Handle battery status queries"""
-    command_lower = command.lower()
+def match_battery_status(command):
+    """Recognise battery status questions"""
+    command = as_command(command)
+    command_lower = command.lowered
     
     # Check for battery keywords
     if not any(word in command_lower for word in ['battery', 'charge', 'charging']):
-        return False
+        return None
         
     # EXCLUSION: If it's a "how to", "what should I do", "healthy", or "configure" query,
     # let Gemini/AI handle it as it's a general question, not a status check.
     nuance_keywords = ['how to', 'what should', 'should i', 'healthy', 'config', 'improve', 'save', 'life', 'setting']
     if any(word in command_lower for word in nuance_keywords):
-        return False
+        return None
     
     # Common status query patterns
     status_patterns = [
@@ -219,9 +222,15 @@ def handle_battery_status(command):
         r'\bwhat is\b', r'\btell me\b', r'\bcheck\b', r'^battery$', r'^charge$'
     ]
     
-    # If it contains any status pattern or is a simple "battery" command
+    # Only a status pattern or a simple "battery" command is a status check
     if any(re.search(pattern, command_lower) for pattern in status_patterns) or len(command_lower.split()) <= 2:
-        battery_level, is_charging = get_battery_info()
+        return Match("battery_status", command)
+    return None
+
+
+def execute_battery_status(match):
+    """Read and speak the battery level"""
+    battery_level, is_charging = get_battery_info()
     
     if is_charging:
         message = f"Battery is {battery_level} percent and currently charging"
@@ -229,5 +238,11 @@ def handle_battery_status(command):
         message = f"Battery is {battery_level} percent"
     
     speak(message)
-    log_interaction(command, message, source="local")
+    log_interaction(match.command, message, source="local")
     return True
+
+
+def handle_battery_status(command):
+    """Handle battery status queries"""
+    match = match_battery_status(command)
+    return execute_battery_status(match) if match else False
@@ -5,6 +5,8 @@ import os
 from config.settings import OS
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
 
 # Dictionary to convert written numbers to integers
@@ -227,8 +229,8 @@ def set_brightness(percentage):
         return False
 
 
-def handle_brightness(command):
-    """Handle brightness control commands
+def match_brightness(command):
+    """Recognise brightness commands and extract the percentage or direction
     
     Supports:
     - "Make brightness 40%"
@@ -237,12 +239,28 @@ def handle_brightness(command):
     - "Set brightness to fifty"
     - "Brightness 80"
     """
-    if not re.search(r'\b(brightness|screen brightness|display brightness)\b', command, re.IGNORECASE):
-        return False
+    command = as_command(command)
+    if "brightness" not in command.token_set:
+        return None
     
     # Parse the brightness value from the command
     brightness_value = parse_brightness_value(command)
     
+    direction = None
+    if brightness_value is None:
+        if "increase" in command.lowered or "up" in command.lowered:
+            direction = "up"
+        elif "decrease" in command.lowered or "down" in command.lowered:
+            direction = "down"
+    
+    return Match("brightness", command, {"percentage": brightness_value, "direction": direction})
+
+
+def execute_brightness(match):
+    """Apply the requested brightness change"""
+    command = match.command
+    brightness_value = match.slots["percentage"]
+    
     if brightness_value is not None:
         # Validate percentage
         if brightness_value < 0 or brightness_value > 100:
@@ -262,11 +280,12 @@ def handle_brightness(command):
         return True
     else:
         # Try generic brightness commands
-        if "increase" in command.lower() or "up" in command.lower():
+        direction = match.slots["direction"]
+        if direction == "up":
             speak("Increasing the brightness")
             set_brightness(75)  # Set to 75% as default increase
             log_interaction(command, "Brightness increase requested", source="local")
-        elif "decrease" in command.lower() or "down" in command.lower():
+        elif direction == "down":
             speak("Decreasing the brightness")
             set_brightness(25)  # Set to 25% as default decrease
             log_interaction(command, "Brightness decrease requested", source="local")
@@ -274,3 +293,9 @@ def handle_brightness(command):
             speak("I can change brightness if you tell me a percentage, for example 'set brightness to 60' or 'make brightness seventy'.")
         log_interaction(command, "Brightness command", source="local")
         return True
+
+
+def handle_brightness(command):
+    """Handle brightness control commands"""
+    match = match_brightness(command)
+    return execute_brightness(match) if match else False
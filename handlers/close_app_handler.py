@@ -6,6 +6,8 @@ import psutil
 from config.settings import OS, PROCESS_NAMES
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
 # Track opened applications by user command
 OPENED_APPS = {}  # {app_name: process_name}
@@ -25,8 +27,8 @@ def register_opened_tab(browser_name, tab_name):
     OPENED_TABS[browser_lower].append(tab_name.lower())
 
 
-def handle_app_closing(command):
-    """Handle application closing commands
+def match_app_closing(command):
+    """Recognise close/minimize requests and resolve the tab or app to act on
     
     Supports:
     - "close powerpoint" → closes PowerPoint
@@ -41,12 +43,13 @@ def handle_app_closing(command):
     - "close the current tab" → closes current active tab (uses Ctrl+W)
     - "close this tab" → closes current active tab (uses Ctrl+W)
     """
-    command_lower = command.lower().strip()
+    command = as_command(command)
+    command_lower = command.lowered.strip()
     
     # EXCLUSION: Don't process exit/quit keywords - let exit handler handle them
     exit_keywords = ['exit', 'terminate', 'stop yourself', 'quit', 'goodbye']
     if any(keyword in command_lower for keyword in exit_keywords):
-        return False  # Don't process - let exit handler handle this
+        return None  # Don't process - let exit handler handle this
     
     # Check for explicit close/shut/kill/minimize commands
     has_close_word = re.search(r'\b(close|shut|kill|terminate|stop|minimise|minimize)\b', command_lower)
@@ -54,14 +57,8 @@ def handle_app_closing(command):
     # PATTERN 0: Close/Minimize current/active tab/window
     if re.search(r'(?:close|shut|kill|minimise|minimize)\s+(?:the\s+)?(?:current|this|active)\s+tab', command_lower):
         if "minimise" in command_lower or "minimize" in command_lower:
-            speak("Minimizing current window")
-            _minimize_window_with_hotkey(command)
-            log_interaction(command, "Minimized current window", source="local")
-        else:
-            speak("Closing current tab")
-            _close_tab_with_hotkey(command)
-            log_interaction(command, "Closed current tab using Ctrl+W", source="local")
-        return True
+            return Match("minimize_window", command)
+        return Match("close_current_tab", command)
     
     # Check if user is asking about tabs (more specific: "tab" not followed by "le" or "let")
     # This prevents matching "table", "tablet", "tablespoon", etc.
@@ -69,7 +66,7 @@ def handle_app_closing(command):
     
     # If no close word and no tab keyword, don't process this command
     if not has_close_word and not has_tab_keyword:
-        return False
+        return None
     
     # Ordinals and adjectives to filter out
     ordinals = r"first|second|third|fourth|fifth|last"
@@ -83,10 +80,7 @@ def handle_app_closing(command):
     )
     if ordinal_tab_browser:
         browser_name = ordinal_tab_browser.group(1).strip()
-        speak("Closing tab using keyboard shortcut")
-        _close_tab_with_hotkey(command)
-        log_interaction(command, "Closed tab using Ctrl+W", source="local")
-        return True
+        return Match("close_active_tab", command, {"browser": browser_name})
     
     # PATTERN 2: close [adjective]* [ordinal]* [tab_name] tab
     # Filter out both adjectives AND ordinals from capture group
@@ -110,9 +104,9 @@ def handle_app_closing(command):
             apps = ("chrome", "firefox", "edge", "microsoft edge", "powerpoint", "word", "excel", 
                    "notepad", "calculator", "discord", "settings")
             if target.lower() in apps:
-                return _close_application_instance(target.lower(), command)
+                return Match("close_app", command, {"app": target.lower()})
             else:
-                return _close_tab_or_website(target, browser_name, command)
+                return Match("close_tab", command, {"tab": target, "browser": browser_name})
     
     # PATTERN 3: IMPLICIT tab close - just "[name] tab" without close word
     # e.g., "youtube tab" → Close youtube tab
@@ -127,9 +121,9 @@ def handle_app_closing(command):
                 apps = ("chrome", "firefox", "edge", "microsoft edge", "powerpoint", "word", "excel", 
                        "notepad", "calculator", "discord", "settings")
                 if target.lower() in apps:
-                    return _close_application_instance(target.lower(), command)
+                    return Match("close_app", command, {"app": target.lower()})
                 else:
-                    return _close_tab_or_website(target, None, command)
+                    return Match("close_tab", command, {"tab": target, "browser": None})
     
     # PATTERN 4: close [app_name] (without tab keyword - application close)
     if has_close_word and not has_tab_keyword:
@@ -138,14 +132,43 @@ def handle_app_closing(command):
             target = app_match.group(1).strip()
             # If user says "close youtube", try closing a tab first as it's more likely
             if "youtube" in target:
-                return _close_tab_or_website("youtube", None, command)
+                return Match("close_tab", command, {"tab": "youtube", "browser": None})
                 
             apps = ("chrome", "firefox", "edge", "microsoft edge", "powerpoint", "word", "excel", 
                    "notepad", "calculator", "discord", "settings", "camera", "explorer", "music", "video", "spotify")
             if target.lower() in apps:
-                return _close_application_instance(target.lower(), command)
+                return Match("close_app", command, {"app": target.lower()})
     
-    return False
+    return None
+
+
+def execute_app_closing(match):
+    """Close or minimize the tab/window/app resolved by match_app_closing"""
+    command = match.command
+    if match.intent == "minimize_window":
+        speak("Minimizing current window")
+        _minimize_window_with_hotkey(command)
+        log_interaction(command, "Minimized current window", source="local")
+        return True
+    if match.intent == "close_current_tab":
+        speak("Closing current tab")
+        _close_tab_with_hotkey(command)
+        log_interaction(command, "Closed current tab using Ctrl+W", source="local")
+        return True
+    if match.intent == "close_active_tab":
+        speak("Closing tab using keyboard shortcut")
+        _close_tab_with_hotkey(command)
+        log_interaction(command, "Closed tab using Ctrl+W", source="local")
+        return True
+    if match.intent == "close_app":
+        return _close_application_instance(match.slots["app"], command)
+    return _close_tab_or_website(match.slots["tab"], match.slots["browser"], command)
+
+
+def handle_app_closing(command):
+    """Handle application closing commands"""
+    match = match_app_closing(command)
+    return execute_app_closing(match) if match else False
 
 
 
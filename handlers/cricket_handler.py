@@ -4,16 +4,25 @@ import requests
 from config.settings import CRICKETDATA_API_KEY
 from utils.voice_io import speak, listen
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
-def handle_cricket_score(command):
-    """Handle commands for real-time cricket scores"""
+def match_cricket_score(command):
+    """Recognise cricket score requests without side effects"""
+    command = as_command(command)
     
     # Check for cricket-related keywords
     cricket_match = re.search(r'\b(cricket score|live score|cricket match|match score|cricket|t20|world cup|ipl)\b', command, re.IGNORECASE)
     
     if not cricket_match:
-        return False
-        
+        return None
+    return Match("cricket_score", command)
+
+
+def execute_cricket_score(match):
+    """Fetch live scores; declines when no live match is found"""
+    command = match.command
+    
     if not CRICKETDATA_API_KEY:
         speak("Cricket API key is not configured. Please add CRICKETDATA_API_KEY to your environment variables.")
         log_interaction(command, "Cricket API key not configured", source="local")
@@ -67,3 +76,9 @@ def handle_cricket_score(command):
         return True
 
     return False
+
+
+def handle_cricket_score(command):
+    """Handle commands for real-time cricket scores"""
+    match = match_cricket_score(command)
+    return execute_cricket_score(match) if match else False
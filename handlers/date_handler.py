@@ -3,12 +3,24 @@ import re
 from utils.voice_io import speak
 from utils.time_utils import get_date
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
+
+def match_date(command):
+    """Recognise date questions without side effects"""
+    command = as_command(command)
+    if not command.token_set.isdisjoint(("date", "day")) and re.search(r'\b(date|what date|what is the date|what\'s the date|today\'s date|what day is it|what is the day|tell me the date|current date|current day)\b', command, re.IGNORECASE):
+        return Match("date", command)
+    return None
+
+def execute_date(match):
+    """Speak today's date"""
+    date_info = get_date()
+    speak(f"Today's date is {date_info}")
+    log_interaction(match.command, f"Today's date is {date_info}", source="local")
+    return True
 
 def handle_date(command):
     """Handle date commands"""
-    if re.search(r'\b(date|what date|what is the date|what\'s the date|today\'s date|what day is it|what is the day|tell me the date|current date|current day)\b', command, re.IGNORECASE):
-        date_info = get_date()
-        speak(f"Today's date is {date_info}")
-        log_interaction(command, f"Today's date is {date_info}", source="local")
-        return True
-    return False
+    match = match_date(command)
+    return execute_date(match) if match else False
@@ -5,6 +5,8 @@ import time
 from config.settings import OS
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
 # Try different keyboard control methods
 try:
@@ -113,37 +115,47 @@ def open_emoji():
         return False
 
 
-def handle_emoji_mode(command):
-    """Handle emoji mode/picker commands
+def match_emoji_mode(command):
+    """Recognise emoji picker requests
     
     Supports:
     - "Open emoji" / "Show emoji" / "emoji" -> Opens emoji picker (Win+.)
-    - "Give me some emoji" / "Suggest emojis" / "emoji suggestions" -> Uses Gemini to suggest emojis
+    - "Give me some emoji" / "Suggest emojis" / "emoji suggestions" -> Left to Gemini
     """
+    command = as_command(command)
     # Check if command contains "emoji" keyword
-    if "emoji" not in command.lower():
-        return False
+    if "emoji" not in command.lowered:
+        return None
     
-    command_lower = command.lower()
+    command_lower = command.lowered
     
     # Check if user is asking for emoji suggestions/recommendations (not just opening picker)
     if re.search(r'\b(suggest|give me|recommend|show me|some|list|examples?|types?)\b', command_lower):
         # User wants emoji suggestions - let Gemini handle this
-        # Return False so it falls through to Gemini
-        return False
+        return None
     
-    # Otherwise, open the emoji picker directly with Win+.
+    return Match("open_emoji_picker", command)
+
+
+def execute_emoji_mode(match):
+    """Open the emoji picker directly with Win+."""
     success = open_emoji()
     
     if success:
         speak("Opening emoji picker")
-        log_interaction(command, "Emoji picker opened (Win+.)", source="local")
+        log_interaction(match.command, "Emoji picker opened (Win+.)", source="local")
     else:
         speak("Tried to open emoji picker but it may not be supported on this system.")
-        log_interaction(command, "Emoji picker requested", source="local")
+        log_interaction(match.command, "Emoji picker requested", source="local")
     return True
 
 
+def handle_emoji_mode(command):
+    """Handle emoji mode/picker commands"""
+    match = match_emoji_mode(command)
+    return execute_emoji_mode(match) if match else False
+
+
 if __name__ == "__main__":
     print("Emoji handler test - import successful")
     print(f"OS detected: {OS}")
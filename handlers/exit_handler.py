@@ -1,9 +1,13 @@
 """Exit handler"""
 import re
 from config.settings import EXIT_KEYWORDS
+from utils.text_processing import as_command
+from handlers.match import Match
 
-def handle_exit(command):
-    """Handle exit/quit commands
+_EXIT_WORDS = frozenset(EXIT_KEYWORDS)
+
+def match_exit(command):
+    """Recognise exit/quit commands without side effects
     
     Matches:
     - Direct keywords: exit, quit, stop, bye, goodbye, terminate
@@ -11,26 +15,38 @@ def handle_exit(command):
     - Leaving phrases: I want to leave, I want to go, I need to go
     - Ending phrases: that's all, nothing else, no more
     """
-    command_lower = command.lower()
+    command = as_command(command)
+    command_lower = command.lowered
     
     # Direct exit keywords
-    if re.search(r'\b(exit|quit|stop|bye|goodbye|terminate)\b', command_lower):
-        return True
+    if command.token_set & _EXIT_WORDS:
+        return Match("exit", command)
     
     # Closing/ending the conversation patterns
     if re.search(r'\b(close|end|finish|wrap)\b.*\b(our|the|this)?\s*(conversation|convo|chat|talk|discussion)\b', command_lower):
-        return True
+        return Match("exit", command)
     
     # Leaving/going away patterns
     if re.search(r'\b(i\s+want\s+to|i\s+need\s+to|i\s+have\s+to|i\'ll|i\s+gotta)\s+(leave|go|depart|exit|quit|stop)\b', command_lower):
-        return True
+        return Match("exit", command)
     
     # Nothing else / that's all patterns
     if re.search(r'\b(that\'?s\s+all|nothing\s+else|no\s+more|no\s+further|we\'?re\s+done|all\s+done)\b', command_lower):
-        return True
+        return Match("exit", command)
     
     # Goodbye variations
     if re.search(r'\b(goodbye|good\s+bye|see\s+you|see\s+ya|take\s+care|farewell)\b', command_lower):
-        return True
+        return Match("exit", command)
     
-    return False
+    return None
+
+
+def execute_exit(match):
+    """Exit has no side effects of its own; main ends the loop"""
+    return True
+
+
+def handle_exit(command):
+    """Handle exit/quit commands"""
+    match = match_exit(command)
+    return execute_exit(match) if match else False
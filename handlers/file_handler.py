@@ -5,13 +5,16 @@ import os
 from config.settings import OS, LOCATION_MAP
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
-def handle_file_opening(command):
-    """Handle file and folder opening commands"""
+def match_file_opening(command):
+    """Recognise file/folder opening requests and resolve the location"""
+    command = as_command(command)
     if not re.search(r'\b(open|show)\b.*(pdf|file|document|documents|folder|downloads|pictures|music|videos|explorer)', command, re.IGNORECASE):
-        return False
+        return None
     
-    command_lower = command.lower()
+    command_lower = command.lowered
     
     # Determine which location to open
     location = None
@@ -27,6 +30,12 @@ def handle_file_opening(command):
         else:
             location = os.path.expanduser('~')
     
+    return Match("open_location", command, {"location": location})
+
+def execute_file_opening(match):
+    """Open the resolved location in the platform file manager"""
+    command = match.command
+    location = match.slots["location"]
     try:
         if OS == "windows":
             subprocess.Popen(["explorer", location])
@@ -39,8 +48,6 @@ def handle_file_opening(command):
         log_interaction(command, "Opened file explorer", source="local")
         
         # Proactive follow-up
-        import time as _time
-        _time.sleep(1)
         speak("I am listening to you.... please tell me what to do next")
         
         return True
@@ -48,3 +55,8 @@ def handle_file_opening(command):
         speak("Sorry, I couldn't open the file explorer.")
         print(f"Error: {e}")
         return False
+
+def handle_file_opening(command):
+    """Handle file and folder opening commands"""
+    match = match_file_opening(command)
+    return execute_file_opening(match) if match else False
@@ -7,24 +7,27 @@ import pyautogui
 from config.settings import OS
 from utils.voice_io import speak, listen
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 from clients import gemini_client
 
 
-def handle_file_writing(command):
-    """Handle writing content to files (Notepad, Word, etc.)
+def match_file_writing(command):
+    """Recognise document writing requests and extract the app and prompt
     
     Supports:
     - New: "Open notepad and write a story"
     - Append: "In the current notebook write a bengali song"
     """
+    command = as_command(command)
     # Detect intent: Must mention a document app AND a writing action
     doc_apps = r'\b(notepad|notebook|word|document|ms\s+word|wordpad)\b'
     write_actions = r'\b(write|add|type|create|generate|put)\b'
     
     if not re.search(doc_apps, command, re.IGNORECASE) or not re.search(write_actions, command, re.IGNORECASE):
-        return False
+        return None
     
-    command_lower = command.lower()
+    command_lower = command.lowered
     
     # Determine if we need to open a new app or use the active one
     is_open_request = bool(re.search(r'\b(open|launch|start|new)\b', command_lower))
@@ -41,6 +44,22 @@ def handle_file_writing(command):
         if len(extracted) > 2:
             write_prompt = extracted
     
+    return Match("write_document", command, {
+        "app": app_name,
+        "prompt": write_prompt,
+        "open_app": is_open_request,
+        "append": is_append,
+    })
+
+
+def execute_file_writing(match):
+    """Open (or reuse) the document app, generate the content and type it in"""
+    command = match.command
+    app_name = match.slots["app"]
+    write_prompt = match.slots["prompt"]
+    is_open_request = match.slots["open_app"]
+    is_append = match.slots["append"]
+    
     try:
         if is_open_request:
             # Open the application
@@ -77,7 +96,6 @@ def handle_file_writing(command):
             speak(f"Finished writing to {app_name}")
             
             # Proactive follow-up
-            time.sleep(1)
             speak("I am listening to you.... please tell me what to do next")
             return True
         else:
@@ -90,6 +108,13 @@ def handle_file_writing(command):
         return False
 
 
+
+def handle_file_writing(command):
+    """Handle writing content to files (Notepad, Word, etc.)"""
+    match = match_file_writing(command)
+    return execute_file_writing(match) if match else False
+
+
 def _generate_content(prompt):
     """Generate content using Gemini API with special handling for song lyrics"""
     try:
@@ -111,8 +136,8 @@ def _generate_content(prompt):
         else:
             full_prompt = prompt
         
-        # Use blocking API for reliability
-        response = gemini_client.generate_response(full_prompt)
+        # Use blocking API for reliability; documents get the long time budget
+        response = gemini_client.generate_response(full_prompt, deadline=gemini_client.LLM_DEADLINE_DOCUMENT)
         
         if response:
             # Clean the response
@@ -1,12 +1,25 @@
 """Greeting handler"""
-import re
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
+
+_GREETING_WORDS = frozenset(("hello", "hi", "hey", "greetings"))
+
+def match_greeting(command):
+    """Recognise greetings without side effects"""
+    command = as_command(command)
+    if command.token_set & _GREETING_WORDS:
+        return Match("greeting", command)
+    return None
+
+def execute_greeting(match):
+    """Greet the user back"""
+    speak("Hello! How can I help you?")
+    log_interaction(match.command, "Hello! How can I help you?", source="local")
+    return True
 
 def handle_greeting(command):
     """Handle greeting commands"""
-    if re.search(r'\b(hello|hi|hey|greetings)\b', command, re.IGNORECASE):
-        speak("Hello! How can I help you?")
-        log_interaction(command, "Hello! How can I help you?", source="local")
-        return True
-    return False
+    match = match_greeting(command)
+    return execute_greeting(match) if match else False
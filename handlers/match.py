@@ -0,0 +1,23 @@
+"""Side-effect-free match results shared by the handlers
+
+Every handler module exposes a pure ``match_*(command)`` that only inspects
+the text and returns a Match (or None), and an ``execute_*(match)`` that
+performs the action. The original ``handle_*(command)`` functions are kept and
+simply run one after the other.
+"""
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple
+
+_NO_SLOTS = MappingProxyType({})
+
+
+class Match(NamedTuple):
+    """What a handler recognised in a command
+
+    intent  - short name of the recognised action (e.g. "open_app", "mute")
+    command - the NormalizedCommand that was matched
+    slots   - values extracted from the text (city, app, percentage, time, ...)
+    """
+    intent: str
+    command: Any
+    slots: Mapping[str, Any] = _NO_SLOTS
@@ -6,6 +6,8 @@ import urllib.parse
 from config.settings import OS
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
 
 def _find_youtube_video_url(song_query):
@@ -71,25 +73,24 @@ def _open_video_url(video_url):
         return False
 
 
-def handle_play_music(command):
+def match_play_music(command):
     """
-    Handle play music commands
+    Recognise play music commands and extract the song query
     Patterns:
     - "play <song_name>"
     - "play <song_name> by <artist>"
     - "play music <song_name>"
-    
-    Now attempts to play the first video directly instead of just searching
     """
+    command = as_command(command)
     # Check if command contains play keyword
-    if not re.search(r'\bplay\b', command, re.IGNORECASE):
-        return False
+    if "play" not in command.token_set:
+        return None
     
-    command_lower = command.lower().strip()
+    command_lower = command.lowered.strip()
     
     # Don't handle if it's explicitly for YouTube (handled by handle_play_on_youtube)
     if "on youtube" in command_lower or "on you tube" in command_lower:
-        return False
+        return None
     
     # Extract the song query
     song_query = None
@@ -107,53 +108,49 @@ def handle_play_music(command):
         if match:
             song_query = match.group(1).strip()
     
-    # If we found a song query, search it on YouTube and play
-    if song_query:
-        try:
-            speak(f"Playing {song_query}")
-            
-            # Try to find direct video URL
-            video_url = _find_youtube_video_url(song_query)
-            
-            if video_url:
-                # Open the video directly
-                _open_video_url(video_url)
-                log_interaction(command, f"YouTube play (direct): {song_query}", source="music")
-                
-                # Proactive follow-up
-                import time as _time
-                _time.sleep(1)
-                speak("I am listening to you.... please tell me what to do next")
-            else:
-                # Fallback to search results if direct link fails
-                youtube_url = f"https://www.youtube.com/results?search_query={urllib.parse.quote(song_query)}"
-                _open_video_url(youtube_url)
-                log_interaction(command, f"YouTube search (fallback): {song_query}", source="music")
-            
-            return True
-        except Exception as e:
-            speak("Sorry, I couldn't play the music on YouTube.")
-            print(f"Music play error: {e}")
-            log_interaction(command, f"Music error: {e}", source="music")
-            return False
+    if not song_query:
+        return None
+    return Match("play_music", command, {"query": song_query})
+
+
+def execute_play_music(match):
+    """Search the song on YouTube and play the first result"""
+    command = match.command
+    song_query = match.slots["query"]
+    try:
+        speak(f"Playing {song_query}")
+        _play_on_youtube(command, song_query)
+        return True
+    except Exception as e:
+        speak("Sorry, I couldn't play the music on YouTube.")
+        print(f"Music play error: {e}")
+        log_interaction(command, f"Music error: {e}", source="music")
+        return False
+
+
+def handle_play_music(command):
+    """
+    Handle play music commands
     
-    return False
+    Now attempts to play the first video directly instead of just searching
+    """
+    match = match_play_music(command)
+    return execute_play_music(match) if match else False
 
 
-def handle_play_on_youtube(command):
+def match_play_on_youtube(command):
     """
-    Alternative handler for explicit YouTube play commands
+    Recognise explicit YouTube play commands and extract the song query
     Patterns:
     - "play <song> on youtube"
     - "youtube play <song>"
-    
-    Now attempts to play the first video directly
     """
+    command = as_command(command)
     if not re.search(r'\b(play|youtube)\b.*\byoutube\b', command, re.IGNORECASE):
         if not re.search(r'\byoutube\s+play\b', command, re.IGNORECASE):
-            return False
+            return None
     
-    command_lower = command.lower().strip()
+    command_lower = command.lowered.strip()
     
     # Extract song query
     song_query = None
@@ -167,33 +164,50 @@ def handle_play_on_youtube(command):
     elif command_lower.startswith("youtube play"):
         song_query = command_lower[12:].strip()
     
-    if song_query:
-        try:
-            speak(f"Playing {song_query} on YouTube")
-            
-            # Try to find direct video URL
-            video_url = _find_youtube_video_url(song_query)
-            
-            if video_url:
-                # Open the video directly
-                _open_video_url(video_url)
-                log_interaction(command, f"YouTube play (direct): {song_query}", source="music")
-                
-                # Proactive follow-up
-                import time as _time
-                _time.sleep(1)
-                speak("I am listening to you.... please tell me what to do next")
-            else:
-                # Fallback to search results
-                youtube_url = f"https://www.youtube.com/results?search_query={urllib.parse.quote(song_query)}"
-                _open_video_url(youtube_url)
-                log_interaction(command, f"YouTube search (fallback): {song_query}", source="music")
-            
-            return True
-        except Exception as e:
-            speak("Sorry, I couldn't play the music on YouTube.")
-            print(f"YouTube play error: {e}")
-            log_interaction(command, f"YouTube play error: {e}", source="music")
-            return False
+    if not song_query:
+        return None
+    return Match("play_on_youtube", command, {"query": song_query})
+
+
+def execute_play_on_youtube(match):
+    """Play the song on YouTube"""
+    command = match.command
+    song_query = match.slots["query"]
+    try:
+        speak(f"Playing {song_query} on YouTube")
+        _play_on_youtube(command, song_query)
+        return True
+    except Exception as e:
+        speak("Sorry, I couldn't play the music on YouTube.")
+        print(f"YouTube play error: {e}")
+        log_interaction(command, f"YouTube play error: {e}", source="music")
+        return False
+
+
+def handle_play_on_youtube(command):
+    """
+    Alternative handler for explicit YouTube play commands
     
-    return False
+    Now attempts to play the first video directly
+    """
+    match = match_play_on_youtube(command)
+    return execute_play_on_youtube(match) if match else False
+
+
+def _play_on_youtube(command, song_query):
+    """Open the first YouTube result for song_query, or the search page if none was found"""
+    # Try to find direct video URL
+    video_url = _find_youtube_video_url(song_query)
+    
+    if video_url:
+        # Open the video directly
+        _open_video_url(video_url)
+        log_interaction(command, f"YouTube play (direct): {song_query}", source="music")
+        
+        # Proactive follow-up
+        speak("I am listening to you.... please tell me what to do next")
+    else:
+        # Fallback to search results if direct link fails
+        youtube_url = f"https://www.youtube.com/results?search_query={urllib.parse.quote(song_query)}"
+        _open_video_url(youtube_url)
+        log_interaction(command, f"YouTube search (fallback): {song_query}", source="music")
@@ -2,6 +2,8 @@
 import re
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
 # Tech stack information
 TECH_STACK = [
@@ -23,12 +25,13 @@ CREATOR_INFO = {
     'tech_stack': ', '.join(TECH_STACK[:5])  # First 5 for brevity
 }
 
-def handle_personal_questions(command):
-    """Handle personal questions about the assistant
+def match_personal_questions(command):
+    """Recognise questions about the assistant and pick the answer
     
-    Only handle if there's no other explicit intent (translate, convert, language, etc)
+    Only match if there's no other explicit intent (translate, convert, language, etc)
     This ensures queries like "who are you in Bengali" go to Gemini for translation
     """
+    command = as_command(command)
     # Check if this is about the creator
     if re.search(r'\b(who\s+is|do\s+you\s+know)\s+(babin|b a b i n|babin\s+bid)\b', command, re.IGNORECASE):
         if re.search(r'\bwho\s+is\b', command, re.IGNORECASE):
@@ -41,34 +44,37 @@ def handle_personal_questions(command):
             response = (f"Yes, I know him! Babin Bid is my creator. He developed me (EchoMind) using "
                        f"{CREATOR_INFO['tech_stack']}, Google Speech Recognition, and other modern technologies. "
                        f"Because of him, I can understand your voice commands and provide intelligent responses.")
-        
-        speak(response)
-        log_interaction(command, response, source="local")
-        return True
+        return Match("creator", command, {"response": response})
     
     # Check if this is about who built/made the assistant
     if re.search(r'\bwho\s+(built|build|made|make|created)\s+you\b', command, re.IGNORECASE):
         response = (f"Babin Bid is my creator and the developer of EchoMind. "
                    f"He built me using {CREATOR_INFO['tech_stack']} and many other technologies "
                    f"to create a voice assistant that can understand and respond to commands.")
-        speak(response)
-        log_interaction(command, response, source="local")
-        return True
+        return Match("creator", command, {"response": response})
     
     # Check if there are other explicit intents that override personal questions
     # Include language names to catch queries like "who are you in bengali"
     override_keywords = r'\b(translate|convert|language|meaning|definition|spell|pronounce|write|encode|decode|in\s+(bengali|hindi|spanish|french|german|gujarati|tamil|telugu|kannada|marathi|punjabi|urdu|arabic|chinese|japanese|korean|russian|portuguese|italian|thai|vietnamese))\b'
     if re.search(override_keywords, command, re.IGNORECASE):
         # Don't handle personal questions if user is asking for translation/conversion
-        return False
+        return None
     
     if re.search(r'\b(how are you|how do you do)\b', command, re.IGNORECASE):
-        speak("I'm doing well, thank you! How can I assist you?")
-        log_interaction(command, "I'm doing well, thank you! How can I assist you?", source="local")
-        return True
+        return Match("wellbeing", command, {"response": "I'm doing well, thank you! How can I assist you?"})
     elif re.search(r'\b(your name|who are you|what are you)\b', command, re.IGNORECASE):
-        speak("I am EchoMind, your voice assistant.")
-        log_interaction(command, "I am EchoMind, your voice assistant.", source="local")
-        return True
+        return Match("identity", command, {"response": "I am EchoMind, your voice assistant."})
     
-    return False
+    return None
+
+def execute_personal_questions(match):
+    """Speak the prepared answer"""
+    response = match.slots["response"]
+    speak(response)
+    log_interaction(match.command, response, source="local")
+    return True
+
+def handle_personal_questions(command):
+    """Handle personal questions about the assistant"""
+    match = match_personal_questions(command)
+    return execute_personal_questions(match) if match else False
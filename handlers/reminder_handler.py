@@ -1,29 +1,54 @@
 """Reminder handler - Set and monitor reminders/tasks"""
-import re
 import threading
 import time
 import datetime
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
 # List to store active reminders: {"hour": HH, "minute": MM, "period": "AM/PM", "label": "task", "triggered": False}
 ACTIVE_REMINDERS = []
 REMINDER_THREAD_STARTED = False
 
-def handle_reminder(command):
+def match_reminder(command):
     """
-    Handle reminder commands.
+    Recognise reminder commands and the time they refer to.
     Supports: Set ("remind me to...", "set a reminder for..."), Remove, and List.
     """
-    global ACTIVE_REMINDERS
-    command_lower = command.lower()
+    command = as_command(command)
+    command_lower = command.lowered
     
     # Filter: Listen for keywords related to reminders or timers
     if not any(word in command_lower for word in ["remind", "reminder", "alarm", "wake me up"]):
-        return False
+        return None
 
-    # 1. HANDLE LISTING REMINDERS
+    # 1. LISTING REMINDERS
     if any(word in command_lower for word in ["list", "show", "what", "check"]):
+        return Match("list_reminders", command)
+
+    # 2. REMOVING REMINDERS
+    if any(word in command_lower for word in ["remove", "cancel", "delete", "clear", "stop"]):
+        return Match("remove_reminder", command, {"time": command.times[0] if command.times else None})
+
+    # 3. SETTING REMINDERS
+    # Broadened matching to catch "9:48 PM" directly or "remind me at 9:48"
+    if command.times:
+        hour, minute, period = command.times[0]
+        
+        # Validation for 12h vs 24h
+        if hour > 12 and period:
+            period = None # PM/AM not valid for 24h format
+        return Match("set_reminder", command, {"time": (hour, minute, period)})
+    
+    return None
+
+def execute_reminder(match):
+    """List, remove or set a reminder"""
+    global ACTIVE_REMINDERS
+    command = match.command
+
+    if match.intent == "list_reminders":
         active = [r for r in ACTIVE_REMINDERS if not r["triggered"]]
         if not active:
             speak("You have no active reminders.")
@@ -34,13 +59,9 @@ def handle_reminder(command):
                 speak(f"One at {display}")
         return True
 
-    # 2. HANDLE REMOVING REMINDERS
-    if any(word in command_lower for word in ["remove", "cancel", "delete", "clear", "stop"]):
-        time_match = re.search(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', command_lower)
-        if time_match:
-            h = int(time_match.group(1))
-            m = int(time_match.group(2)) if time_match.group(2) else 0
-            p = time_match.group(3).upper() if time_match.group(3) else None
+    if match.intent == "remove_reminder":
+        if match.slots["time"]:
+            h, m, p = match.slots["time"]
             
             initial_count = len(ACTIVE_REMINDERS)
             # Remove matching reminder
@@ -60,43 +81,35 @@ def handle_reminder(command):
                 speak("You don't have any reminders to remove.")
             return True
 
-    # 3. HANDLE SETTING REMINDERS
-    # Broadened matching to catch "9:48 PM" directly or "remind me at 9:48"
-    time_match = re.search(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', command_lower)
-
-    if time_match:
-        hour = int(time_match.group(1))
-        minute = int(time_match.group(2)) if time_match.group(2) else 0
-        period = time_match.group(3).upper() if time_match.group(3) else None
-        
-        # Validation for 12h vs 24h
-        if hour > 12 and period:
-            period = None # PM/AM not valid for 24h format
-        if hour > 23 or minute > 59:
-            speak("That's an invalid time. Please try again.")
-            return True
+    hour, minute, period = match.slots["time"]
+    if hour > 23 or minute > 59:
+        speak("That's an invalid time. Please try again.")
+        return True
 
-        display = f"{hour}:{minute:02d} {period if period else ''}".strip()
-        
-        # Avoid duplicate identical reminders
-        if any(r for r in ACTIVE_REMINDERS if r['hour'] == hour and r['minute'] == minute and r['period'] == period and not r['triggered']):
-             speak(f"You already have a reminder set for {display}.")
-             return True
+    display = f"{hour}:{minute:02d} {period if period else ''}".strip()
+    
+    # Avoid duplicate identical reminders
+    if any(r for r in ACTIVE_REMINDERS if r['hour'] == hour and r['minute'] == minute and r['period'] == period and not r['triggered']):
+         speak(f"You already have a reminder set for {display}.")
+         return True
 
-        ACTIVE_REMINDERS.append({
-            "hour": hour,
-            "minute": minute,
-            "period": period,
-            "triggered": False
-        })
-        
-        speak(f"Ok, I will remind you at {display}.")
-        log_interaction(command, f"Reminder set for {display}", source="local")
-        
-        _start_reminder_monitor()
-        return True
+    ACTIVE_REMINDERS.append({
+        "hour": hour,
+        "minute": minute,
+        "period": period,
+        "triggered": False
+    })
     
-    return False
+    speak(f"Ok, I will remind you at {display}.")
+    log_interaction(command, f"Reminder set for {display}", source="local")
+    
+    _start_reminder_monitor()
+    return True
+
+def handle_reminder(command):
+    """Handle reminder commands"""
+    match = match_reminder(command)
+    return execute_reminder(match) if match else False
 
 def _start_reminder_monitor():
     """Start the background thread to check reminders"""
@@ -6,6 +6,8 @@ import webbrowser
 from config.settings import OS
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
 
 def open_resume_windows(file_path):
@@ -76,8 +78,8 @@ def open_resume(file_path):
         return False
 
 
-def handle_resume_opening(command):
-    """Handle resume opening commands
+def match_resume_opening(command):
+    """Recognise requests to open the resume
     
     Supports:
     - "Open my resume"
@@ -89,21 +91,30 @@ def handle_resume_opening(command):
     - "Curriculum vitae"
     - Misspellings: "curriculam vitae", etc.
     """
-    command_lower = command.lower()
+    command = as_command(command)
+    command_lower = command.lowered
     
     # Check if command contains resume-related keywords (with flexibility for spacing and misspellings)
     # Supports: resume, cv, c v, curriculum vitae, curricula, curriculam, etc.
     resume_pattern = r'\b(resume|c\.?v\.?|c\s+v|curricul[au]m\s+vitae|cv\.?)\b'
     if not re.search(resume_pattern, command_lower):
-        return False
+        return None
     
     # Check if it's a request to open
     if not re.search(r'\b(open|show|display|view|launch|start)\b', command_lower):
-        return False
+        return None
     
     # Resume file path - customize this to your actual resume location
     resume_path = "file:///E:/Personal%20Informations/Babin_Bid_Resume.pdf"
     
+    return Match("open_resume", command, {"path": resume_path})
+
+
+def execute_resume_opening(match):
+    """Open the resume file"""
+    command = match.command
+    resume_path = match.slots["path"]
+    
     try:
         success = open_resume(resume_path)
         
@@ -120,3 +131,9 @@ def handle_resume_opening(command):
         speak("Sorry, I couldn't open your resume.")
         log_interaction(command, f"Resume error: {e}", source="local")
         return True
+
+
+def handle_resume_opening(command):
+    """Handle resume opening commands"""
+    match = match_resume_opening(command)
+    return execute_resume_opening(match) if match else False
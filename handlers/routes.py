@@ -0,0 +1,194 @@
+"""Ordered route table used by main.route_command
+
+Each route names a handler and the trigger words that must appear in a
+command before the handler is worth calling. The list order is the routing
+priority: the first handler that claims a command wins.
+
+Triggers mirror the gate at the top of each handler:
+- keywords: whole words, matched per token
+- substrings: raw substring checks and multi-word phrases
+- single_word: the handler is also a candidate for any one-word command
+- volatile: the handler may decline for reasons other than the text itself
+  (network lookups, device state, launch failures), so its verdicts are not
+  safe to reuse from the routing cache
+- concurrent: the handler only looks things up and speaks (no windows,
+  keystrokes or launched programs), so within a multi-intent command it can
+  run alongside the other steps (see utils/multi_intent.py)
+- compound: the handler parses "X and Y" itself ("open notepad and write
+  ..."), so a command it claims is not split on "and"
+
+matcher/executor are the handler's side-effect-free match_* function and its
+execute_* counterpart (see handlers/match.py). A route without them is called
+through the legacy handle_* signature.
+"""
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from config.settings import THANK_YOU_KEYWORDS
+from handlers.thank_you_handler import handle_thank_you, match_thank_you, execute_thank_you
+from handlers.greeting_handler import handle_greeting, match_greeting, execute_greeting
+from handlers.time_handler import handle_time, match_time, execute_time
+from handlers.date_handler import handle_date, match_date, execute_date
+from handlers.simple_weather_handler import handle_simple_city_weather, match_simple_city_weather, execute_simple_city_weather
+from handlers.weather_handler import handle_weather, match_weather, execute_weather
+from handlers.web_handler import (
+    handle_browser_search, match_browser_search, execute_browser_search,
+    handle_website_opening, match_website_opening, execute_website_opening,
+    handle_whatsapp_web, match_whatsapp_web, execute_whatsapp_web,
+)
+from handlers.file_handler import handle_file_opening, match_file_opening, execute_file_opening
+from handlers.file_writing_handler import handle_file_writing, match_file_writing, execute_file_writing
+from handlers.app_handler import handle_app_opening, match_app_opening, execute_app_opening
+from handlers.personal_handler import handle_personal_questions, match_personal_questions, execute_personal_questions
+from handlers.text_input_handler import handle_text_input, match_text_input, execute_text_input
+from handlers.brightness_handler import handle_brightness, match_brightness, execute_brightness
+from handlers.resume_handler import handle_resume_opening, match_resume_opening, execute_resume_opening
+from handlers.close_app_handler import handle_app_closing, match_app_closing, execute_app_closing
+from handlers.tab_navigation_handler import handle_tab_navigation, match_tab_navigation, execute_tab_navigation
+from handlers.system_folder_handler import handle_system_folder_opening, match_system_folder_opening, execute_system_folder_opening
+from handlers.music_handler import (
+    handle_play_music, match_play_music, execute_play_music,
+    handle_play_on_youtube, match_play_on_youtube, execute_play_on_youtube,
+)
+from handlers.exit_handler import handle_exit, match_exit, execute_exit
+from handlers.battery_handler import handle_battery_status, match_battery_status, execute_battery_status
+from handlers.usb_detection_handler import handle_usb_detection, match_usb_detection, execute_usb_detection
+from handlers.reminder_handler import handle_reminder, match_reminder, execute_reminder
+from handlers.volume_handler import handle_volume, match_volume, execute_volume
+from handlers.cricket_handler import handle_cricket_score, match_cricket_score, execute_cricket_score
+from handlers.emoji_handler import handle_emoji_mode, match_emoji_mode, execute_emoji_mode
+
+
+class Route(NamedTuple):
+    """A handler together with the triggers that make it a routing candidate"""
+    name: str
+    handler: Callable
+    keywords: Tuple[str, ...] = ()
+    substrings: Tuple[str, ...] = ()
+    single_word: bool = False
+    volatile: bool = False
+    matcher: Optional[Callable] = None
+    executor: Optional[Callable] = None
+    concurrent: bool = False
+    compound: bool = False
+
+
+ROUTES = [
+    Route("Text input", handle_text_input,
+          matcher=match_text_input, executor=execute_text_input,
+          keywords=("text", "manual"),
+          volatile=True),
+    Route("Thank you", handle_thank_you,
+          matcher=match_thank_you, executor=execute_thank_you,
+          substrings=tuple(THANK_YOU_KEYWORDS),
+          concurrent=True),
+    Route("Greeting", handle_greeting,
+          matcher=match_greeting, executor=execute_greeting,
+          keywords=("hello", "hi", "hey", "greetings"),
+          concurrent=True),
+    Route("Emoji mode", handle_emoji_mode,
+          matcher=match_emoji_mode, executor=execute_emoji_mode,
+          substrings=("emoji",)),
+    Route("Time", handle_time,
+          matcher=match_time, executor=execute_time,
+          keywords=("time",),
+          concurrent=True),
+    Route("Date", handle_date,
+          matcher=match_date, executor=execute_date,
+          keywords=("date", "day"),
+          concurrent=True),
+    Route("Resume opening", handle_resume_opening,
+          matcher=match_resume_opening, executor=execute_resume_opening,
+          keywords=("resume", "cv", "c", "curriculum", "curriculam")),
+    Route("USB detection", handle_usb_detection,
+          matcher=match_usb_detection, executor=execute_usb_detection,
+          substrings=("detect", "connected", "any usb", "is there", "how many", "list",
+                      "available", "pendrive", "pen drive", "flash drive", "external drive",
+                      "removable", "storage device", "drives present"),
+          concurrent=True),
+    Route("Browser search", handle_browser_search,
+          matcher=match_browser_search, executor=execute_browser_search,
+          keywords=("chrome", "firefox", "edge", "google", "browser"),
+          volatile=True),
+    Route("Website opening", handle_website_opening,
+          matcher=match_website_opening, executor=execute_website_opening,
+          keywords=("open", "visit", "go"),
+          volatile=True),
+    Route("Simple city weather", handle_simple_city_weather,
+          matcher=match_simple_city_weather, executor=execute_simple_city_weather,
+          single_word=True,
+          volatile=True,
+          concurrent=True),
+    Route("Weather", handle_weather,
+          matcher=match_weather, executor=execute_weather,
+          keywords=("weather", "forecast", "temperature"),
+          volatile=True,
+          concurrent=True),
+    Route("Cricket Score", handle_cricket_score,
+          matcher=match_cricket_score, executor=execute_cricket_score,
+          keywords=("cricket", "score", "match", "t20", "world", "ipl"),
+          volatile=True,
+          concurrent=True),
+    Route("WhatsApp", handle_whatsapp_web,
+          matcher=match_whatsapp_web, executor=execute_whatsapp_web,
+          keywords=("whatsapp",),
+          volatile=True,
+          compound=True),
+    Route("Battery status", handle_battery_status,
+          matcher=match_battery_status, executor=execute_battery_status,
+          substrings=("battery", "charge", "charging"),
+          concurrent=True),
+    Route("Volume control", handle_volume,
+          matcher=match_volume, executor=execute_volume,
+          keywords=("volume", "sound", "mute", "unmute", "increase", "decrease", "louder", "quieter")),
+    Route("File writing", handle_file_writing,
+          matcher=match_file_writing, executor=execute_file_writing,
+          keywords=("notepad", "notebook", "word", "document", "wordpad"),
+          volatile=True,
+          compound=True),
+    Route("Music (YouTube play)", handle_play_on_youtube,
+          matcher=match_play_on_youtube, executor=execute_play_on_youtube,
+          keywords=("youtube",),
+          volatile=True),
+    Route("Music (play)", handle_play_music,
+          matcher=match_play_music, executor=execute_play_music,
+          keywords=("play",),
+          volatile=True),
+    Route("File opening", handle_file_opening,
+          matcher=match_file_opening, executor=execute_file_opening,
+          keywords=("open", "show"),
+          volatile=True),
+    Route("System folder opening", handle_system_folder_opening,
+          matcher=match_system_folder_opening, executor=execute_system_folder_opening,
+          keywords=("open", "access", "go", "navigate", "close", "eject", "unmount"),
+          volatile=True),
+    Route("App opening", handle_app_opening,
+          matcher=match_app_opening, executor=execute_app_opening,
+          keywords=("open", "launch", "start"),
+          volatile=True),
+    Route("Personal questions", handle_personal_questions,
+          matcher=match_personal_questions, executor=execute_personal_questions,
+          keywords=("who", "know", "how", "name", "what"),
+          concurrent=True),
+    Route("Brightness control", handle_brightness,
+          matcher=match_brightness, executor=execute_brightness,
+          keywords=("brightness",)),
+    Route("Tab navigation", handle_tab_navigation,
+          matcher=match_tab_navigation, executor=execute_tab_navigation,
+          keywords=("move", "go", "switch", "navigate", "next", "previous", "prev", "tab", "last", "first"),
+          volatile=True),
+    Route("Reminder", handle_reminder,
+          matcher=match_reminder, executor=execute_reminder,
+          substrings=("remind", "alarm", "wake me up"),
+          concurrent=True, compound=True),
+    Route("App closing", handle_app_closing,
+          matcher=match_app_closing, executor=execute_app_closing,
+          substrings=("close", "shut", "kill", "terminate", "stop", "minimise", "minimize", "tab"),
+          volatile=True),
+    Route("Exit", handle_exit,
+          matcher=match_exit, executor=execute_exit,
+          keywords=("exit", "quit", "stop", "bye", "goodbye", "terminate",
+                    "close", "end", "finish", "wrap",
+                    "leave", "go", "depart",
+                    "all", "nothing", "no", "done",
+                    "good", "see", "take", "farewell")),
+]
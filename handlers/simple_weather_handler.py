@@ -4,35 +4,49 @@ import os
 from utils.weather import get_weather
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
-def handle_simple_city_weather(command):
-    """Handle simple city name as weather query"""
+# Single words that are never treated as a city name
+BLACKLIST_TOKENS = (
+    "why", "what", "when", "where", "how", "do", "did", "does", 
+    "don't", "didn't", "tell", "is", "are", "be", "open", "hello", "hi",
+    "yes", "no", "ok", "okay", "sure", "thanks", "thank", "welcome",
+    "please", "sorry", "excuse", "bye", "goodbye", "quit", "exit",
+    "next", "stop", "continue", "repeat", "again", "help",
+    "search", "api", "map", "maps", "database", "website", "web",
+    "google", "chrome", "firefox", "edge", "browser",
+    "open", "visit", "go", "check", "find", "look", "show"
+)
+
+def match_simple_city_weather(command):
+    """Treat a lone word as a possible city name (no network lookup here)"""
+    command = as_command(command)
+    words = command.split()
+    
+    # Single word city - check blacklist of common question/command words
+    if len(words) == 1 and re.match(r"^[a-zA-Z]{3,40}$", command):
+        if command.lowered not in BLACKLIST_TOKENS:
+            return Match("city_weather", command, {"city": str(command)})
+    return None
+
+def execute_simple_city_weather(match):
+    """Look up the weather; declines if the word is not a known city"""
     try:
-        words = command.split()
-        simple_city_candidate = False
-        
-        # Single word city - check blacklist of common question/command words
-        if len(words) == 1 and re.match(r"^[a-zA-Z]{3,40}$", command):
-            blacklist_tokens = (
-                "why", "what", "when", "where", "how", "do", "did", "does", 
-                "don't", "didn't", "tell", "is", "are", "be", "open", "hello", "hi",
-                "yes", "no", "ok", "okay", "sure", "thanks", "thank", "welcome",
-                "please", "sorry", "excuse", "bye", "goodbye", "quit", "exit",
-                "next", "stop", "continue", "repeat", "again", "help",
-                "search", "api", "map", "maps", "database", "website", "web",
-                "google", "chrome", "firefox", "edge", "browser",
-                "open", "visit", "go", "check", "find", "look", "show"
-            )
-            if command.lower() not in blacklist_tokens:
-                simple_city_candidate = True
-        
-        if simple_city_candidate:
-            weather_info = get_weather(command)
-            if weather_info and not weather_info.lower().startswith("sorry"):
-                speak(weather_info)
-                log_interaction(command, weather_info, source="local")
-                return True
+        weather_info = get_weather(match.slots["city"])
+        if weather_info and not weather_info.lower().startswith("sorry"):
+            speak(weather_info)
+            log_interaction(match.command, weather_info, source="local")
+            return True
     except Exception:
         pass
     
     return False
+
+def handle_simple_city_weather(command):
+    """Handle simple city name as weather query"""
+    try:
+        match = match_simple_city_weather(command)
+    except Exception:
+        return False
+    return execute_simple_city_weather(match) if match else False
@@ -5,6 +5,8 @@ import os
 from config.settings import OS
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
 
 # Common system folders mapping
@@ -36,8 +38,8 @@ SYSTEM_FOLDERS = {
 }
 
 
-def handle_system_folder_opening(command):
-    r"""Handle opening system folders and drives
+def match_system_folder_opening(command):
+    r"""Recognise system folder and drive requests
     
     Supports:
     - "Open Desktop" → Opens C:\Users\[username]\Desktop
@@ -56,16 +58,18 @@ def handle_system_folder_opening(command):
     - "Close the D drive" → Ejects D:\ 
     - "Eject drive C" → Ejects C:\ (if removable)
     """
-    command_lower = command.lower().strip()
+    command = as_command(command)
+    command_lower = command.lowered.strip()
     
     # Check if this is a close/eject drive command
     if re.search(r'\b(?:close|eject|unmount)\s+(?:the\s+)?(?:drive\s+)?[a-z]:', command_lower) or \
        re.search(r'\b(?:close|eject|unmount)\s+(?:the\s+)?(?:drive\s+)?[a-z]\s+drive\b', command_lower):
-        return _handle_drive_closing(command)
+        drive_letter = _parse_drive_to_close(command_lower)
+        return Match("close_drive", command, {"drive": drive_letter}) if drive_letter else None
     
     # Check if this is NOT a system folder/drive opening command
     if not re.search(r'\b(open|access|go\s+to|navigate\s+to)\b.*\b(desktop|downloads|documents|pictures|music|videos|drive|partition)\b', command_lower):
-        return False
+        return None
     
     # PATTERN 1: Open system folders
     # "Open Desktop", "Open Downloads", etc.
@@ -75,7 +79,7 @@ def handle_system_folder_opening(command):
         
         folder_match = re.search(folder_regex, command_lower)
         if folder_match:
-            return _open_system_folder(folder_key, command)
+            return Match("open_folder", command, {"folder": folder_key})
     
     # PATTERN 2: Open drives
     # "Open drive C", "Open C drive", "Open the D drive", etc.
@@ -84,9 +88,24 @@ def handle_system_folder_opening(command):
     
     if drive_match:
         drive_letter = drive_match.group(1).upper()
-        return _open_drive(drive_letter, command)
+        return Match("open_drive", command, {"drive": drive_letter})
     
-    return False
+    return None
+
+
+def execute_system_folder_opening(match):
+    """Open the matched folder or drive, or eject the matched drive"""
+    if match.intent == "close_drive":
+        return _close_drive(match.slots["drive"], match.command)
+    if match.intent == "open_folder":
+        return _open_system_folder(match.slots["folder"], match.command)
+    return _open_drive(match.slots["drive"], match.command)
+
+
+def handle_system_folder_opening(command):
+    """Handle opening system folders and drives"""
+    match = match_system_folder_opening(command)
+    return execute_system_folder_opening(match) if match else False
 
 
 def _open_system_folder(folder_key, command):
@@ -119,8 +138,6 @@ def _open_system_folder(folder_key, command):
             log_interaction(command, f"Opened {folder_name} folder: {folder_path}", source="local")
             
             # Proactive follow-up
-            import time as _time
-            _time.sleep(1)
             speak("I am listening to you.... please tell me what to do next")
             
             return True
@@ -131,8 +148,6 @@ def _open_system_folder(folder_key, command):
             log_interaction(command, f"Opened {folder_name} folder: {folder_path}", source="local")
             
             # Proactive follow-up
-            import time as _time
-            _time.sleep(1)
             speak("I am listening to you.... please tell me what to do next")
             
             return True
@@ -143,8 +158,6 @@ def _open_system_folder(folder_key, command):
             log_interaction(command, f"Opened {folder_name} folder: {folder_path}", source="local")
             
             # Proactive follow-up
-            import time as _time
-            _time.sleep(1)
             speak("I am listening to you.... please tell me what to do next")
             
             return True
@@ -178,8 +191,6 @@ def _open_drive(drive_letter, command):
             log_interaction(command, f"Opened drive {drive_letter}", source="local")
             
             # Proactive follow-up
-            import time as _time
-            _time.sleep(1)
             speak("I am listening to you.... please tell me what to do next")
             
             return True
@@ -236,8 +247,8 @@ def get_available_system_folders():
     return available
 
 
-def _handle_drive_closing(command):
-    """Handle closing/ejecting drives
+def _parse_drive_to_close(command_lower):
+    """Extract the drive letter from a close/eject command
     
     Supports:
     - "Close drive C" → Safely eject C drive (if removable)
@@ -246,8 +257,6 @@ def _handle_drive_closing(command):
     - "Close the F drive" → Safely eject F drive
     - "Unmount drive D" → Safely unmount D drive
     """
-    command_lower = command.lower().strip()
-    
     # Extract drive letter from command
     # Patterns: "close drive C", "close C drive", "close the D drive"
     drive_patterns = [
@@ -262,9 +271,11 @@ def _handle_drive_closing(command):
             drive_letter = match.group(1).upper()
             break
     
-    if not drive_letter:
-        return False
-    
+    return drive_letter
+
+
+def _close_drive(drive_letter, command):
+    """Safely eject a drive"""
     try:
         if OS == "windows":
             # Check if drive exists
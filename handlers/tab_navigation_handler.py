@@ -4,6 +4,8 @@ import time
 from config.settings import OS
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
 
 # Current tab tracking
@@ -21,8 +23,8 @@ def get_current_tab():
     return CURRENT_TAB
 
 
-def handle_tab_navigation(command):
-    """Handle tab navigation commands using Ctrl+number
+def match_tab_navigation(command):
+    """Recognise tab navigation commands and the target tab
     
     Supports:
     - "move to 1st tab" → Presses Ctrl+1
@@ -35,23 +37,22 @@ def handle_tab_navigation(command):
     - "previous tab" → Presses Ctrl+Shift+Tab
     - "move to the 2nd tab" → Presses Ctrl+2
     
-    Returns True if command was handled, False otherwise
+    Returns a Match (intent goto_tab/next_tab/previous_tab/last_tab/tab_out_of_range) or None
     """
-    command_lower = command.lower().strip()
+    command = as_command(command)
+    command_lower = command.lowered.strip()
     
     # Relaxed initial check to catch standalone "next tab", "previous tab", "first tab", etc.
     if not re.search(r'\b(move|go|switch|navigate|next|previous|prev|tab|last|first)\b', command_lower):
-        return False
+        return None
     
     # Pattern 1: Numeric tab numbers - "move to 3rd tab" or "tab 5"
     numeric_match = re.search(r'(?:move|go|switch|navigate)?\s*(?:to)?\s*(?:the)?\s*(\d+)(?:st|nd|rd|th)?\s*tab', command_lower)
     if numeric_match:
         tab_num = int(numeric_match.group(1))
         if 1 <= tab_num <= 8:
-            return _navigate_to_tab(tab_num, command)
-        else:
-            speak(f"Tab {tab_num} is out of range. Browsers support tabs 1 to 8 with Ctrl+number shortcut.")
-            return True
+            return Match("goto_tab", command, {"tab": tab_num})
+        return Match("tab_out_of_range", command, {"tab": tab_num, "spoken_as_word": False})
     
     # Pattern 2: Word-based tab numbers - "move to first tab"
     word_tabs = {
@@ -65,34 +66,54 @@ def handle_tab_navigation(command):
         tab_word = word_match.group(1)
         tab_num = word_tabs[tab_word]
         if tab_num <= 8:
-            return _navigate_to_tab(tab_num, command)
-        else:
-            speak("Tab position out of supported range. Use tabs 1 to 8.")
-            return True
+            return Match("goto_tab", command, {"tab": tab_num})
+        return Match("tab_out_of_range", command, {"tab": tab_num, "spoken_as_word": True})
     
     # Pattern 3: Next tab - "next tab"
     if re.search(r'\bnext\s+tab\b', command_lower):
-        return _navigate_next_tab(command)
+        return Match("next_tab", command)
     
     # Pattern 4: Previous tab - "previous tab"
     if re.search(r'\bprevious\s+tab\b|\bprev\s+tab\b', command_lower):
-        return _navigate_previous_tab(command)
+        return Match("previous_tab", command)
     
     # Pattern 5: Last tab - "move to last tab"
     if re.search(r'(?:move|go|switch|navigate)\s+(?:to)?\s*(?:the)?\s+last\s+tab', command_lower):
-        return _navigate_to_last_tab(command)
+        return Match("last_tab", command)
     
     # Pattern 6: Simple "tab X" format - "tab 3"
     simple_tab = re.search(r'^tab\s+(\d+)$', command_lower)
     if simple_tab:
         tab_num = int(simple_tab.group(1))
         if 1 <= tab_num <= 8:
-            return _navigate_to_tab(tab_num, command)
-        else:
-            speak(f"Tab {tab_num} is out of range. Browsers support tabs 1 to 8 with Ctrl+number shortcut.")
-            return True
+            return Match("goto_tab", command, {"tab": tab_num})
+        return Match("tab_out_of_range", command, {"tab": tab_num, "spoken_as_word": False})
     
-    return False
+    return None
+
+
+def execute_tab_navigation(match):
+    """Send the keyboard shortcut for the matched tab"""
+    command = match.command
+    if match.intent == "goto_tab":
+        return _navigate_to_tab(match.slots["tab"], command)
+    if match.intent == "next_tab":
+        return _navigate_next_tab(command)
+    if match.intent == "previous_tab":
+        return _navigate_previous_tab(command)
+    if match.intent == "last_tab":
+        return _navigate_to_last_tab(command)
+    if match.slots["spoken_as_word"]:
+        speak("Tab position out of supported range. Use tabs 1 to 8.")
+    else:
+        speak(f"Tab {match.slots['tab']} is out of range. Browsers support tabs 1 to 8 with Ctrl+number shortcut.")
+    return True
+
+
+def handle_tab_navigation(command):
+    """Handle tab navigation commands using Ctrl+number"""
+    match = match_tab_navigation(command)
+    return execute_tab_navigation(match) if match else False
 
 
 def _navigate_to_tab(tab_number, command):
@@ -3,14 +3,16 @@ import re
 import os
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 from clients import gemini_client
 from handlers.personal_handler import handle_personal_questions
 from handlers.exit_handler import handle_exit
 from handlers.thank_you_handler import handle_thank_you
 
 
-def handle_text_input(command):
-    """Handle text/text mode commands for manual input
+def match_text_input(command):
+    """Recognise requests to switch to typed input
     
     Detects keywords like:
     - "I want to give you a text message"
@@ -21,11 +23,15 @@ def handle_text_input(command):
     
     When detected, prompts user to type their question manually
     """
+    command = as_command(command)
+    if command.token_set.isdisjoint(("text", "manual")):
+        return None
+
     # Keywords that trigger text mode
     text_keywords = r'\b(text|text\s+mode|text\s+input|text\s+message|manual\s+input)\b'
     
     if not re.search(text_keywords, command, re.IGNORECASE):
-        return False
+        return None
     
     # Check if this is actually a request for text mode vs just mentioning the word "text"
     # Filter out commands like "text message to" which should go to messaging
@@ -33,8 +39,14 @@ def handle_text_input(command):
         # This might be a messaging command, not text mode
         # Only handle if it explicitly says "text mode" or "text input"
         if not re.search(r'\btext\s+(?:mode|input)\b', command, re.IGNORECASE):
-            return False
+            return None
     
+    return Match("text_mode", command)
+
+
+def execute_text_input(match):
+    """Prompt for typed input and answer it (returns "exit" to stop the loop)"""
+    command = match.command
     try:
         # Announce text mode activation
         speak("Entering text mode. Please type your question or command.")
@@ -98,6 +110,12 @@ def handle_text_input(command):
         return False
 
 
+def handle_text_input(command):
+    """Handle text/text mode commands for manual input"""
+    match = match_text_input(command)
+    return execute_text_input(match) if match else False
+
+
 def _process_text_input(text_input):
     """Process the manually typed text through Gemini
     
@@ -122,7 +140,8 @@ def _process_text_input(text_input):
                         chunks.append(chunk)
                 
                 if chunks:
-                    response = " ".join(chunks)
+                    # Chunks are raw text deltas: they join without separators
+                    response = "".join(chunks)
                     # Clean the response
                     cleaned = gemini_client.normalize_response(response)
                     final_response = gemini_client.strip_json_noise(cleaned)
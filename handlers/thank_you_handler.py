@@ -3,11 +3,23 @@ import re
 from config.settings import THANK_YOU_KEYWORDS
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
+
+def match_thank_you(command):
+    """Recognise thanks without side effects"""
+    command = as_command(command)
+    if any(phrase in command.lowered for phrase in THANK_YOU_KEYWORDS):
+        return Match("thank_you", command)
+    return None
+
+def execute_thank_you(match):
+    """Reply to the user's thanks"""
+    speak("You are most welcome.... Happy to help you")
+    log_interaction(match.command, "You are most welcome.... Happy to help you", source="local")
+    return True
 
 def handle_thank_you(command):
     """Handle thank you commands"""
-    if any(phrase in command for phrase in THANK_YOU_KEYWORDS):
-        speak("You are most welcome.... Happy to help you")
-        log_interaction(command, "You are most welcome.... Happy to help you", source="local")
-        return True
-    return False
+    match = match_thank_you(command)
+    return execute_thank_you(match) if match else False
@@ -3,12 +3,24 @@ import re
 from utils.voice_io import speak
 from utils.time_utils import get_time
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
+
+def match_time(command):
+    """Recognise time questions without side effects"""
+    command = as_command(command)
+    if "time" in command.token_set and re.search(r'\b(what time|what is the time|what\'s the time|current time|tell me the time|time now)\b', command, re.IGNORECASE):
+        return Match("time", command)
+    return None
+
+def execute_time(match):
+    """Speak the current time"""
+    time_str = get_time()
+    speak(f"The current time is {time_str}")
+    log_interaction(match.command, f"The current time is {time_str}", source="local")
+    return True
 
 def handle_time(command):
     """Handle time commands"""
-    if re.search(r'\b(what time|what is the time|what\'s the time|current time|tell me the time|time now)\b', command, re.IGNORECASE):
-        time_str = get_time()
-        speak(f"The current time is {time_str}")
-        log_interaction(command, f"The current time is {time_str}", source="local")
-        return True
-    return False
+    match = match_time(command)
+    return execute_time(match) if match else False
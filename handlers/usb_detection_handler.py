@@ -4,6 +4,8 @@ import threading
 import time
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 from config.settings import OS
 
 # Track connected USB devices
@@ -187,9 +189,10 @@ def stop_usb_monitoring():
     monitoring = False
 
 
-def handle_usb_detection(command):
-    """Handle USB detection queries"""
-    command_lower = command.lower()
+def match_usb_detection(command):
+    """Recognise USB detection queries (not USB definition questions)"""
+    command = as_command(command)
+    command_lower = command.lowered
     
     # Keywords that indicate USB DETECTION (not definition/information queries)
     detection_keywords = [
@@ -207,13 +210,20 @@ def handle_usb_detection(command):
     # Check if this is asking for USB information/definition (not detection)
     is_info_query = any(keyword in command_lower for keyword in exclusion_keywords)
     if is_info_query:
-        return False
+        return None
     
     # Check if this is a USB detection query
     is_usb_query = any(keyword in command_lower for keyword in detection_keywords)
     
     if not is_usb_query:
-        return False
+        return None
+    
+    return Match("usb_detection", command)
+
+
+def execute_usb_detection(match):
+    """List the removable drives that are currently connected"""
+    command = match.command
     
     # Get current USB devices
     current_usbs = get_connected_usbs()
@@ -233,3 +243,9 @@ def handle_usb_detection(command):
     speak(response)
     log_interaction(command, response, source="usb_detection")
     return True
+
+
+def handle_usb_detection(command):
+    """Handle USB detection queries"""
+    match = match_usb_detection(command)
+    return execute_usb_detection(match) if match else False
@@ -6,6 +6,11 @@ import time
 from config.settings import OS
 from utils.voice_io import speak
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
+
+# Words that make a command a volume-control candidate
+_VOLUME_WORDS = frozenset(("volume", "sound", "mute", "unmute", "increase", "decrease", "louder", "quieter"))
 
 # Flag to prevent F5 hotkey loop
 _F5_PRESS_IN_PROGRESS = False
@@ -284,45 +289,62 @@ def press_f5_key():
         _F5_PRESS_IN_PROGRESS = False
 
 
-def handle_volume(command):
-    """Handle volume control commands"""
-    if not re.search(r'\b(volume|sound|mute|unmute|increase|decrease|louder|quieter)\b', command, re.IGNORECASE):
-        return False
+def match_volume(command):
+    """Recognise volume commands and extract the requested percentage"""
+    command = as_command(command)
+    if command.token_set.isdisjoint(_VOLUME_WORDS):
+        return None
     
     # Exclude question/inquiry patterns (How to, What, Tell me, etc.) - should not trigger mute/unmute
     if re.search(r'\b(how|what|why|tell|explain|show|can you|could you|would you)\b', command, re.IGNORECASE):
-        return False
+        return None
+    
+    # Make sure mute/unmute is not just a percentage command like "volume 50" that contains word "mute"
+    is_level_command = re.search(r'set.*volume|volume\s*\d+|^\d+', command, re.IGNORECASE)
     
-    # Check for UNMUTE command - use F5 key
     # Patterns: "Unmute yourself", "Unmute system", "Unmute sound", "Unmute device sound", etc.
-    if re.search(r'\bunmute\b', command, re.IGNORECASE):
-        # Make sure it's not just a percentage command like "volume 50" that contains word "mute"
-        if not re.search(r'set.*volume|volume\s*\d+|^\d+', command, re.IGNORECASE):
-            success = press_f5_key()
-            if success:
-                speak("Unmuting sound")
-                log_interaction(command, "Sound unmuted via F5 key press", source="local")
-            else:
-                speak("Unmuting sound - F5 key method unavailable")
-                log_interaction(command, "Unmute requested (F5 method failed)", source="local")
-            return True
+    if re.search(r'\bunmute\b', command, re.IGNORECASE) and not is_level_command:
+        return Match("unmute", command)
     
-    # Check for MUTE command - use F5 key
     # Patterns: "Mute yourself", "Mute system", "Mute sound", "Mute device", "Mute the device sound", etc.
-    if re.search(r'\bmute\b', command, re.IGNORECASE):
-        # Make sure it's not just a percentage command like "volume 50" that contains word "mute"
-        if not re.search(r'set.*volume|volume\s*\d+|^\d+', command, re.IGNORECASE):
-            success = press_f5_key()
-            if success:
-                speak("Muting sound")
-                log_interaction(command, "Sound muted via F5 key press", source="local")
-            else:
-                speak("Muting sound - F5 key method unavailable")
-                log_interaction(command, "Mute requested (F5 method failed)", source="local")
-            return True
+    if re.search(r'\bmute\b', command, re.IGNORECASE) and not is_level_command:
+        return Match("mute", command)
     
-    # VOLUME UP - Increase volume using keyboard shortcut
     if re.search(r'\b(increase|up|louder)\b', command, re.IGNORECASE) and re.search(r'\bvolume\b', command, re.IGNORECASE):
+        return Match("volume_up", command)
+    
+    if re.search(r'\b(decrease|down|lower|quieter)\b', command, re.IGNORECASE) and re.search(r'\bvolume\b', command, re.IGNORECASE):
+        return Match("volume_down", command)
+    
+    # Try to parse a specific percentage - ONLY for explicit volume set commands
+    if re.search(r'(set\s+)?volume\s+to\s+(\d+)', command, re.IGNORECASE) or re.search(r'volume\s+at\s+(\d+)', command, re.IGNORECASE):
+        # Extract percentage more carefully
+        match = re.search(r'(\d{1,3})\s*%?(?:\s*percent)?', command)
+        if match:
+            return Match("set_volume", command, {"percentage": int(match.group(1))})
+    
+    # We matched volume/sound/mute but can't tell what to do - ask for clarification
+    return Match("volume_help", command)
+
+
+def execute_volume(match):
+    """Apply the matched volume change"""
+    command = match.command
+    
+    # UNMUTE / MUTE - use F5 key
+    if match.intent in ("unmute", "mute"):
+        success = press_f5_key()
+        action = "Unmuting" if match.intent == "unmute" else "Muting"
+        if success:
+            speak(f"{action} sound")
+            log_interaction(command, f"Sound {match.intent}d via F5 key press", source="local")
+        else:
+            speak(f"{action} sound - F5 key method unavailable")
+            log_interaction(command, f"{match.intent.capitalize()} requested (F5 method failed)", source="local")
+        return True
+    
+    # VOLUME UP - Increase volume using keyboard shortcut
+    if match.intent == "volume_up":
         success = False
         
         # Method 1: Use keyboard module with media keys
@@ -358,7 +380,7 @@ def handle_volume(command):
         return True
     
     # VOLUME DOWN - Decrease volume using keyboard shortcut
-    if re.search(r'\b(decrease|down|lower|quieter)\b', command, re.IGNORECASE) and re.search(r'\bvolume\b', command, re.IGNORECASE):
+    if match.intent == "volume_down":
         success = False
         
         # Method 1: Use keyboard module with media keys
@@ -393,30 +415,32 @@ def handle_volume(command):
         log_interaction(command, "Volume decreased" if success else "Volume down requested", source="local")
         return True
     
-    # Try to parse a specific percentage - ONLY for explicit volume set commands
-    if re.search(r'(set\s+)?volume\s+to\s+(\d+)', command, re.IGNORECASE) or re.search(r'volume\s+at\s+(\d+)', command, re.IGNORECASE):
-        # Extract percentage more carefully
-        match = re.search(r'(\d{1,3})\s*%?(?:\s*percent)?', command)
-        if match:
-            perc = int(match.group(1))
-            
-            # VALIDATE: Reject invalid percentages
-            if perc < 0 or perc > 100:
-                speak(f"Volume must be between 0 and 100 percent. You said {perc} percent which is invalid.")
-                log_interaction(command, f"Invalid volume {perc}% (out of range)", source="local")
-                return True
-            
-            success = set_volume(perc)
-            
-            if success:
-                speak(f"Volume set to {perc} percent")
-                log_interaction(command, f"Volume set to {perc}%", source="local")
-            else:
-                speak("Volume control attempted but may not be fully supported on this system.")
-                log_interaction(command, f"Volume set to {perc}% attempted", source="local")
+    if match.intent == "set_volume":
+        perc = match.slots["percentage"]
+        
+        # VALIDATE: Reject invalid percentages
+        if perc < 0 or perc > 100:
+            speak(f"Volume must be between 0 and 100 percent. You said {perc} percent which is invalid.")
+            log_interaction(command, f"Invalid volume {perc}% (out of range)", source="local")
             return True
+        
+        success = set_volume(perc)
+        
+        if success:
+            speak(f"Volume set to {perc} percent")
+            log_interaction(command, f"Volume set to {perc}%", source="local")
+        else:
+            speak("Volume control attempted but may not be fully supported on this system.")
+            log_interaction(command, f"Volume set to {perc}% attempted", source="local")
+        return True
     
-    # If we matched volume/sound/mute but didn't handle it yet, ask for clarification
+    # Volume command we couldn't interpret - ask for clarification
     speak("I can change volume if you tell me a percentage, for example 'set volume to 60 percent', or say 'volume up', 'volume down', 'mute', or 'unmute'.")
     log_interaction(command, "Volume command - clarification needed", source="local")
     return True
+
+
+def handle_volume(command):
+    """Handle volume control commands"""
+    match = match_volume(command)
+    return execute_volume(match) if match else False
@@ -4,13 +4,18 @@ from config.settings import WEATHER_CITY_BLACKLIST
 from utils.voice_io import speak, listen
 from utils.weather import get_weather
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
-def handle_weather(command):
-    """Handle weather commands with multi-pattern detection"""
+def match_weather(command):
+    """Recognise weather requests and extract the city (None if not given)"""
+    command = as_command(command)
+    if command.token_set.isdisjoint(("weather", "forecast", "temperature")):
+        return None
     
     # Skip if this is a browser search command (has browser keyword + on/in separator)
     if re.search(r'\b(on|in)\b.*\b(chrome|firefox|edge|google|browser)\b', command, re.IGNORECASE):
-        return False
+        return None
     
     # Check for weather-related keywords
     weather_match = re.search(r'\b(weather|forecast|temperature)\b.*\b(in|of|at|for|around)\s+(\w+)\b', command, re.IGNORECASE) or \
@@ -18,7 +23,7 @@ def handle_weather(command):
                    re.search(r'\b(weather|forecast|temperature|current weather)\b', command, re.IGNORECASE)
     
     if not weather_match:
-        return False
+        return None
     
     # Try to extract city name from the command
     city = None
@@ -36,6 +41,12 @@ def handle_weather(command):
             if potential_city not in WEATHER_CITY_BLACKLIST:
                 city = match2.group(1)
     
+    return Match("weather", command, {"city": city})
+
+def execute_weather(match):
+    """Fetch and speak the weather, asking for the city if it was not given"""
+    city = match.slots["city"]
+    
     # If no city found, ask user
     if not city:
         speak("Which city would you like the weather for?")
@@ -44,7 +55,12 @@ def handle_weather(command):
     if city:
         weather_info = get_weather(city)
         speak(weather_info)
-        log_interaction(command, weather_info, source="local")
+        log_interaction(match.command, weather_info, source="local")
         return True
     
     return False
+
+def handle_weather(command):
+    """Handle weather commands with multi-pattern detection"""
+    match = match_weather(command)
+    return execute_weather(match) if match else False
@@ -2,10 +2,11 @@
 import re
 import subprocess
 import webbrowser
-import time
 from config.settings import OS, WEBSITE_MAP
 from utils.voice_io import speak, listen
 from utils.logger import log_interaction
+from utils.text_processing import as_command
+from handlers.match import Match
 
 def handle_web_search(command):
     """Handle web search commands"""
@@ -15,82 +16,75 @@ def handle_web_search(command):
     log_interaction(command, f"Search opened: {command}", source="local")
 
 
-def handle_whatsapp_web(command):
-    """Handle WhatsApp Web commands"""
-    command_lower = command.lower()
+def match_whatsapp_web(command):
+    """Recognise WhatsApp Web requests and the contact to message, if any"""
+    command = as_command(command)
+    command_lower = command.lowered
     
     # Check if it's a WhatsApp command
-    if not re.search(r'\b(open|launch|start)\b.*\bwhatsapp\b', command_lower):
-        return False
+    if "whatsapp" not in command.token_set or not re.search(r'\b(open|launch|start)\b.*\bwhatsapp\b', command_lower):
+        return None
     
     # Check if user wants to message someone
-    if re.search(r'\bmessage\b|\btext\b|\bsend\b', command_lower):
+    contact = None
+    is_message = bool(re.search(r'\bmessage\b|\btext\b|\bsend\b', command_lower))
+    if is_message:
         # Extract contact name if possible
         message_match = re.search(r'(?:message|text|send)\s+(?:to\s+)?(.+?)(?:\s+(?:on|via))?$', command_lower)
         contact = message_match.group(1).strip() if message_match else None
+    
+    return Match("message_whatsapp" if is_message else "open_whatsapp", command, {"contact": contact})
+
+def execute_whatsapp_web(match):
+    """Open WhatsApp Web in the browser"""
+    command = match.command
+    contact = match.slots["contact"]
+    
+    try:
+        # Open WhatsApp Web
+        whatsapp_url = "https://web.whatsapp.com/"
+        if OS == "windows":
+            subprocess.Popen(["cmd", "/c", f"start chrome {whatsapp_url}"], shell=True)
+        elif OS == "darwin":
+            subprocess.Popen(["open", "-a", "Google Chrome", whatsapp_url])
+        elif OS == "linux":
+            subprocess.Popen(["google-chrome", whatsapp_url])
         
-        try:
-            # Open WhatsApp Web
-            whatsapp_url = "https://web.whatsapp.com/"
-            if OS == "windows":
-                subprocess.Popen(["cmd", "/c", f"start chrome {whatsapp_url}"], shell=True)
-            elif OS == "darwin":
-                subprocess.Popen(["open", "-a", "Google Chrome", whatsapp_url])
-            elif OS == "linux":
-                subprocess.Popen(["google-chrome", whatsapp_url])
-            
-            speak("Opening WhatsApp Web")
-            
-            if contact:
-                speak(f"To message {contact}, please select their chat from WhatsApp and type your message.")
-                log_interaction(command, f"Opened WhatsApp Web for {contact}", source="local")
-            else:
-                log_interaction(command, "Opened WhatsApp Web", source="local")
-            
-            # Proactive follow-up
-            time.sleep(1)
-            speak("I am listening to you.... please tell me what to do next")
-            
-            return True
-        except Exception as e:
-            speak("Sorry, I couldn't open WhatsApp Web.")
-            print(f"WhatsApp error: {e}")
-            return False
-    else:
-        # Just open WhatsApp Web
-        try:
-            whatsapp_url = "https://web.whatsapp.com/"
-            if OS == "windows":
-                subprocess.Popen(["cmd", "/c", f"start chrome {whatsapp_url}"], shell=True)
-            elif OS == "darwin":
-                subprocess.Popen(["open", "-a", "Google Chrome", whatsapp_url])
-            elif OS == "linux":
-                subprocess.Popen(["google-chrome", whatsapp_url])
-            
-            speak("Opening WhatsApp Web")
+        speak("Opening WhatsApp Web")
+        
+        if contact:
+            speak(f"To message {contact}, please select their chat from WhatsApp and type your message.")
+            log_interaction(command, f"Opened WhatsApp Web for {contact}", source="local")
+        else:
             log_interaction(command, "Opened WhatsApp Web", source="local")
-            
-            # Proactive follow-up
-            time.sleep(1)
-            speak("I am listening to you.... please tell me what to do next")
-            
-            return True
-        except Exception as e:
-            speak("Sorry, I couldn't open WhatsApp Web.")
-            return False
+        
+        # Proactive follow-up
+        speak("I am listening to you.... please tell me what to do next")
+        
+        return True
+    except Exception as e:
+        speak("Sorry, I couldn't open WhatsApp Web.")
+        print(f"WhatsApp error: {e}")
+        return False
 
-def handle_browser_search(command):
-    """Handle browser-based search and opening"""
+def handle_whatsapp_web(command):
+    """Handle WhatsApp Web commands"""
+    match = match_whatsapp_web(command)
+    return execute_whatsapp_web(match) if match else False
+
+def match_browser_search(command):
+    """Recognise "<query> on/in <browser>" and build the URL to open"""
+    command = as_command(command)
     # Pattern: check for browser mention with "on" or "in" separator
     # More flexible to catch various search intents
     if not re.search(r'\b(on|in)\b.*\b(chrome|firefox|edge|google|browser)\b', command, re.IGNORECASE):
-        return False
+        return None
     
     # Make sure it's not a pure weather query (has "weather" without action words)
     if re.search(r'\bweather\b', command, re.IGNORECASE) and not re.search(r'\b(search|open|look|find|check|get)\b', command, re.IGNORECASE):
-        return False
+        return None
     
-    command_lower = command.lower()
+    command_lower = command.lowered
     
     # Extract browser
     browser = None
@@ -107,99 +101,116 @@ def handle_browser_search(command):
     
     # Extract search query more robustly
     query = None
-    if " on " in command_lower:
-        parts = command_lower.split(" on ")
-        if len(parts) >= 2:
-            query_part = parts[0].strip()
+    for separator in (" on ", " in "):
+        if separator in command_lower:
+            query_part = command_lower.split(separator)[0].strip()
             # Remove leading action words
             for prefix in ["open ", "search ", "look for ", "find ", "get ", "check "]:
                 if query_part.startswith(prefix):
                     query_part = query_part[len(prefix):].strip()
                     break
             query = query_part
-    elif " in " in command_lower:
-        parts = command_lower.split(" in ")
-        if len(parts) >= 2:
-            query_part = parts[0].strip()
-            # Remove leading action words
-            for prefix in ["open ", "search ", "look for ", "find ", "get ", "check "]:
-                if query_part.startswith(prefix):
-                    query_part = query_part[len(prefix):].strip()
-                    break
-            query = query_part
-    
-    if browser and query:
-        try:
-            # Check if query is a URL or a search term
-            if query.startswith("http://") or query.startswith("https://") or "." in query:
-                url = query if query.startswith("http") else f"https://{query}"
-            else:
-                url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
-            
-            # Launch the browser
-            if browser == "chrome":
-                if OS == "windows":
-                    subprocess.Popen(["cmd", "/c", f"start chrome {url}"], shell=True)
-                elif OS == "darwin":
-                    subprocess.Popen(["open", "-a", "Google Chrome", url])
-                elif OS == "linux":
-                    subprocess.Popen(["google-chrome", url])
-            elif browser == "firefox":
-                if OS == "windows":
-                    subprocess.Popen(["cmd", "/c", f"start firefox {url}"], shell=True)
-                elif OS == "darwin":
-                    subprocess.Popen(["open", "-a", "Firefox", url])
-                elif OS == "linux":
-                    subprocess.Popen(["firefox", url])
-            elif browser == "edge":
-                if OS == "windows":
-                    subprocess.Popen(["cmd", "/c", f"start msedge {url}"], shell=True)
-                elif OS == "darwin":
-                    subprocess.Popen(["open", "-a", "Microsoft Edge", url])
-                elif OS == "linux":
-                    subprocess.Popen(["microsoft-edge", url])
-            
-            speak(f"Searching for {query} on {browser_name}")
-            log_interaction(command, f"Opened {query} on {browser_name}", source="local")
-            
-            return True
-        except Exception as e:
-            speak("Sorry, I couldn't open that in the browser.")
-            print(f"Browser opening error: {e}")
-            return False
+            break
     
-    return False
-
-def handle_website_opening(command):
-    """Handle website opening commands"""
-    if not re.search(r'\b(open|visit|go to)\b\s+(youtube|wikipedia|reddit|github|facebook|twitter|instagram|gmail|google\.com|stack\s*overflow)', command, re.IGNORECASE):
-        return False
+    if not (browser and query):
+        return None
     
-    command_lower = command.lower()
+    # Check if query is a URL or a search term
+    if query.startswith("http://") or query.startswith("https://") or "." in query:
+        url = query if query.startswith("http") else f"https://{query}"
+    else:
+        url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
     
-    # Find which website was mentioned
-    website = None
-    for site_key in WEBSITE_MAP:
-        if site_key in command_lower:
-            website = site_key
-            break
+    return Match("browser_search", command, {
+        "browser": browser,
+        "browser_name": browser_name,
+        "query": query,
+        "url": url,
+    })
+
+def execute_browser_search(match):
+    """Open the matched URL in the requested browser"""
+    command = match.command
+    browser = match.slots["browser"]
+    browser_name = match.slots["browser_name"]
+    query = match.slots["query"]
+    url = match.slots["url"]
     
-    if website:
-        try:
-            url = WEBSITE_MAP[website]
+    try:
+        # Launch the browser
+        if browser == "chrome":
             if OS == "windows":
                 subprocess.Popen(["cmd", "/c", f"start chrome {url}"], shell=True)
             elif OS == "darwin":
                 subprocess.Popen(["open", "-a", "Google Chrome", url])
             elif OS == "linux":
                 subprocess.Popen(["google-chrome", url])
-            speak(f"Opening {website}")
-            log_interaction(command, f"Opened {website}", source="local")
-            
-            return True
-        except Exception as e:
-            speak(f"Sorry, I couldn't open {website}.")
-            print(f"Error: {e}")
-            return False
+        elif browser == "firefox":
+            if OS == "windows":
+                subprocess.Popen(["cmd", "/c", f"start firefox {url}"], shell=True)
+            elif OS == "darwin":
+                subprocess.Popen(["open", "-a", "Firefox", url])
+            elif OS == "linux":
+                subprocess.Popen(["firefox", url])
+        elif browser == "edge":
+            if OS == "windows":
+                subprocess.Popen(["cmd", "/c", f"start msedge {url}"], shell=True)
+            elif OS == "darwin":
+                subprocess.Popen(["open", "-a", "Microsoft Edge", url])
+            elif OS == "linux":
+                subprocess.Popen(["microsoft-edge", url])
+        
+        speak(f"Searching for {query} on {browser_name}")
+        log_interaction(command, f"Opened {query} on {browser_name}", source="local")
+        
+        return True
+    except Exception as e:
+        speak("Sorry, I couldn't open that in the browser.")
+        print(f"Browser opening error: {e}")
+        return False
+
+def handle_browser_search(command):
+    """Handle browser-based search and opening"""
+    match = match_browser_search(command)
+    return execute_browser_search(match) if match else False
+
+def match_website_opening(command):
+    """Recognise requests to open a known website"""
+    command = as_command(command)
+    if not re.search(r'\b(open|visit|go to)\b\s+(youtube|wikipedia|reddit|github|facebook|twitter|instagram|gmail|google\.com|stack\s*overflow)', command, re.IGNORECASE):
+        return None
+    
+    command_lower = command.lowered
     
-    return False
+    # Find which website was mentioned
+    for site_key in WEBSITE_MAP:
+        if site_key in command_lower:
+            return Match("open_website", command, {"website": site_key, "url": WEBSITE_MAP[site_key]})
+    
+    return None
+
+def execute_website_opening(match):
+    """Open the matched website in Chrome"""
+    command = match.command
+    website = match.slots["website"]
+    url = match.slots["url"]
+    try:
+        if OS == "windows":
+            subprocess.Popen(["cmd", "/c", f"start chrome {url}"], shell=True)
+        elif OS == "darwin":
+            subprocess.Popen(["open", "-a", "Google Chrome", url])
+        elif OS == "linux":
+            subprocess.Popen(["google-chrome", url])
+        speak(f"Opening {website}")
+        log_interaction(command, f"Opened {website}", source="local")
+        
+        return True
+    except Exception as e:
+        speak(f"Sorry, I couldn't open {website}.")
+        print(f"Error: {e}")
+        return False
+
+def handle_website_opening(command):
+    """Handle website opening commands"""
+    match = match_website_opening(command)
+    return execute_website_opening(match) if match else False
@@ -3,105 +3,170 @@ EchoMind - Main entry point for the voice assistant
 This refactored version uses modular architecture for better maintainability
 """
 import os
+import json
 import time
 from dotenv import load_dotenv
 
 # Load environment variables BEFORE importing other modules
 load_dotenv()
 
-# Import all handlers
-from handlers.thank_you_handler import handle_thank_you
-from handlers.greeting_handler import handle_greeting
-from handlers.time_handler import handle_time
-from handlers.date_handler import handle_date
-from handlers.simple_weather_handler import handle_simple_city_weather
-from handlers.weather_handler import handle_weather
-from handlers.web_handler import handle_browser_search, handle_website_opening, handle_whatsapp_web
-from handlers.file_handler import handle_file_opening
-from handlers.file_writing_handler import handle_file_writing
-from handlers.app_handler import handle_app_opening
-from handlers.personal_handler import handle_personal_questions
-from handlers.text_input_handler import handle_text_input
-from handlers.brightness_handler import handle_brightness
-from handlers.resume_handler import handle_resume_opening
-from handlers.close_app_handler import handle_app_closing
-from handlers.tab_navigation_handler import handle_tab_navigation
-from handlers.system_folder_handler import handle_system_folder_opening
-from handlers.music_handler import handle_play_music, handle_play_on_youtube
-from handlers.exit_handler import handle_exit
-from handlers.battery_handler import handle_battery_status, start_battery_monitoring, stop_battery_monitoring
-from handlers.usb_detection_handler import handle_usb_detection, start_usb_monitoring, stop_usb_monitoring
-from handlers.reminder_handler import handle_reminder
-from handlers.volume_handler import handle_volume
-from handlers.cricket_handler import handle_cricket_score
+# Import the ordered route table and background monitors
+from handlers.routes import ROUTES
+from handlers.battery_handler import start_battery_monitoring, stop_battery_monitoring
+from handlers.usb_detection_handler import start_usb_monitoring, stop_usb_monitoring
 
 # Import utilities
 from utils.voice_io import speak, listen, speak_stream
-from utils.text_processing import convert_spoken_symbols, is_symbol_only, ensure_question_mark_if_question
+from utils.audio_capture import get_capture, stop_capture
+from utils.tts import stop_tts
+from utils.text_processing import as_command, normalize_command
 from utils.time_utils import get_greeting
 from utils.logger import log_interaction
+from utils.dispatcher import KeywordDispatcher
+from utils.route_cache import RouteCache, LLM_VERDICT
+from utils.speculation import SpeculativeLLM
+from utils.intent_classifier import load_intent_model
+from utils.multi_intent import plan_steps, run_steps
+from config.settings import (
+    ROUTE_CACHE_SIZE, SPECULATIVE_LLM, INTENT_MODEL_PATH, INTENT_TOP_K, INTENT_MIN_CONFIDENCE,
+    MULTI_INTENT, MULTI_INTENT_WORKERS, MIC_ALWAYS_ON,
+)
 
 # Import specific functions for global hotkeys
-from handlers.emoji_handler import open_emoji, handle_emoji_mode
+from handlers.emoji_handler import open_emoji
 from handlers.volume_handler import press_f5_key
 
 # Import Gemini client
 from clients import gemini_client
-from clients import groq_client  # Imported for potential fallback, not used directly in main.py
+from clients import groq_client  # Fallback provider; main.py warms it up and reports its circuit
+
+
+# Built once at startup: maps trigger keywords to candidate handlers
+DISPATCHER = KeywordDispatcher(ROUTES)
+ROUTES_BY_NAME = {route.name: route for route in ROUTES}
+
+# Remembers which handler claimed a normalized command (or that none did)
+ROUTE_CACHE = RouteCache(ROUTES, maxsize=ROUTE_CACHE_SIZE)
+
+# Optional learned ordering of candidate handlers (None if no model was trained)
+INTENT_MODEL = load_intent_model(INTENT_MODEL_PATH)
+
+# Sends likely LLM questions to Gemini while routing is still running (opt-in)
+SPECULATOR = SpeculativeLLM(gemini_client.generate_response) if SPECULATIVE_LLM else None
+
+
+def _route_result(route, result):
+    """Translate a handler's return value into a routing result (or None if it declined)"""
+    if route.name == "Text input":
+        # Special case for text input - can return "exit"
+        if result == "exit":
+            return "exit"
+        elif result:
+            return "handled"
+    elif route.name == "Exit":
+        # Special case for exit
+        if result:
+            return "exit"
+    elif result:
+        return "handled"
+    return None
+
+
+def _run_route(route, command):
+    """Run one route: match, then execute (legacy handle_* shim if the route has no matcher)"""
+    if route.matcher is None:
+        return route.handler(command)
+    match = route.matcher(command)
+    if match is None:
+        return False
+    return route.executor(match)
+
+
+def match_command(command):
+    """Return (route, Match) for the first route whose matcher claims command, or (None, None)
+
+    Pure: no handler is executed, so this is safe for dry runs and benchmarks.
+    Executors can still decline at run time (unknown city, app failed to
+    launch, ...), so route_command may end up elsewhere.
+    """
+    return DISPATCHER.first_match(command)
 
 
 def route_command(command):
-    """Route command to appropriate handler"""
-    handlers = [
-        ("Text input", handle_text_input),
-        ("Thank you", handle_thank_you),
-        ("Greeting", handle_greeting),
-        ("Emoji mode", handle_emoji_mode),
-        ("Time", handle_time),
-        ("Date", handle_date),
-        ("Resume opening", handle_resume_opening),  # NEW - Resume file handler
-        ("USB detection", handle_usb_detection),
-        ("Browser search", handle_browser_search),
-        ("Website opening", handle_website_opening),
-        ("Simple city weather", handle_simple_city_weather),
-        ("Weather", handle_weather),
-        ("Cricket Score", handle_cricket_score),
-        ("WhatsApp", handle_whatsapp_web),
-        ("Battery status", handle_battery_status),
-        ("Volume control", handle_volume),
-        ("File writing", handle_file_writing),
-        ("Music (YouTube play)", handle_play_on_youtube),
-        ("Music (play)", handle_play_music),
-        ("File opening", handle_file_opening),
-        ("System folder opening", handle_system_folder_opening),
-        ("App opening", handle_app_opening),
-        ("Personal questions", handle_personal_questions),
-        ("Brightness control", handle_brightness),
-        ("Tab navigation", handle_tab_navigation),
-        ("Reminder", handle_reminder),
-        ("App closing", handle_app_closing),
-        ("Exit", handle_exit),
-    ]
-    
-    for handler_name, handler in handlers:
-        if handler_name == "Text input":
-            # Special case for text input - can return "exit"
-            result = handle_text_input(command)
-            if result == "exit":
-                return "exit"
-            elif result:
-                return "handled"
-        elif handler_name == "Exit":
-            # Special case for exit
-            if handle_exit(command):
-                return "exit"
-        else:
-            if handler(command):
-                return "handled"
+    """Route command to appropriate handler
+
+    Only handlers whose trigger keywords occur in the command are called,
+    in the priority order defined by handlers/routes.py. Accepts a plain
+    string or a NormalizedCommand; the same normalized object is handed to
+    every handler.
+
+    Each candidate is run as match then execute; routes that only provide a
+    legacy handle_* function are still called directly. With a trained intent
+    model, the routes it is confident about are tried first, unless a
+    higher-priority route also claims the command.
+
+    Verdicts are cached per normalized text: a repeated command goes straight
+    to the handler that claimed it last time, and a repeated LLM question
+    skips the handler chain entirely.
+    """
+    command = as_command(command)
+    cache_key = command.lowered.strip()
+
+    cached = ROUTE_CACHE.get(cache_key)
+    if cached == LLM_VERDICT:
+        return "not_handled"
+    if cached is not None:
+        route = ROUTES_BY_NAME.get(cached)
+        if route is not None:
+            outcome = _route_result(route, _run_route(route, command))
+            if outcome:
+                return outcome
+        # The cached handler declined this time - re-route from scratch
+        ROUTE_CACHE.discard(cache_key)
+
+    # Verdicts are only reusable if no declining handler depended on outside state
+    cacheable = True
+    candidates = DISPATCHER.candidates(command)
+    if INTENT_MODEL is not None:
+        candidates = INTENT_MODEL.order(command, candidates, INTENT_TOP_K, INTENT_MIN_CONFIDENCE)
+    for route in candidates:
+        outcome = _route_result(route, _run_route(route, command))
+        if outcome:
+            if cacheable:
+                ROUTE_CACHE.put(cache_key, route.name)
+            return outcome
+        if route.volatile:
+            cacheable = False
     
+    if cacheable:
+        ROUTE_CACHE.put(cache_key, LLM_VERDICT)
     return "not_handled"
 
 
+def _gemini_stream_enabled():
+    return os.getenv("GEMINI_API_STREAM", "").lower() in ("1", "true", "yes")
+
+
+def _should_speculate(command):
+    """Guess whether command will fall through to Gemini
+
+    True when the intent model is confident it is an LLM question, when no
+    handler's matcher claims it, or when the claiming route is volatile and the
+    command is a question or a lone word (e.g. a single word that is only a
+    city if the weather lookup says so).
+    """
+    if SPECULATOR is None or _gemini_stream_enabled():
+        return False
+    if ROUTE_CACHE.peek(command.lowered.strip()) == LLM_VERDICT:
+        return True
+    if INTENT_MODEL is not None and INTENT_MODEL.scores(command).get(LLM_VERDICT, 0.0) >= INTENT_MIN_CONFIDENCE:
+        return True
+    route, _ = match_command(command)
+    if route is None:
+        return True
+    return route.volatile and (command.is_question or route.single_word)
+
+
 def handle_gemini_fallback(command):
     """Handle unknown commands with Gemini
     
@@ -112,13 +177,11 @@ def handle_gemini_fallback(command):
         # Use command as-is (already formatted with ? in main if needed)
         formatted_command = command
         
-        stream_flag = os.getenv("GEMINI_API_STREAM", "").lower() in ("1", "true", "yes")
-        if stream_flag:
+        if _gemini_stream_enabled():
             try:
-                # Get streaming chunks
+                # Speak each sentence as soon as it has streamed in
                 gen = gemini_client.stream_generate(command)
-                # Assemble complete response without printing
-                final_text = speak_stream(gen)
+                final_text = speak_stream(gen, clean=gemini_client.strip_json_noise)
                 
                 if not final_text or not final_text.strip():
                     # Try blocking call as fallback
@@ -131,30 +194,17 @@ def handle_gemini_fallback(command):
                         log_interaction(formatted_command, "No response returned", source="gemini_stream")
                     return
                 
-                # Normalize and clean the complete response
-                cleaned = gemini_client.normalize_response(final_text)
-                final_clean = gemini_client.strip_json_noise(cleaned)
-                
-                # Use cleaned response if available, otherwise use final_text
-                response_to_use = final_clean if final_clean else final_text
-                if response_to_use and response_to_use.strip():
-                    # Speak ONCE (no ? added to response)
-                    # speak() already prints "Speaking: ..."
-                    speak(response_to_use)
-                    log_interaction(formatted_command, response_to_use, source="gemini_stream")
-                else:
-                    speak("Sorry, I couldn't generate a response.")
-                    log_interaction(formatted_command, "No response returned", source="gemini_stream")
+                log_interaction(formatted_command, final_text, source="gemini_stream")
                 
             except Exception as e:
                 # Fallback to block generation silently or with minimal notice
                 pass
         else:
-            # Add dynamic context (date/time) to the prompt for Gemini
-            from utils.time_utils import get_time, get_date
-            context_command = f"[Context: The current time is {get_time()} and today is {get_date()}] {command}"
-            
-            response = gemini_client.generate_response(context_command)
+            # Use the speculative request if one was started for this command
+            response = SPECULATOR.take(str(command)) if SPECULATOR is not None else None
+            if response is None:
+                # The client adds the date/time context itself (outside the cache key)
+                response = gemini_client.generate_response(command)
             if response:
                 cleaned = gemini_client.normalize_response(response)
                 final_clean = gemini_client.strip_json_noise(cleaned)
@@ -173,6 +223,15 @@ def handle_gemini_fallback(command):
         log_interaction(command, f"Error: {e}", source="gemini")
 
 
+def _run_step(step):
+    """Run one step of a multi-intent command, asking Gemini if no handler claims it"""
+    result = route_command(step.command)
+    if result == "not_handled":
+        handle_gemini_fallback(step.command)
+        return "handled"
+    return result
+
+
 def main():
     """Main function - voice assistant loop"""
     # Start background monitoring threads
@@ -224,6 +283,13 @@ def main():
         except Exception:
             pass
     
+    # Open the provider connections while the greeting is spoken
+    gemini_client.warm_up()
+    groq_client.warm_up()
+    # Open the microphone once; it keeps recording into its ring buffer
+    if MIC_ALWAYS_ON:
+        get_capture()
+    
     greeting = get_greeting()
     speak(greeting)
     
@@ -235,31 +301,43 @@ def main():
                 if not command:
                     continue
                 
-                # Convert spoken symbols to actual punctuation marks
-                command = convert_spoken_symbols(command)
+                # Normalize once: spoken symbols -> punctuation, ? for questions,
+                # lowercase/tokens/numbers shared by every handler
+                formatted_command = normalize_command(command)
                 
                 # Skip if command is only symbols
-                if command and is_symbol_only(command):
+                if formatted_command and formatted_command.symbol_only:
                     speak("I didn't catch a complete command. Could you please say something more?")
                     continue
                 
-                # Format command with ? if it's a question (for logging)
-                formatted_command = ensure_question_mark_if_question(command, None)
+                # "open chrome and ..., then ...": run the sub-intents as steps,
+                # independent ones concurrently, speech in the order asked
+                steps = plan_steps(formatted_command, match_command) if MULTI_INTENT else None
+                if steps:
+                    if "exit" in run_steps(steps, _run_step, MULTI_INTENT_WORKERS):
+                        speak("Goodbye!")
+                        break
+                    continue
+                
+                # Likely LLM question: get the Gemini request going while routing runs
+                if _should_speculate(formatted_command):
+                    SPECULATOR.start(str(formatted_command), formatted_command)
                 
                 # Route the command to handlers
                 result = route_command(formatted_command)
+                if result != "not_handled" and SPECULATOR is not None:
+                    # A local handler claimed it - the speculative answer is not needed
+                    SPECULATOR.discard()
                 
                 if result == "exit":
                     speak("Goodbye!")
                     break
                 elif result == "handled":
                     # Handler already processed the command
-                    time.sleep(0.5)  # Small delay to avoid rate limiting
                     continue
                 else:
-                    # No handler matched, try Gemini
+                    # No handler matched, try Gemini (the client rate-limits itself)
                     handle_gemini_fallback(formatted_command)
-                    time.sleep(0.5)  # Small delay between API calls to avoid rate limiting
             except KeyboardInterrupt:
                 speak("Goodbye!")
                 break
@@ -271,6 +349,43 @@ def main():
         # Stop background monitoring threads
         stop_battery_monitoring()
         stop_usb_monitoring()
+        
+        if SPECULATOR is not None:
+            stats = SPECULATOR.stats()
+            SPECULATOR.shutdown()
+            print(f"Speculative LLM requests: {stats}")
+            log_interaction("speculation stats", json.dumps(stats), source="speculation")
+        
+        if gemini_client.RESPONSE_CACHE is not None:
+            stats = gemini_client.RESPONSE_CACHE.stats()
+            print(f"LLM response cache: {stats}")
+            log_interaction("llm cache stats", json.dumps(stats), source="llm_cache")
+        
+        if gemini_client.HEDGER is not None:
+            stats = gemini_client.HEDGER.stats()
+            gemini_client.HEDGER.shutdown()
+            print(f"Hedged LLM requests: {stats}")
+            log_interaction("llm hedge stats", json.dumps(stats), source="llm_hedge")
+        
+        for client in (gemini_client, groq_client):
+            stats = client.BREAKER.stats()
+            print(f"{client.BREAKER.name} circuit: {stats}")
+            log_interaction(f"{client.BREAKER.name} circuit stats", json.dumps(stats), source="circuit")
+        
+        stats = gemini_client.CHAIN.stats()
+        print(f"LLM provider chain: {stats}")
+        log_interaction("llm chain stats", json.dumps(stats), source="circuit")
+        
+        stats = stop_capture()
+        if stats is not None:
+            print(f"Microphone capture: {stats}")
+            log_interaction("microphone stats", json.dumps(stats), source="microphone")
+        
+        # Let the last words ("Goodbye!") finish before the process exits
+        stats = stop_tts()
+        if stats is not None:
+            print(f"Speech output: {stats}")
+            log_interaction("tts stats", json.dumps(stats), source="tts")
 
 
 if __name__ == "__main__":
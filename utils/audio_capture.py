@@ -0,0 +1,236 @@
+"""Always-on microphone capture
+
+One sounddevice input stream stays open for the whole session. Its callback
+copies every block into a preallocated ring buffer holding MIC_RING_SECONDS
+of 16-bit mono audio. That is the only copy: the noise floor, the VAD and
+the recognizer all read views of the ring. listen() no longer opens the device (query_devices
+plus a new RawInputStream) on every attempt, and nothing said while speech is
+being recognised or the assistant is busy is lost.
+
+listen() reads an utterance from the ring through a RingSource, an
+sr.AudioSource whose stream waits until enough audio has been captured. A
+source starts where the previous one stopped reading. It never starts
+further back than it is told to, which listen() uses to skip stale audio
+and the assistant's own speech.
+
+Every block also updates a NoiseFloor (utils/noise_floor.py), whose
+threshold listen() uses instead of calibrating before each attempt.
+"""
+import threading
+import time
+
+import numpy as np
+import sounddevice as sd
+import speech_recognition as sr
+
+from config.settings import MIC_BLOCK_SIZE, MIC_RING_SECONDS
+from utils.noise_floor import NoiseFloor
+
+SAMPLE_WIDTH = 2  # int16
+
+
+class CaptureStalled(OSError):
+    """No audio arrived from the capture stream in time"""
+
+
+class RingBuffer:
+    """Fixed-size int16 sample ring; positions are absolute sample counts
+
+    The first `span` samples are mirrored after the end of the ring, so any
+    read of up to `span` samples is one contiguous slice: read() hands out
+    views of the ring instead of copies. A view stays valid until the ring
+    wraps over it, i.e. for about `capacity` samples of further capture.
+    """
+
+    def __init__(self, capacity, span=8192):
+        self.capacity = max(1, int(capacity))
+        self.span = max(1, min(int(span), self.capacity))
+        self._data = np.zeros(self.capacity + self.span, dtype=np.int16)
+        self._view = self._data.view()
+        self._view.flags.writeable = False
+        self._cond = threading.Condition()
+        self.written = 0   # samples written since the start
+        self.overruns = 0  # reads that fell more than capacity behind
+
+    def _put(self, start, samples):
+        """Copy samples to ring offset start (no wrap), keeping the mirror in step"""
+        end = start + len(samples)
+        self._data[start:end] = samples
+        if start < self.span:
+            self._data[self.capacity + start:self.capacity + min(end, self.span)] = samples[:self.span - start]
+
+    def write(self, samples):
+        """Append samples (an int16 array); the oldest are overwritten
+
+        Returns a read-only view of what was written when that fits in one
+        read (the capture callback hands it on to the noise floor).
+        """
+        count = len(samples)
+        if count > self.capacity:
+            samples = samples[-self.capacity:]
+        start = (self.written + count - len(samples)) % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._put(start, samples[:first])
+        if first < len(samples):
+            self._put(0, samples[first:])
+        with self._cond:
+            self.written += count
+            self._cond.notify_all()
+        if len(samples) <= self.span:
+            return self._view[start:start + len(samples)]
+        return samples
+
+    def oldest(self):
+        """Position of the oldest sample still in the ring"""
+        return max(0, self.written - self.capacity)
+
+    def read(self, position, count, timeout=None):
+        """(read-only int16 view of count samples starting at position, next position)
+
+        Waits until they have been captured; raises CaptureStalled after
+        timeout seconds. A position that has already been overwritten
+        skips ahead to the oldest sample still held. Reads longer than
+        span are copied.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.written >= position + count, timeout):
+                raise CaptureStalled("no audio captured for %.1f s" % timeout)
+        if position < self.oldest():
+            self.overruns += 1
+            position = self.oldest()
+        start = position % self.capacity
+        if count <= self.span:
+            return self._view[start:start + count], position + count
+        first = min(count, self.capacity - start)
+        return np.concatenate((self._data[start:start + first], self._data[:count - first])), position + count
+
+
+class RingSource(sr.AudioSource):
+    """sr.AudioSource reading captured audio from a MicrophoneCapture ring"""
+
+    def __init__(self, capture, position):
+        self.capture = capture
+        self.position = position
+        self.SAMPLE_RATE = capture.sample_rate
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = capture.block_size
+        self.stream = self
+
+    def read_samples(self, size):
+        """The next size samples as an int16 view of the ring (no copy)"""
+        # Generous timeout: one block is normally there within CHUNK / SAMPLE_RATE
+        samples, self.position = self.capture.ring.read(self.position, size, timeout=1.0 + 4 * size / self.SAMPLE_RATE)
+        return samples
+
+    def read(self, size):
+        # Byte view for speech_recognition (audioop and b"".join take any buffer)
+        return memoryview(self.read_samples(size)).cast("B")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.capture.release(self.position)
+
+
+class MicrophoneCapture:
+    """Keeps one input stream open and records into a RingBuffer"""
+
+    def __init__(self, device=None, sample_rate=None, block_size=MIC_BLOCK_SIZE, ring_seconds=MIC_RING_SECONDS):
+        self.device = device
+        if sample_rate is None:
+            sample_rate = sd.query_devices(device, "input")["default_samplerate"]
+        self.sample_rate = int(sample_rate)
+        self.block_size = int(block_size)
+        self.ring = RingBuffer(self.sample_rate * ring_seconds, span=max(8192, 4 * self.block_size))
+        self.noise = NoiseFloor(self.sample_rate)
+        self._stream = None
+        self._lock = threading.Lock()
+        self._clock = (0, time.monotonic())  # (ring.written, monotonic time) after the last block
+        self.consumed = 0  # where the last RingSource stopped reading
+        self.overflows = 0
+
+    @property
+    def running(self):
+        return self._stream is not None
+
+    def start(self):
+        with self._lock:
+            if self._stream is None:
+                stream = sd.RawInputStream(samplerate=self.sample_rate, channels=1, dtype="int16",
+                                           blocksize=self.block_size, device=self.device, callback=self._callback)
+                stream.start()
+                self._stream = stream
+        return self
+
+    def stop(self):
+        with self._lock:
+            stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
+
+    def _callback(self, indata, frames, time_info, status):
+        if status and status.input_overflow:
+            self.overflows += 1
+        # indata is reused by PortAudio: the ring write is the one copy of each block
+        self.noise.update(self.ring.write(np.frombuffer(indata, dtype=np.int16)))
+        self._clock = (self.ring.written, time.monotonic())
+
+    def position_at(self, when):
+        """Ring position of the audio captured at monotonic time when"""
+        written, at = self._clock
+        return max(0, written - int((at - when) * self.sample_rate))
+
+    def source(self, since=None):
+        """RingSource starting where the last one stopped, but not before monotonic time since"""
+        position = max(self.consumed, self.ring.oldest())
+        if since is not None:
+            position = max(position, self.position_at(since))
+        return RingSource(self, position)
+
+    def release(self, position):
+        """A RingSource finished reading at position"""
+        self.consumed = max(self.consumed, position)
+        self.noise.save()
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "sample_rate": self.sample_rate,
+            "captured_s": round(self.ring.written / self.sample_rate, 1),
+            "overflows": self.overflows,
+            "overruns": self.ring.overruns,
+            "noise": self.noise.stats(),
+        }
+
+
+_capture = None
+_capture_lock = threading.Lock()
+_capture_failed = False
+
+
+def get_capture():
+    """The shared, running MicrophoneCapture (None if the device could not be opened)"""
+    global _capture, _capture_failed
+    with _capture_lock:
+        if _capture is None and not _capture_failed:
+            try:
+                _capture = MicrophoneCapture().start()
+            except Exception as e:
+                _capture_failed = True
+                print(f"Always-on microphone unavailable, opening it per listen instead: {e}")
+        return _capture
+
+
+def stop_capture():
+    """Close the shared capture stream; returns its stats (None if it never ran)"""
+    global _capture
+    with _capture_lock:
+        capture, _capture = _capture, None
+    if capture is None:
+        return None
+    stats = capture.stats()
+    capture.stop()
+    capture.noise.save(force=True)
+    return stats
@@ -0,0 +1,99 @@
+"""Keyword-indexed command dispatcher
+
+Builds an inverted index once at startup that maps trigger keywords and
+phrases to the handlers that can possibly claim an utterance. Each command
+is scanned a single time and only the matching handlers are returned, in the
+original priority order, so routing cost no longer grows with the number of
+registered handlers.
+
+Two kinds of triggers are supported because the handlers use both styles:
+- keywords: whole words (``\\bword\\b`` in the handler's own regex). These are
+  resolved with one dict lookup per token of the utterance.
+- substrings: plain ``in`` checks or multi-word phrases. These are folded into
+  a single precompiled alternation that is scanned once.
+
+The index only pre-filters. Every candidate handler still runs its own checks
+and may decline, so the triggers must be a superset of what a handler accepts.
+"""
+import re
+
+from utils.text_processing import as_command
+
+
+class KeywordDispatcher:
+    """Inverted index from trigger keywords to routes (see handlers/routes.py)"""
+
+    def __init__(self, routes):
+        self.routes = list(routes)
+        self._keyword_index = {}
+        self._substring_index = {}
+        self._single_word_routes = set()
+        self._always_routes = set()
+
+        for position, route in enumerate(self.routes):
+            if route.single_word:
+                self._single_word_routes.add(position)
+            if not route.keywords and not route.substrings and not route.single_word:
+                # No triggers declared - keep the handler reachable for every command
+                self._always_routes.add(position)
+            for keyword in route.keywords:
+                self._keyword_index.setdefault(keyword.lower(), set()).add(position)
+            for substring in route.substrings:
+                self._substring_index.setdefault(substring.lower(), set()).add(position)
+
+        # Longest phrases first so each position reports its most specific phrase;
+        # the lookahead keeps overlapping occurrences visible to finditer()
+        phrases = sorted(self._substring_index, key=len, reverse=True)
+        self._substring_re = (
+            re.compile("(?=(" + "|".join(re.escape(p) for p in phrases) + "))") if phrases else None
+        )
+        # Shorter phrases that are contained in a longer match are implied by it
+        self._implied = {}
+        for phrase in phrases:
+            implied = set(self._substring_index[phrase])
+            for other in phrases:
+                if other != phrase and other in phrase:
+                    implied |= self._substring_index[other]
+            self._implied[phrase] = implied
+
+    def match_positions(self, text):
+        """Return the set of route positions whose triggers occur in text"""
+        command = as_command(text)
+        lowered = command.lowered
+        tokens = command.tokens
+
+        positions = set(self._always_routes)
+        keyword_index = self._keyword_index
+        for token in tokens:
+            hit = keyword_index.get(token)
+            if hit:
+                positions |= hit
+
+        if self._substring_re is not None:
+            implied = self._implied
+            for found in self._substring_re.finditer(lowered):
+                positions |= implied[found.group(1)]
+
+        if self._single_word_routes and len(command.split()) == 1:
+            positions |= self._single_word_routes
+
+        return positions
+
+    def candidates(self, text):
+        """Return the routes that may claim text, in priority order"""
+        positions = self.match_positions(text)
+        return [self.routes[i] for i in sorted(positions)]
+
+    def first_match(self, text, routes=None):
+        """Return (route, Match) for the first candidate whose matcher claims text, or (None, None)
+
+        Only the pure matchers run. routes overrides the candidate order.
+        """
+        command = as_command(text)
+        for route in (self.candidates(command) if routes is None else routes):
+            if route.matcher is None:
+                continue
+            match = route.matcher(command)
+            if match is not None:
+                return route, match
+        return None, None
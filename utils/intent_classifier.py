@@ -0,0 +1,330 @@
+"""Learned intent classifier used to order handler evaluation
+
+A character n-gram TF-IDF vectorizer with a linear softmax model, trained
+offline from logs/assistant.jsonl. For an incoming utterance it scores every
+route (plus LLM_VERDICT for "no handler") so route_command can try the most
+likely handlers first. The regex chain still decides: the classifier only
+changes the order in which candidate handlers are tried, a route is only
+moved ahead of higher-priority routes that do not claim the utterance, and
+anything below the confidence threshold keeps its original priority.
+
+Labels come from the logs themselves: utterances answered by Gemini are
+labelled LLM_VERDICT, and locally handled ones are replayed through the pure
+match_* functions to find the route that claimed them.
+
+Usage:
+    python -m utils.intent_classifier train [--log logs/assistant.jsonl] [--out models/intent_model.npz]
+    python -m utils.intent_classifier report [--log ...] [--model ...]
+
+Needs NumPy. Without NumPy (or without a trained model file) routing simply
+keeps the priority order.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from utils.route_cache import LLM_VERDICT
+from utils.text_processing import as_command, normalize_command
+
+DEFAULT_LOG_PATH = os.path.join("logs", "assistant.jsonl")
+DEFAULT_MODEL_PATH = os.path.join("models", "intent_model.npz")
+
+# Log sources written by the Gemini fallback path
+LLM_SOURCES = ("gemini", "gemini_stream", "gemini_fallback")
+# Log entries that are not user utterances
+SKIPPED_SOURCES = ("hotkey", "speculation", "llm_cache", "llm_hedge", "circuit", "microphone", "tts", "text_input_exit", "text_input_gemini")
+
+
+def char_ngrams(text, ngram_range=(2, 4)):
+    """Return the character n-grams of text (word-boundary padded)"""
+    padded = " " + " ".join(as_command(text).lowered.split()) + " "
+    low, high = ngram_range
+    grams = []
+    for n in range(low, high + 1):
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def _outranked(route, command, routes):
+    """True if a route ahead of route in routes (priority order) also claims command"""
+    for other in routes:
+        if other is route:
+            return False
+        if other.matcher is None or other.matcher(command) is not None:
+            return True
+    return False
+
+
+class IntentModel:
+    """TF-IDF + softmax scores for every route label"""
+
+    def __init__(self, vocab, idf, weights, bias, labels, ngram_range=(2, 4)):
+        self.vocab = {gram: i for i, gram in enumerate(vocab)}
+        self.idf = idf
+        self.weights = weights  # (n_labels, n_features)
+        self.bias = bias
+        self.labels = list(labels)
+        self.ngram_range = tuple(int(n) for n in ngram_range)
+
+    def _features(self, text):
+        counts = Counter(g for g in char_ngrams(text, self.ngram_range) if g in self.vocab)
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        index = np.fromiter((self.vocab[g] for g in counts), dtype=np.int64, count=len(counts))
+        values = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * self.idf[index]
+        norm = float(np.sqrt(np.dot(values, values)))
+        return index, values / norm if norm else values
+
+    def scores(self, text):
+        """Return a {label: probability} dict for text"""
+        index, values = self._features(text)
+        logits = self.weights[:, index] @ values + self.bias
+        logits = logits - logits.max()
+        probs = np.exp(logits)
+        probs /= probs.sum()
+        return dict(zip(self.labels, probs.tolist()))
+
+    def predict(self, text):
+        """Return the most likely label for text"""
+        scores = self.scores(text)
+        return max(scores, key=scores.get)
+
+    def order(self, text, routes, top_k=3, min_confidence=0.5):
+        """Move the top_k most likely routes (at least min_confidence) to the front
+
+        The promoted routes are sorted by score, with equal scores keeping
+        their priority order. Everything the classifier is unsure about stays
+        behind them in the original priority order.
+
+        A route is only promoted when no route ahead of it in routes claims
+        text (a route without a pure matcher counts as claiming), so a
+        promoted route never takes an action a higher-priority route would
+        have taken.
+        """
+        if not routes or top_k <= 0:
+            return routes
+        scores = self.scores(text)
+        ranked = sorted(
+            (route for route in routes if scores.get(route.name, 0.0) >= min_confidence),
+            key=lambda route: -scores[route.name],
+        )[:top_k]
+        ranked = [route for route in ranked if not _outranked(route, text, routes)]
+        if not ranked:
+            return routes
+        front = set(id(route) for route in ranked)
+        return ranked + [route for route in routes if id(route) not in front]
+
+    def save(self, path):
+        """Write the model as a compressed .npz (vocabulary, idf, weights, labels)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        vocab = sorted(self.vocab, key=self.vocab.get)
+        np.savez_compressed(
+            path,
+            vocab=np.array(vocab),
+            idf=self.idf.astype(np.float32),
+            weights=self.weights.astype(np.float16),
+            bias=self.bias.astype(np.float32),
+            labels=np.array(self.labels),
+            ngram_range=np.array(self.ngram_range),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["vocab"].tolist(),
+                data["idf"],
+                data["weights"].astype(np.float32),
+                data["bias"],
+                data["labels"].tolist(),
+                tuple(data["ngram_range"].tolist()),
+            )
+
+
+def load_intent_model(path=DEFAULT_MODEL_PATH):
+    """Load the trained model, or return None if NumPy or the file is missing"""
+    if not NUMPY_AVAILABLE or not path or not os.path.exists(path):
+        return None
+    try:
+        return IntentModel.load(path)
+    except Exception as e:
+        print(f"Could not load intent model {path}: {e}")
+        return None
+
+
+def train(texts, labels, ngram_range=(2, 4), max_features=4096, min_df=1,
+          epochs=100, learning_rate=4.0, l2=1e-4, batch_size=128, seed=0):
+    """Fit an IntentModel with mini-batch gradient descent on the softmax loss"""
+    rng = np.random.default_rng(seed)
+    docs = [Counter(char_ngrams(text, ngram_range)) for text in texts]
+
+    df = Counter()
+    for doc in docs:
+        df.update(doc.keys())
+    vocab = [g for g, count in df.most_common(max_features) if count >= min_df]
+    n_docs = len(docs)
+    idf = np.array([np.log((1 + n_docs) / (1 + df[g])) + 1.0 for g in vocab], dtype=np.float32)
+
+    label_names = sorted(set(labels))
+    label_index = {label: i for i, label in enumerate(label_names)}
+    y = np.array([label_index[label] for label in labels], dtype=np.int64)
+
+    model = IntentModel(vocab, idf, np.zeros((len(label_names), len(vocab)), dtype=np.float32),
+                        np.zeros(len(label_names), dtype=np.float32), label_names, ngram_range)
+    rows = [model._features(text) for text in texts]
+
+    for _ in range(epochs):
+        order = rng.permutation(n_docs)
+        for start in range(0, n_docs, batch_size):
+            batch = order[start:start + batch_size]
+            X = np.zeros((len(batch), len(vocab)), dtype=np.float32)
+            for r, i in enumerate(batch):
+                index, values = rows[i]
+                X[r, index] = values
+            logits = X @ model.weights.T + model.bias
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            probs[np.arange(len(batch)), y[batch]] -= 1.0
+            grad_w = probs.T @ X / len(batch) + l2 * model.weights
+            grad_b = probs.mean(axis=0)
+            model.weights -= learning_rate * grad_w
+            model.bias -= learning_rate * grad_b
+    return model
+
+
+def load_examples(log_path, dispatcher):
+    """Read (utterance, label) pairs from the interaction log"""
+    examples = []
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            user = entry.get("user")
+            source = entry.get("source", "")
+            if not isinstance(user, str) or not user.strip() or source in SKIPPED_SOURCES:
+                continue
+            command = normalize_command(user)
+            if source in LLM_SOURCES:
+                label = LLM_VERDICT
+            else:
+                route, _ = dispatcher.first_match(command)
+                if route is None:
+                    continue
+                label = route.name
+            examples.append((command, label))
+    return examples
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q / 100.0 * (len(values) - 1))))]
+
+
+def report(model, examples, dispatcher, top_k=3, min_confidence=0.5):
+    """Compare the classifier with the regex chain on labelled examples"""
+    correct = correct_top_k = 0
+    model_ms, chain_ms = [], []
+    tried_priority = tried_ordered = 0
+    for command, label in examples:
+        started = time.perf_counter()
+        scores = model.scores(command)
+        model_ms.append((time.perf_counter() - started) * 1000)
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        correct += ranked[0] == label
+        correct_top_k += label in ranked[:top_k]
+
+        started = time.perf_counter()
+        candidates = dispatcher.candidates(command)
+        dispatcher.first_match(command, candidates)
+        chain_ms.append((time.perf_counter() - started) * 1000)
+
+        # Matchers evaluated before the labelled route claims the command
+        names = [route.name for route in candidates]
+        ordered = [route.name for route in model.order(command, candidates, top_k, min_confidence)]
+        tried_priority += names.index(label) + 1 if label in names else len(names)
+        tried_ordered += ordered.index(label) + 1 if label in ordered else len(ordered)
+
+    n = len(examples) or 1
+    return {
+        "examples": len(examples),
+        "labels": len(model.labels),
+        "accuracy": correct / n,
+        f"top{top_k}_accuracy": correct_top_k / n,
+        "classifier_ms_p50": _percentile(model_ms, 50),
+        "classifier_ms_p99": _percentile(model_ms, 99),
+        "regex_chain_ms_p50": _percentile(chain_ms, 50),
+        "regex_chain_ms_p99": _percentile(chain_ms, 99),
+        "handlers_tried_priority_order": tried_priority / n,
+        "handlers_tried_classifier_order": tried_ordered / n,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train or evaluate the EchoMind intent classifier")
+    parser.add_argument("command", choices=("train", "report"))
+    parser.add_argument("--log", default=DEFAULT_LOG_PATH, help="interaction log (JSONL)")
+    parser.add_argument("--model", "--out", dest="model", default=DEFAULT_MODEL_PATH, help="model file (.npz)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction of examples kept for the report")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--min-confidence", type=float, default=0.5)
+    parser.add_argument("--max-features", type=int, default=4096)
+    parser.add_argument("--epochs", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    if not NUMPY_AVAILABLE:
+        print("NumPy is required: pip install numpy")
+        return 1
+
+    from handlers.routes import ROUTES
+    from utils.dispatcher import KeywordDispatcher
+    dispatcher = KeywordDispatcher(ROUTES)
+
+    examples = load_examples(args.log, dispatcher)
+    if not examples:
+        print(f"No labelled utterances found in {args.log}")
+        return 1
+    random.Random(0).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout)) if args.command == "train" else 0
+    train_set, test_set = examples[:split], examples[split:]
+
+    if args.command == "train":
+        started = time.perf_counter()
+        model = train([c for c, _ in train_set], [l for _, l in train_set],
+                      max_features=args.max_features, epochs=args.epochs)
+        model.save(args.model)
+        print(f"Trained on {len(train_set)} utterances in {time.perf_counter() - started:.1f}s "
+              f"-> {args.model} ({os.path.getsize(args.model) // 1024} KiB)")
+    else:
+        started = time.perf_counter()
+        model = load_intent_model(args.model)
+        if model is None:
+            print(f"No model at {args.model}; run 'train' first")
+            return 1
+        print(f"Loaded {args.model} in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    if test_set:
+        for key, value in report(model, test_set, dispatcher, args.top_k, args.min_confidence).items():
+            print(f"{key:>32}: {value:.4f}" if isinstance(value, float) else f"{key:>32}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
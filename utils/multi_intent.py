@@ -0,0 +1,216 @@
+"""Multi-intent commands
+
+"open spotify and play despacito, then tell me the weather in delhi" is
+three requests in one utterance. This module splits such a command into
+steps, works out which steps have to wait for which, runs the rest
+concurrently and keeps the spoken output in the order the user asked.
+
+Splitting:
+- "then" and ";" always separate clauses
+- "and" and ", " separate sub-intents only when both sides stand on their own
+  (they start with an action word or a non-single-word route claims them),
+  so "search salt and pepper" stays one step
+- a clause claimed by a compound route ("open notepad and write a poem") is
+  left whole for its handler, and so is any clause a route claims unless
+  every one of its pieces is claimed by a route too ("search python and
+  java on chrome" is one search)
+- only pieces a local route claims become steps of their own; the pieces no
+  route claims stay together as one LLM prompt, so "who is the president of
+  india and what is his age" keeps its antecedent (and is not split at all)
+
+Dependencies: steps on routes that drive the desktop (windows, keystrokes,
+launched programs) run one after another in spoken order. Lookups on a
+concurrent route wait only for earlier steps on the same route, and LLM
+questions wait for nothing.
+
+Speech: the earliest unfinished step speaks live. Later steps are buffered
+and released as soon as everything before them has finished; a step that
+needs to listen() first waits for its turn to speak.
+"""
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional, Tuple
+
+from utils.text_processing import normalize_command
+from utils.voice_io import redirect_speech, speak_now
+
+# "then" / ";" - sequenced clauses (captured so unsplit text can be rebuilt)
+_CLAUSE_RE = re.compile(r"(\s*;\s*|\s*,?\s+(?:and\s+)?then\s+)", re.IGNORECASE)
+# "and" / ", " - possibly independent sub-intents
+_AND_RE = re.compile(r"(\s*,\s+and\s+|\s+and\s+also\s+|\s+and\s+|\s*,\s+)", re.IGNORECASE)
+
+# First words that make a fragment a request of its own
+ACTION_WORDS = frozenset((
+    "open", "launch", "start", "close", "shut", "quit", "exit", "minimize", "minimise",
+    "search", "google", "find", "look", "play", "pause", "stop", "resume",
+    "tell", "what", "what's", "whats", "who", "who's", "how", "how's", "when", "where", "why",
+    "which", "is", "are", "can", "could", "will", "do", "does",
+    "set", "remind", "show", "list", "check", "give", "get",
+    "turn", "increase", "decrease", "raise", "lower", "mute", "unmute",
+    "write", "type", "send", "message", "go", "switch", "move", "navigate",
+))
+
+# Resource shared by every route that is not marked concurrent
+DESKTOP = "desktop"
+
+
+class Step(NamedTuple):
+    """One sub-intent of a multi-intent command"""
+    index: int
+    command: str            # NormalizedCommand for the sub-intent
+    route: Optional[object]  # predicted Route, or None for an LLM question
+    after: Tuple[int, ...]   # indices of the steps that must finish first
+
+
+def _rejoin(text, pattern, standalone):
+    """Split text on pattern, gluing back pieces that cannot stand on their own"""
+    parts = pattern.split(text)
+    pieces = [parts[0]]
+    for separator, part in zip(parts[1::2], parts[2::2]):
+        if standalone(pieces[-1]) and standalone(part):
+            pieces.append(part)
+        else:
+            pieces[-1] = pieces[-1] + separator + part
+    return pieces
+
+
+def split_command(command, match_fn):
+    """Split command into sub-intent strings (a single item if it is one request)
+
+    match_fn(command) -> (route, match) is the pure routing lookup, e.g.
+    main.match_command.
+    """
+    def claimed_by(text):
+        route, _ = match_fn(normalize_command(text))
+        return route
+
+    def standalone(text):
+        words = text.strip(" ,.?!").lower().split()
+        if not words:
+            return False
+        if words[0] in ACTION_WORDS:
+            return True
+        route = claimed_by(text)
+        return route is not None and not route.single_word
+
+    pieces = []
+    for clause in _rejoin(str(command), _CLAUSE_RE, standalone):
+        route = claimed_by(clause)
+        if route is not None and route.compound:
+            pieces.append(clause)
+            continue
+        parts = _rejoin(clause, _AND_RE, standalone)
+        if route is not None and not all(claimed_by(part) is not None for part in parts):
+            # One request its route understands whole: "search python and java on chrome"
+            pieces.append(clause)
+        else:
+            pieces.extend(parts)
+    pieces = [piece.strip(" ,") for piece in pieces if piece.strip(" ,.?!")]
+
+    # Everything no route claims goes to the LLM as one prompt, at the place
+    # of its first piece: a follow-up question needs the one before it
+    merged, questions = [], []
+    for piece in pieces:
+        if claimed_by(piece) is not None:
+            merged.append(piece)
+            continue
+        if not questions:
+            merged.append(None)
+        questions.append(piece)
+    return [" and ".join(questions) if piece is None else piece for piece in merged]
+
+
+def _resource(route):
+    if route is None:
+        return None
+    return route.name if route.concurrent else DESKTOP
+
+
+def plan_steps(command, match_fn):
+    """Return the dependency-ordered Steps of command, or None for a single intent"""
+    pieces = split_command(command, match_fn)
+    if len(pieces) < 2:
+        return None
+
+    steps = []
+    last_by_resource = {}
+    for index, piece in enumerate(pieces):
+        sub_command = normalize_command(piece)
+        route, _ = match_fn(sub_command)
+        resource = _resource(route)
+        after = ()
+        if resource is not None:
+            if resource in last_by_resource:
+                after = (last_by_resource[resource],)
+            last_by_resource[resource] = index
+        steps.append(Step(index, sub_command, route, after))
+    return steps
+
+
+class SpeechSequencer:
+    """Releases the speech of concurrently running steps in step order"""
+
+    def __init__(self, count, say=speak_now):
+        self._say = say
+        self._buffers = [[] for _ in range(count)]
+        self._done = [False] * count
+        self._head = 0
+        self._turn = threading.Condition(threading.RLock())
+
+    def sink(self, index):
+        """Return the speak() replacement for step index"""
+        def _sink(text):
+            with self._turn:
+                if index != self._head:
+                    self._buffers[index].append(text)
+                    return
+            # Only the head step speaks live, so nothing can interleave here
+            self._say(text)
+        return _sink
+
+    def wait_turn(self, index):
+        """Block until step index is the one speaking live"""
+        with self._turn:
+            while self._head < index:
+                self._turn.wait()
+
+    def finish(self, index):
+        """Mark step index done and release the buffered speech that is now due"""
+        with self._turn:
+            self._done[index] = True
+            while self._head < len(self._done) and self._done[self._head]:
+                self._head += 1
+                if self._head < len(self._done):
+                    for text in self._buffers[self._head]:
+                        self._say(text)
+                    self._buffers[self._head].clear()
+            self._turn.notify_all()
+
+
+def run_steps(steps, run_step, max_workers=4):
+    """Run steps on a thread pool, honouring Step.after; return their results in order
+
+    run_step(step) does the actual work (route or ask the LLM). A step that
+    raises is reported and yields None; the other steps still run.
+    """
+    sequencer = SpeechSequencer(len(steps))
+    futures = []
+
+    def _run(step):
+        for index in step.after:
+            futures[index].result()
+        with redirect_speech(sequencer.sink(step.index), lambda: sequencer.wait_turn(step.index)):
+            try:
+                return run_step(step)
+            except Exception as e:
+                print(f"Error running '{step.command}': {e}")
+                return None
+            finally:
+                sequencer.finish(step.index)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(steps))),
+                            thread_name_prefix="multi-intent") as executor:
+        for step in steps:
+            futures.append(executor.submit(_run, step))
+        return [future.result() for future in futures]
@@ -0,0 +1,130 @@
+"""Adaptive noise-floor estimate for the microphone
+
+Replaces the 1.5 s `adjust_for_ambient_noise` calibration that every listen()
+attempt used to do. The always-on capture stream (utils/audio_capture.py)
+feeds every block it records into a NoiseFloor. The noise floor is an
+exponential moving average of the RMS energy of blocks below the current
+speech threshold. Blocks above it (speech, the assistant's own voice) only
+nudge it towards the threshold, slowly: a few seconds of speech barely move
+it, but a room that stays louder is followed within a minute or two.
+The speech threshold handed to the recognizer is the floor times
+NOISE_FLOOR_RATIO, and never less than NOISE_FLOOR_MIN_THRESHOLD.
+
+The estimate is saved to NOISE_FLOOR_PATH, so after a restart the first turn
+starts with the last known floor instead of a guess.
+"""
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from config.settings import (
+    NOISE_FLOOR_MIN_THRESHOLD, NOISE_FLOOR_PATH, NOISE_FLOOR_RATIO, NOISE_FLOOR_SAVE_SECONDS,
+)
+
+# Time constants (seconds) for quiet blocks and for blocks above the threshold
+QUIET_TAU = 2.0
+LOUD_TAU = 60.0
+# Floor assumed when nothing is known yet (speech_recognition starts at 300 / 1.5)
+DEFAULT_FLOOR = 100.0
+
+
+def rms(samples, scratch=None):
+    """RMS energy of int16 samples (same scale as recognizer.energy_threshold)
+
+    scratch: optional float32 array of at least len(samples), used instead
+    of allocating a float copy of every block.
+    """
+    if len(samples) == 0:
+        return 0.0
+    if scratch is None or len(scratch) < len(samples):
+        samples = samples.astype(np.float32)
+    else:
+        scratch = scratch[:len(samples)]
+        np.copyto(scratch, samples)
+        samples = scratch
+    return float(np.sqrt(np.dot(samples, samples) / len(samples)))
+
+
+class NoiseFloor:
+    """Running noise-floor estimate, persisted as JSON"""
+
+    def __init__(self, sample_rate, path=NOISE_FLOOR_PATH, ratio=NOISE_FLOOR_RATIO,
+                 min_threshold=NOISE_FLOOR_MIN_THRESHOLD):
+        self.sample_rate = sample_rate
+        self.path = path
+        self.ratio = ratio
+        self.min_threshold = min_threshold
+        self.floor = DEFAULT_FLOOR
+        self.loaded = self.load()
+        self.blocks = 0
+        self.speech_blocks = 0
+        self._scratch = np.empty(0, dtype=np.float32)
+        self._lock = threading.Lock()
+        self._saved_at = time.monotonic()
+
+    @property
+    def known(self):
+        """True once there is a measured (or saved) floor"""
+        return self.loaded or self.blocks > 0
+
+    @property
+    def threshold(self):
+        return max(self.min_threshold, self.floor * self.ratio)
+
+    def update(self, samples):
+        """Account for one block of int16 samples; returns True if it looked like speech"""
+        if len(self._scratch) < len(samples):
+            self._scratch = np.empty(len(samples), dtype=np.float32)
+        energy = rms(samples, self._scratch)
+        speech = energy > self.threshold
+        seconds = len(samples) / self.sample_rate
+        if speech:
+            self.floor += (1.0 - math.exp(-seconds / LOUD_TAU)) * (self.threshold - self.floor)
+        elif self.blocks == 0 and not self.loaded:
+            self.floor = energy  # first measurement: no need to creep towards it
+        else:
+            self.floor += (1.0 - math.exp(-seconds / QUIET_TAU)) * (energy - self.floor)
+        self.blocks += 1
+        self.speech_blocks += speech
+        return speech
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            floor = float(state["floor"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        if floor <= 0:
+            return False
+        self.floor = floor
+        return True
+
+    def save(self, force=False):
+        """Write the estimate to path (at most every NOISE_FLOOR_SAVE_SECONDS unless force)"""
+        with self._lock:
+            if not self.known or (not force and time.monotonic() - self._saved_at < NOISE_FLOOR_SAVE_SECONDS):
+                return False
+            self._saved_at = time.monotonic()
+            state = {"floor": round(self.floor, 2), "threshold": round(self.threshold, 2), "saved": time.time()}
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.replace(tmp, self.path)
+            except OSError:
+                return False
+            return True
+
+    def stats(self):
+        return {
+            "floor": round(self.floor, 1),
+            "threshold": round(self.threshold, 1),
+            "blocks": self.blocks,
+            "speech_blocks": self.speech_blocks,
+        }
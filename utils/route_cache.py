@@ -0,0 +1,122 @@
+"""Routing decision cache
+
+Users repeat the same commands constantly ("what's the time", "open chrome",
+"volume up"). This module keeps a bounded LRU that maps the normalized text
+of a command to the route that claimed it, or to the LLM_VERDICT sentinel when
+no handler did and the command went to Gemini.
+
+Entries are dropped automatically when the source of any routed handler,
+handlers/routes.py or config/settings.py changes on disk, or when one of the
+settings maps (COMMON_APPS, WEBSITE_MAP, ...) is modified at runtime.
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Cached verdict for commands that no local handler claims
+LLM_VERDICT = "__llm__"
+
+# Settings whose contents influence routing decisions
+CONFIG_MAPS = (
+    "COMMON_APPS", "WEBSITE_MAP", "LOCATION_MAP", "PROCESS_NAMES", "CONNECTOR_WORDS",
+    "WEATHER_CITY_BLACKLIST", "EXIT_KEYWORDS", "THANK_YOU_KEYWORDS",
+)
+
+
+def _module_file(module_name):
+    module = sys.modules.get(module_name)
+    return getattr(module, "__file__", None)
+
+
+class RouteCache:
+    """Bounded LRU of routing verdicts with hit/miss counters"""
+
+    def __init__(self, routes, maxsize=256, check_interval=2.0):
+        self.maxsize = maxsize
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        files = {_module_file(route.handler.__module__) for route in routes}
+        files.add(_module_file("handlers.routes"))
+        files.add(_module_file("config.settings"))
+        self._watch_files = sorted(f for f in files if f)
+        self._fingerprint = self._compute_fingerprint()
+        self._next_check = 0.0
+
+    def _compute_fingerprint(self):
+        parts = []
+        for path in self._watch_files:
+            try:
+                stat = os.stat(path)
+                parts.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                parts.append((path, None, None))
+        settings = sys.modules.get("config.settings")
+        if settings is not None:
+            parts.append(repr([getattr(settings, name, None) for name in CONFIG_MAPS]))
+        return hash(tuple(parts))
+
+    def _check_fresh(self, now):
+        """Clear the cache if handler code or config changed (checked at most every check_interval s)"""
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        fingerprint = self._compute_fingerprint()
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def get(self, key):
+        """Return the cached route name (or LLM_VERDICT) for key, or None on a miss"""
+        with self._lock:
+            self._check_fresh(time.monotonic())
+            verdict = self._entries.get(key)
+            if verdict is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return verdict
+
+    def peek(self, key):
+        """Return the cached verdict for key without touching LRU order or counters"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key, verdict):
+        """Remember the verdict for key, evicting the least recently used entry"""
+        with self._lock:
+            self._entries[key] = verdict
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        """Forget a verdict that turned out to be stale"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
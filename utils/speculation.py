@@ -0,0 +1,98 @@
+"""Speculative LLM requests
+
+When a command is likely to end up at Gemini anyway, the request can be sent
+as soon as the utterance is normalized instead of after every candidate
+handler has run (some of them do their own network I/O first). If a local
+handler claims the command after all, the speculative request is cancelled
+when it has not started yet, or its result is simply thrown away.
+
+Counters:
+- started:   speculative requests submitted
+- used:      results that answered the fallback ("saved" requests)
+- wasted:    requests that were sent but whose result was not needed
+- cancelled: requests dropped before they were sent (no cost)
+- saved_seconds: total head start the used requests had over a normal fallback
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SpeculativeLLM:
+    """Runs at most one speculative request per utterance on a small thread pool"""
+
+    def __init__(self, request_fn, max_workers=2):
+        self._request_fn = request_fn
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculative-llm")
+        self._lock = threading.Lock()
+        self._pending = None  # (key, future, started_at)
+        self.started = 0
+        self.used = 0
+        self.wasted = 0
+        self.cancelled = 0
+        self.saved_seconds = 0.0
+
+    def start(self, key, prompt):
+        """Submit prompt for key, discarding any earlier speculation"""
+        self.discard()
+        future = self._executor.submit(self._request_fn, prompt)
+        with self._lock:
+            self._pending = (key, future, time.monotonic())
+            self.started += 1
+
+    def take(self, key, timeout=None):
+        """Return the speculative response for key, or None if there is none
+
+        Blocks until the request finishes. Errors are swallowed so the caller
+        can fall back to a normal request.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return None
+        pending_key, future, started_at = pending
+        if pending_key != key:
+            self._drop(future)
+            return None
+
+        head_start = time.monotonic() - started_at
+        try:
+            response = future.result(timeout=timeout)
+        except Exception:
+            with self._lock:
+                self.wasted += 1
+            return None
+        with self._lock:
+            self.used += 1
+            self.saved_seconds += head_start
+        return response
+
+    def discard(self):
+        """Forget the pending speculation (a local handler claimed the command)"""
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            self._drop(pending[1])
+
+    def _drop(self, future):
+        cancelled = future.cancel()
+        with self._lock:
+            if cancelled:
+                self.cancelled += 1
+            else:
+                self.wasted += 1
+
+    def stats(self):
+        """Return the speculation counters"""
+        with self._lock:
+            return {
+                "started": self.started,
+                "used": self.used,
+                "wasted": self.wasted,
+                "cancelled": self.cancelled,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+    def shutdown(self):
+        self.discard()
+        self._executor.shutdown(wait=False)
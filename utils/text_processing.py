@@ -1,45 +1,96 @@
 """Symbol conversion and text processing utilities"""
 import re
 
+# Spoken phrase -> symbol. Words in a phrase may be separated by any whitespace.
+SPOKEN_SYMBOLS = {
+    'question mark': '?',
+    'exclamation mark': '!',
+    'exclamation point': '!',
+    'period': '.',
+    'full stop': '.',
+    'dot': '.',
+    'comma': ',',
+    'colon': ':',
+    'semicolon': ';',
+    'apostrophe': "'",
+    'quote': '"',
+    'double quote': '"',
+    'left paren': '(',
+    'opening paren': '(',
+    'parens': '(',
+    'right paren': ')',
+    'closing paren': ')',
+    'square bracket': '[',
+    'left bracket': '[',
+    'left square bracket': '[',
+    'right bracket': ']',
+    'closing bracket': ']',
+    'right square bracket': ']',
+    'at sign': '@',
+    'hash': '#',
+    'hashtag': '#',
+    'pound sign': '#',
+    'dollar sign': '$',
+    'percent': '%',
+    'percent sign': '%',
+    'ampersand': '&',
+    'and sign': '&',
+    'asterisk': '*',
+    'star': '*',
+}
+
+# Only converted when they are the last word of the utterance
+TRAILING_SPOKEN_SYMBOLS = {
+    'question': '?',
+    'exclamation': '!',
+}
+
+_SYMBOL_LOOKUP = {**SPOKEN_SYMBOLS, **TRAILING_SPOKEN_SYMBOLS}
+
+
+def _phrase_pattern(phrase):
+    return r'\s+'.join(re.escape(word) for word in phrase.split())
+
+
+# One alternation for every phrase. Longest phrases come first so that
+# "left square bracket" wins over "square bracket" at the same position.
+_SPOKEN_SYMBOL_RE = re.compile(
+    r'\b(?:'
+    + '|'.join(_phrase_pattern(p) for p in sorted(SPOKEN_SYMBOLS, key=len, reverse=True))
+    + r')\b'
+    + r'|\b(?:' + '|'.join(_phrase_pattern(p) for p in TRAILING_SPOKEN_SYMBOLS) + r')\b$',
+    re.IGNORECASE,
+)
+
+_QUESTION_WORDS = frozenset((
+    'how', 'what', 'when', 'where', 'why', 'whom',
+    'whose', 'which', 'do', 'does', 'did',
+    'could', 'can', 'will', 'should', 'would',
+    'may', 'might', 'must', 'has', 'have',
+    'is', 'are', 'was', 'were',
+))
+
+_TOKEN_RE = re.compile(r"\w+")
+_SYMBOL_ONLY_RE = re.compile(r'^[?!.,;:\'"()\[\]@#$%&*\-/+=~`|\\<>]+$')
+_TRAILING_PUNCT_RE = re.compile(r'[.!]+$')
+
+
+def _replace_spoken_symbol(match):
+    return _SYMBOL_LOOKUP[' '.join(match.group(0).lower().split())]
+
+
 def convert_spoken_symbols(text):
-    """Convert spoken punctuation marks and symbols into their actual characters"""
-    symbol_map = {
-        r'\bquestion mark\b': '?',
-        r'\bquestion\s+mark\b': '?',
-        r'\bquestion\b$': '?',
-        r'\bexclamation mark\b': '!',
-        r'\bexclamation point\b': '!',
-        r'\bexclamation\b$': '!',
-        r'\bperiod\b': '.',
-        r'\bfull stop\b': '.',
-        r'\bdot\b': '.',
-        r'\bcomma\b': ',',
-        r'\bcolon\b': ':',
-        r'\bsemicolon\b': ';',
-        r'\bapostrophe\b': "'",
-        r'\bquote\b': '"',
-        r'\bdouble quote\b': '"',
-        r'\bleft paren\b|\bopening paren\b|\bparens\b': '(',
-        r'\bright paren\b|\bclosing paren\b': ')',
-        r'\bsquare bracket\b|\bleft bracket\b|\bleft square bracket\b': '[',
-        r'\bright bracket\b|\bclosing bracket\b|\bright square bracket\b': ']',
-        r'\bat sign\b': '@',
-        r'\bhash\b|\bhashtag\b|\bpound sign\b': '#',
-        r'\bdollar sign\b': '$',
-        r'\bpercent\b|\bpercent sign\b': '%',
-        r'\bampersand\b|\band sign\b': '&',
-        r'\basterisk\b|\bstar\b': '*',
-    }
-    
-    result = text
-    for spoken, symbol in symbol_map.items():
-        result = re.sub(spoken, symbol, result, flags=re.IGNORECASE)
-    
-    return result
+    """Convert spoken punctuation marks and symbols into their actual characters
+
+    All phrases are matched in a single pass of one precompiled pattern.
+    """
+    if not text:
+        return text
+    return _SPOKEN_SYMBOL_RE.sub(_replace_spoken_symbol, text)
 
 def is_symbol_only(text):
     """Check if command contains only symbols"""
-    return bool(re.match(r'^[?!.,;:\'"()\[\]@#$%&*\-/+=~`|\\<>]+$', text.strip()))
+    return bool(_SYMBOL_ONLY_RE.match(text.strip()))
 
 def clean_connector_words(text):
     """Remove connector words from the beginning of text"""
@@ -59,21 +110,8 @@ def is_question(text):
     if text.strip().endswith('?'):
         return True
     
-    # Common question words
-    question_words = [
-        r'\bhow\b', r'\bwhat\b', r'\bwhen\b', r'\bwhere\b', r'\bwhy\b', r'\bwhom\b',
-        r'\bwhose\b', r'\bwhich\b', r'\bdo\b', r'\bdoes\b', r'\bdid\b',
-        r'\bcould\b', r'\bcan\b', r'\bwill\b', r'\bshould\b', r'\bwould\b',
-        r'\bmay\b', r'\bmight\b', r'\bmust\b', r'\bhas\b', r'\bhave\b',
-        r'\bis\b', r'\bare\b', r'\bwas\b', r'\bwere\b'
-    ]
-    
-    text_lower = text.lower().strip()
-    for pattern in question_words:
-        if re.search(pattern, text_lower):
-            return True
-    
-    return False
+    # Common question words, checked with one set lookup over the word tokens
+    return not _QUESTION_WORDS.isdisjoint(_TOKEN_RE.findall(text.lower()))
 
 def ensure_question_mark_if_question(command, response=None):
     """
@@ -91,14 +129,7 @@ def ensure_question_mark_if_question(command, response=None):
     
     # Check if command is a question
     if is_question(command):
-        command = command.strip()
-        
-        # Remove trailing punctuation to add ? only
-        command = re.sub(r'[.!]+$', '', command).strip()
-        
-        # Add question mark if not already there
-        if not command.endswith('?'):
-            command = command + '?'
+        command = _format_question(command)
     
     return command
 
@@ -115,7 +146,7 @@ def ensure_proper_punctuation(command):
     command = command[0].upper() + command[1:]
     
     if is_question(command):
-        command = re.sub(r'[.!]+$', '', command).strip()
+        command = _TRAILING_PUNCT_RE.sub('', command).strip()
         if not command.endswith('?'):
             command = command + '?'
     else:
@@ -123,3 +154,156 @@ def ensure_proper_punctuation(command):
             command = command + '.'
             
     return command
+
+
+_NUMBER_RE = re.compile(r"\d+")
+_TIME_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?")
+
+
+class NormalizedCommand(str):
+    """One utterance, normalized once and shared by the router and every handler.
+
+    Behaves like the formatted command string (so existing ``re.search`` and
+    slicing code keeps working) and carries the derived views as read-only
+    attributes:
+        original  - the command text as routed (symbols converted, ? added)
+        lowered   - lowercased text
+        tokens    - tuple of lowercase word tokens (``\\w+``)
+        token_set - frozenset of tokens, for whole-word keyword checks
+        is_question - question flag computed during normalization
+        symbol_only - True when the text contains only punctuation
+        numbers   - integers found in the text, in order
+        times     - (hour, minute, period) tuples; period is "AM"/"PM" or None
+    """
+
+    def __new__(cls, text, is_question_flag=None):
+        obj = super().__new__(cls, text)
+        original = str.__str__(obj)
+        lowered = str.lower(original)
+        tokens = tuple(_TOKEN_RE.findall(lowered))
+        if is_question_flag is None:
+            is_question_flag = original.strip().endswith('?') or not _QUESTION_WORDS.isdisjoint(tokens)
+        times = tuple(
+            (int(h), int(m) if m else 0, p.upper() if p else None)
+            for h, m, p in _TIME_RE.findall(lowered)
+        )
+        _set = object.__setattr__
+        _set(obj, "original", original)
+        _set(obj, "lowered", lowered)
+        _set(obj, "tokens", tokens)
+        _set(obj, "token_set", frozenset(tokens))
+        _set(obj, "is_question", bool(is_question_flag))
+        _set(obj, "symbol_only", is_symbol_only(original))
+        _set(obj, "numbers", tuple(int(n) for n in _NUMBER_RE.findall(lowered)))
+        _set(obj, "times", times)
+        return obj
+
+    def __setattr__(self, name, value):
+        raise AttributeError("NormalizedCommand is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("NormalizedCommand is immutable")
+
+    def __reduce__(self):
+        return (self.__class__, (self.original, self.is_question))
+
+    def lower(self):
+        """Return the cached lowercase text instead of lowercasing again"""
+        return self.lowered
+
+
+def as_command(text):
+    """Return text as a NormalizedCommand, reusing it if it already is one"""
+    if isinstance(text, NormalizedCommand):
+        return text
+    return NormalizedCommand(text if text is not None else "")
+
+
+def normalize_command(text):
+    """Run the full per-utterance normalization stage once.
+
+    Converts spoken symbols, adds a trailing ? to questions and returns a
+    NormalizedCommand that the router and handlers can share.
+    """
+    converted = convert_spoken_symbols(text or "")
+    question = is_question(converted)
+    formatted = _format_question(converted) if question else converted
+    return NormalizedCommand(formatted, question)
+
+
+def _format_question(command):
+    """Strip trailing . or ! and make sure the command ends with ?"""
+    command = _TRAILING_PUNCT_RE.sub('', command.strip()).strip()
+    if not command.endswith('?'):
+        command = command + '?'
+    return command
+
+
+def normalize_many(texts, cache_size=65536):
+    """Normalize an iterable of utterances, e.g. historical log lines.
+
+    Yields one NormalizedCommand per input, in order. Repeated utterances are
+    normalized once and reused (up to cache_size distinct texts), which keeps
+    large analytics replays cheap.
+    """
+    seen = {}
+    for text in texts:
+        command = seen.get(text)
+        if command is None:
+            command = normalize_command(text)
+            if len(seen) < cache_size:
+                seen[text] = command
+        yield command
+
+
+# Sentence end: . ! ? (optionally followed by closing quotes/brackets) and whitespace
+_SENTENCE_END_RE = re.compile(r'[.!?…]+["\')\]]*\s+|\n+')
+# Words ending in "." that do not end a sentence
+_ABBREVIATIONS = frozenset(("mr", "mrs", "ms", "dr", "st", "vs", "etc", "e.g", "i.e", "approx", "no", "fig"))
+_CLAUSE_END_RE = re.compile(r'[,;:]\s+')
+
+
+class SentenceSegmenter:
+    """Cut a stream of text chunks into speakable sentences as they complete
+
+    feed() returns the segments finished by the new chunk; flush() returns
+    whatever is left once the stream ends. Segments shorter than min_chars
+    ("1.", "Yes.") are held back and joined to the next one, and a sentence
+    that runs past max_chars is cut at its last clause break (or space) so
+    speech can start before a long sentence is done.
+    """
+
+    def __init__(self, min_chars=12, max_chars=160):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        segments = []
+        start = 0
+        for found in _SENTENCE_END_RE.finditer(self._buffer):
+            end = found.end()
+            candidate = self._buffer[start:end]
+            words = candidate.rstrip().rstrip('.').split()
+            if found.group().startswith('.') and words and words[-1].lower() in _ABBREVIATIONS:
+                continue
+            if len(candidate.strip()) < self.min_chars:
+                continue
+            segments.append(candidate.strip())
+            start = end
+        self._buffer = self._buffer[start:]
+
+        while len(self._buffer) > self.max_chars:
+            head = self._buffer[:self.max_chars]
+            cuts = list(_CLAUSE_END_RE.finditer(head))
+            cut = cuts[-1].end() if cuts else head.rfind(' ') + 1
+            if cut <= 0:
+                break
+            segments.append(self._buffer[:cut].strip())
+            self._buffer = self._buffer[cut:]
+        return [s for s in segments if s]
+
+    def flush(self):
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
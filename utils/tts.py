@@ -0,0 +1,257 @@
+"""Long-lived text-to-speech worker
+
+speak() used to start a new espeak / festival / say / PowerShell SAPI.SpVoice
+process for every utterance and wait for it to finish. On Windows that is
+300+ ms of PowerShell startup before any sound. Here one worker thread owns
+one voice for the whole session and speaks queued text in order:
+- pyttsx3 (SAPI5 on Windows, NSSpeechSynthesizer on macOS, eSpeak on Linux):
+  one engine instance, created on the worker thread
+- otherwise (TTS_ENGINE=command, pyttsx3 missing or failing), the old
+  per-utterance commands, still off the caller's thread
+
+Callers get an Event per utterance and only wait if they need to. listen()
+waits for the queue to drain, so the microphone never hears the assistant,
+and skips audio from before SpeechWorker.spoken_at. That wait is bounded by
+how long the queued text should take to say: a voice that hangs (pyttsx3's
+runAndWait can, e.g. NSSpeechSynthesizer off the main thread) is abandoned
+and the rest is spoken through CommandVoice on a new thread.
+"""
+import queue
+import subprocess
+import threading
+import time
+
+from config.settings import OS, TTS_ENGINE, TTS_RATE
+
+try:
+    import pyttsx3
+except ImportError:
+    pyttsx3 = None
+
+# drain() gives up on the voice after this long plus this much per queued character
+HANG_MIN_SECONDS = 5.0
+HANG_SECONDS_PER_CHAR = 0.15
+
+
+class CommandVoice:
+    """One platform TTS process per utterance"""
+
+    name = "command"
+
+    def say(self, text):
+        if OS == "windows":
+            subprocess.run(["powershell", "-c", f'(New-Object -ComObject SAPI.SpVoice).Speak("{text}")'], capture_output=True)
+        elif OS == "darwin":  # macOS
+            subprocess.run(["say", text], capture_output=True)
+        elif OS == "linux":
+            try:
+                subprocess.run(["espeak", text], capture_output=True)
+            except FileNotFoundError:
+                try:
+                    subprocess.run(["festival", "--tts"], input=text.encode(), capture_output=True)
+                except FileNotFoundError:
+                    pass
+
+    def close(self):
+        pass
+
+
+class EngineVoice:
+    """One pyttsx3 engine; must be created and used on the same thread"""
+
+    name = "pyttsx3"
+
+    def __init__(self, rate=TTS_RATE):
+        if OS == "windows":
+            try:
+                import comtypes
+                comtypes.CoInitialize()  # SAPI5 is COM: initialise it on this thread
+            except ImportError:
+                pass
+        self.engine = pyttsx3.init()
+        if rate:
+            self.engine.setProperty("rate", rate)
+
+    def say(self, text):
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def close(self):
+        try:
+            self.engine.stop()
+        except Exception:
+            pass
+
+
+def open_voice(engine=TTS_ENGINE):
+    """The voice for engine ("auto", "pyttsx3" or "command")"""
+    if engine != "command" and pyttsx3 is not None:
+        try:
+            return EngineVoice()
+        except Exception as e:
+            print(f"pyttsx3 unavailable, speaking through a process per utterance: {e}")
+    elif engine == "pyttsx3":
+        print("pyttsx3 is not installed, speaking through a process per utterance")
+    return CommandVoice()
+
+
+class SpeechWorker:
+    """Speaks queued text, in order, on one thread with one voice"""
+
+    def __init__(self, engine=TTS_ENGINE):
+        self.engine = engine
+        self.voice = None
+        self._queue = queue.Queue()
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._pending_chars = 0
+        self._current = None  # (done, text) of the utterance being spoken
+        self._thread = None
+        self._lock = threading.Lock()
+        self.spoken_at = 0.0  # monotonic time the last utterance finished
+        self.utterances = 0
+        self.failures = 0
+        self.hangs = 0
+        self._wait_total = 0.0  # seconds utterances spent queued before being spoken
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, args=(self._queue,), daemon=True, name="tts")
+                self._thread.start()
+        return self
+
+    def say(self, text):
+        """Queue text; returns an Event set once it has been spoken"""
+        self.start()
+        done = threading.Event()
+        with self._idle:
+            self._pending += 1
+            self._pending_chars += len(text)
+            self._queue.put((text, done, time.monotonic()))
+        return done
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def wait(self, timeout=None):
+        """Block until everything queued has been spoken; False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def drain(self):
+        """wait() for as long as the queued text should take to say
+
+        If the voice hangs instead, it is abandoned: what is still queued is
+        spoken through CommandVoice on a new thread. Returns False then.
+        """
+        timeout = HANG_MIN_SECONDS + self._pending_chars * HANG_SECONDS_PER_CHAR
+        if self.wait(timeout):
+            return True
+        print(f"Speech output hung for {timeout:.0f} s, speaking through a process per utterance")
+        self._abandon()
+        return False
+
+    def _abandon(self):
+        """Leave the stuck thread behind with an empty queue and restart on CommandVoice"""
+        with self._lock:
+            with self._idle:
+                stuck, self._queue = self._queue, queue.Queue()
+                while True:
+                    try:
+                        item = stuck.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        self._queue.put(item)
+                stuck.put(None)  # the stuck thread exits if it ever returns
+                self.engine = "command"
+                self.voice = None
+                self.hangs += 1
+                current, self._current = self._current, None
+                if current is not None:
+                    # The utterance it hangs on counts as spoken
+                    self._finished(current[1])
+                self._idle.notify_all()
+            self._thread = None
+        if current is not None:
+            current[0].set()
+        self.start()
+
+    def _finished(self, text):
+        """Bookkeeping for one utterance; call with self._idle held"""
+        self.spoken_at = time.monotonic()
+        self._pending -= 1
+        self._pending_chars -= len(text)
+
+    def _run(self, items):
+        voice = open_voice(self.engine)
+        with self._idle:
+            if items is self._queue:
+                self.voice = voice
+        while True:
+            item = items.get()
+            if item is None:
+                break
+            text, done, queued_at = item
+            with self._idle:
+                self._current = (done, text)
+            started = time.monotonic()
+            try:
+                voice.say(text)
+            except Exception:
+                self.failures += 1
+                if not isinstance(voice, CommandVoice):
+                    # The engine broke: fall back to a process per utterance
+                    voice.close()
+                    voice = CommandVoice()
+                    try:
+                        voice.say(text)
+                    except Exception:
+                        pass
+            with self._idle:
+                if items is not self._queue:
+                    break  # abandoned by drain(), which accounted for this utterance
+                self.voice = voice
+                self._current = None
+                self.utterances += 1
+                self._wait_total += started - queued_at
+                self._finished(text)
+                self._idle.notify_all()
+            done.set()
+        voice.close()
+
+    def stop(self, timeout=10.0):
+        """Speak what is still queued (up to timeout seconds), then end the thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def stats(self):
+        return {
+            "engine": self.voice.name if self.voice is not None else None,
+            "utterances": self.utterances,
+            "failures": self.failures,
+            "hangs": self.hangs,
+            "queued_ms_mean": round(self._wait_total / self.utterances * 1000, 1) if self.utterances else None,
+        }
+
+
+_worker = SpeechWorker()
+
+
+def get_tts():
+    """The shared SpeechWorker (its thread starts with the first utterance)"""
+    return _worker
+
+
+def stop_tts():
+    """Finish speaking and stop the shared worker; returns its stats (None if it never spoke)"""
+    if _worker.voice is None and not _worker.busy:
+        return None
+    _worker.stop()
+    return _worker.stats()
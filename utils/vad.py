@@ -0,0 +1,207 @@
+"""NumPy voice activity detector for end-of-utterance detection
+
+speech_recognition's Recognizer.listen ends a phrase after pause_threshold
+(1.2 s) of blocks below its energy threshold, so every command waits at
+least that long before recognition starts. The detector here classifies
+20 ms frames instead, all frames of a block at once:
+- energy: RMS above the speech threshold (the noise-floor threshold scaled
+  by the aggressiveness level)
+- spectral flatness (100-4000 Hz): voiced speech is tonal (low flatness),
+  while steady noise is flat
+- zero-crossing rate: loud, flat frames with many zero crossings are
+  unvoiced consonants (s, f, t), and they count as speech too
+
+An utterance starts after ONSET_MS of speech frames and ends after a
+hangover of non-speech frames (a few hundred ms, shorter the more aggressive
+the level). Utterances shorter than MIN_SPEECH_MS are ignored, like
+speech_recognition's phrase_threshold.
+
+Audio is never copied per block: the detector takes int16 views (of the
+capture ring, see utils/audio_capture.py) and works in scratch arrays it
+keeps between blocks; record_utterance joins the utterance once at the end.
+
+Aggressiveness 0-3 trades false cut-offs (a pause inside a sentence taken
+for its end) against latency. See benchmarks/vad_benchmark.py.
+"""
+import numpy as np
+import speech_recognition as sr
+
+from config.settings import VAD_AGGRESSIVENESS, VAD_HANGOVER_MS
+
+FRAME_MS = 20
+ONSET_MS = 60
+MIN_SPEECH_MS = 200
+PRE_ROLL_MS = 300  # audio kept before the detected start
+TAIL_MS = 100      # audio kept after the detected end
+
+# aggressiveness -> (threshold multiplier, max spectral flatness of voiced frames, hangover ms)
+LEVELS = {
+    0: (0.8, 0.60, 800),
+    1: (1.0, 0.50, 600),
+    2: (1.2, 0.40, 400),
+    3: (1.5, 0.30, 250),
+}
+# Unvoiced consonants: zero-crossing rate above this, and this much louder than the threshold
+FRICATIVE_ZCR = 0.25
+FRICATIVE_ENERGY = 2.0
+
+
+def _grow(buffer, size, dtype):
+    """buffer if it holds size elements, else a new (larger) scratch array"""
+    if buffer is None or len(buffer) < size:
+        return np.empty(max(size, 2 * len(buffer) if buffer is not None else size), dtype=dtype)
+    return buffer
+
+
+class VoiceActivityDetector:
+    """Frame classifier plus onset/hangover state machine over int16 samples"""
+
+    def __init__(self, sample_rate, energy_threshold=300.0, aggressiveness=VAD_AGGRESSIVENESS,
+                 hangover_ms=VAD_HANGOVER_MS):
+        level = LEVELS[min(3, max(0, int(aggressiveness)))]
+        self.sample_rate = int(sample_rate)
+        self.energy_threshold = energy_threshold
+        self.threshold_ratio, self.max_flatness, default_hangover = level
+        self.frame = max(1, self.sample_rate * FRAME_MS // 1000)
+        self.hangover_frames = max(1, int(hangover_ms or default_hangover) // FRAME_MS)
+        self.onset_frames = max(1, ONSET_MS // FRAME_MS)
+        self.min_speech_frames = max(1, MIN_SPEECH_MS // FRAME_MS)
+        self._window = np.hanning(self.frame).astype(np.float32)
+        freqs = np.fft.rfftfreq(self.frame, 1.0 / self.sample_rate)
+        self._band = (freqs >= 100) & (freqs <= 4000)
+        self._carry = np.empty(self.frame, dtype=np.int16)  # partial frame left from the last block
+        self._joined = None  # scratch: carry + the next block
+        self._x = None       # scratch: frames as float32
+        self.reset()
+
+    def reset(self):
+        """Forget everything; the next sample fed is position 0"""
+        self._carried = 0
+        self.position = 0        # samples classified so far
+        self.speech_start = None  # sample position where the utterance began
+        self.speech_end = None    # ... and where it ended (hangover not included)
+        self._run = 0            # consecutive speech frames (before the start)
+        self._silence = 0        # consecutive non-speech frames (after the start)
+        self._speech_frames = 0
+
+    def classify(self, frames):
+        """Speech flags for a (n, frame) int16 array"""
+        self._x = _grow(self._x, frames.size, np.float32)
+        x = self._x[:frames.size].reshape(frames.shape)
+        np.copyto(x, frames)
+        energy = np.einsum("ij,ij->i", x, x)
+        np.sqrt(energy / self.frame, out=energy)
+        threshold = self.energy_threshold * self.threshold_ratio
+        loud = energy > threshold
+        if not loud.any():
+            return loud
+        # Spectral features only for the loud frames (usually few)
+        x = x[loud]
+        signs = np.signbit(x)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame
+        x *= self._window
+        power = np.abs(np.fft.rfft(x, axis=1)[:, self._band])
+        np.square(power, out=power)
+        power += 1e-10
+        mean = np.mean(power, axis=1)
+        flatness = np.exp(np.mean(np.log(power, out=power), axis=1)) / mean
+        voiced = flatness < self.max_flatness
+        fricative = (zcr > FRICATIVE_ZCR) & (energy[loud] > threshold * FRICATIVE_ENERGY)
+        loud[loud] = voiced | fricative
+        return loud
+
+    def feed(self, samples):
+        """Classify the complete frames in samples (int16); returns True once the utterance has ended"""
+        carried = self._carried
+        count = (carried + len(samples)) // self.frame
+        if count == 0:
+            self._carry[carried:carried + len(samples)] = samples
+            self._carried += len(samples)
+            return self.speech_end is not None
+        used = count * self.frame - carried  # samples of this block that complete frames
+        if carried:
+            self._joined = _grow(self._joined, count * self.frame, np.int16)
+            frames = self._joined[:count * self.frame]
+            frames[:carried] = self._carry[:carried]
+            frames[carried:] = samples[:used]
+        else:
+            frames = samples[:used]
+        flags = self.classify(frames.reshape(count, self.frame))
+        self._carried = len(samples) - used
+        self._carry[:self._carried] = samples[used:]
+        for speech in flags:
+            self.position += self.frame
+            if self.speech_end is not None:
+                continue
+            if self.speech_start is None:
+                self._run = self._run + 1 if speech else 0
+                if self._run >= self.onset_frames:
+                    self.speech_start = self.position - self._run * self.frame
+                    self._speech_frames = self._run
+                    self._silence = 0
+                continue
+            if speech:
+                self._speech_frames += 1 + self._silence
+                self._silence = 0
+                continue
+            self._silence += 1
+            if self._silence >= self.hangover_frames:
+                if self._speech_frames < self.min_speech_frames:
+                    # Too short to be a command (a click, a cough): keep waiting
+                    self.speech_start = None
+                    self._run = 0
+                    continue
+                self.speech_end = self.position - self._silence * self.frame
+        return self.speech_end is not None
+
+    @property
+    def started(self):
+        return self.speech_start is not None
+
+
+def record_utterance(source, detector, timeout=None, phrase_time_limit=None):
+    """Read one utterance from an entered sr.AudioSource; drop-in for Recognizer.listen
+
+    Raises sr.WaitTimeoutError if no speech started within timeout seconds.
+    The returned AudioData keeps PRE_ROLL_MS before the start and TAIL_MS
+    after the end. Sources with read_samples(size) (RingSource) hand over
+    int16 views; the blocks are only copied once, into the AudioData.
+    """
+    rate, width = source.SAMPLE_RATE, source.SAMPLE_WIDTH
+    pre_roll = rate * PRE_ROLL_MS // 1000
+    limit = int(phrase_time_limit * rate) if phrase_time_limit else None
+    read_samples = getattr(source.stream, "read_samples", None)
+    detector.reset()
+    blocks = []
+    base = 0  # position of blocks[0]
+    while True:
+        if read_samples is not None:
+            block = read_samples(source.CHUNK)
+        else:
+            block = np.frombuffer(source.stream.read(source.CHUNK), dtype=np.int16)
+        if not len(block):
+            break
+        blocks.append(block)
+        if detector.feed(block):
+            break
+        if not detector.started:
+            if timeout and detector.position > timeout * rate:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            # Keep just enough audio for the pre-roll
+            while len(blocks) > 1 and detector.position - (base + len(blocks[0])) >= pre_roll + len(block):
+                base += len(blocks.pop(0))
+        elif limit and detector.position - detector.speech_start >= limit:
+            break
+
+    start = max(0, (detector.speech_start or 0) - pre_roll - base)
+    end = sum(len(block) for block in blocks)
+    if detector.speech_end is not None:
+        end = min(end, detector.speech_end + rate * TAIL_MS // 1000 - base)
+    # Cut [start, end) out of the blocks and join the pieces in one copy
+    pieces, offset = [], 0
+    for block in blocks:
+        lo, hi = max(start - offset, 0), min(end - offset, len(block))
+        if lo < hi:
+            pieces.append(block[lo:hi])
+        offset += len(block)
+    return sr.AudioData(b"".join(pieces), rate, width)
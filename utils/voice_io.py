@@ -1,12 +1,24 @@
 """Text-to-speech and voice input utilities"""
-import subprocess
+import threading
+import time
+from contextlib import contextmanager
 import speech_recognition as sr
-from config.settings import OS
+from config.settings import MIC_ALWAYS_ON, MIC_BACKLOG_SECONDS, VAD_ENABLED
+from utils.audio_capture import CaptureStalled, MicrophoneCapture, get_capture, stop_capture
+from utils.text_processing import SentenceSegmenter
+from utils.tts import get_tts
+from utils.vad import VoiceActivityDetector, record_utterance
 import sounddevice as sd
 import typing
 
 class SoundDeviceMicrophone(sr.AudioSource):
-    """Custom microphone wrapper to substitute PyAudio with sounddevice."""
+    """Custom microphone wrapper to substitute PyAudio with sounddevice.
+
+    Used when the always-on capture is off or unavailable. The device is
+    opened per listen, but read the same way: its callback fills a ring
+    buffer and stream is a RingSource handing out views of it, not a
+    fresh bytes object per chunk.
+    """
     def __init__(self, device_index=None, sample_rate=None, chunk_size=1024):
         self.device_index = device_index
         self.format = 8
@@ -22,84 +34,101 @@ class SoundDeviceMicrophone(sr.AudioSource):
 
     def __enter__(self):
         assert self.stream is None, "This audio source is already inside a context manager"
-        self.audio = sd.RawInputStream(
-            samplerate=self.SAMPLE_RATE,
-            channels=1,
-            dtype='int16',
-            blocksize=self.CHUNK,
-            device=self.device_index
-        )
-        self.audio.start()
-        
-        class StreamWrapper:
-            def __init__(self, raw_stream):
-                self.raw_stream = raw_stream
-            def read(self, size):
-                data, overflow = self.raw_stream.read(size)
-                return bytes(data)
-                
-        self.stream = StreamWrapper(self.audio)
+        self.audio = MicrophoneCapture(self.device_index, self.SAMPLE_RATE, self.CHUNK).start()
+        self.stream = self.audio.source()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         if self.audio:
             self.audio.stop()
-            self.audio.close()
         self.stream = None
         self.audio = None
 
-def speak(text):
-    """Cross-platform text-to-speech"""
+# Per-thread speech redirect (see redirect_speech)
+_speech_local = threading.local()
+
+
+@contextmanager
+def redirect_speech(sink, before_listen=None):
+    """Send speak() calls made on this thread to sink(text) instead of the TTS engine
+
+    Used to collect the speech of steps that run concurrently so it can be
+    played back in a sensible order. before_listen() is called before
+    listen() opens the microphone, so a step that asks the user something can
+    wait until its question has actually been spoken.
+    """
+    previous = (getattr(_speech_local, "sink", None), getattr(_speech_local, "before_listen", None))
+    _speech_local.sink = sink
+    _speech_local.before_listen = before_listen
+    try:
+        yield
+    finally:
+        _speech_local.sink, _speech_local.before_listen = previous
+
+
+def speak(text, wait=False):
+    """Cross-platform text-to-speech; returns once queued unless wait is True"""
+    sink = getattr(_speech_local, "sink", None)
+    if sink is not None:
+        sink(text)
+        return
+    speak_now(text, wait)
+
+
+def speak_now(text, wait=False):
+    """Queue text for the TTS worker, ignoring any redirect_speech() on this thread
+
+    Speech is played in the order it was queued. With wait, returns only
+    once this text has been spoken.
+    """
     # Strip Markdown formatting (asterisks, bold markers) before speaking
     clean_text = text.replace("**", "").replace("*", "").replace("__", "").replace("_", "")
     print(f"Speaking: {clean_text}")
-    
-    try:
-        if OS == "windows":
-            subprocess.run(["powershell", "-c", f'(New-Object -ComObject SAPI.SpVoice).Speak("{clean_text}")'], capture_output=True)
-        elif OS == "darwin":  # macOS
-            subprocess.run(["say", clean_text], capture_output=True)
-        elif OS == "linux":
-            try:
-                subprocess.run(["espeak", clean_text], capture_output=True)
-            except FileNotFoundError:
-                try:
-                    subprocess.run(["festival", "--tts"], input=clean_text.encode(), capture_output=True)
-                except FileNotFoundError:
-                    pass
-        else:
-            pass
-    except Exception:
-        pass
+    done = get_tts().say(clean_text)
+    if wait:
+        done.wait()
 
 
-def speak_stream(chunks, min_buffer: int = 200, pause_on_punctuation: bool = False):
-    """Assemble an iterable/generator of text chunks into complete text.
+def speak_stream(chunks, clean=None, min_chars: int = 12, max_chars: int = 160):
+    """Speak a stream of text chunks sentence by sentence while it is still arriving
 
-    Behavior:
-    - Accumulates incoming chunks into a buffer
-    - Returns the complete assembled text
-    - Does NOT print or speak (caller is responsible for that)
-
-    This ensures clean single output without duplication.
+    Chunks are cut into sentences/clauses (SentenceSegmenter). Each finished
+    segment is cleaned with clean(segment) (e.g. gemini_client.strip_json_noise)
+    and queued for the TTS worker, so the first sentence is spoken while the
+    rest is still being generated. Returns the full text once all of it has
+    been queued (empty if there was none).
     """
-    buf: "list[str]" = []
+    say = getattr(_speech_local, "sink", None) or speak_now
+    segmenter = SentenceSegmenter(min_chars, max_chars)
+    spoken = []
+
+    def _emit(parts):
+        for part in parts:
+            text = clean(part) if clean else part
+            if text and text.strip():
+                spoken.append(text.strip())
+                try:
+                    say(text.strip())
+                except Exception:
+                    pass
 
     for c in chunks:
-        if not c:
-            continue
-        # ensure chunk is a string
-        part = str(c)
-        buf.append(part)
+        if c:
+            _emit(segmenter.feed(str(c)))
+    _emit(segmenter.flush())
 
-    # Assemble final text
-    final_text = "".join(buf).strip()
-    
-    return final_text
+    return " ".join(spoken)
 
 
 def listen():
     """Function to listen to user's voice command using sounddevice + Google Speech Recognition"""
+    before_listen = getattr(_speech_local, "before_listen", None)
+    if before_listen is not None:
+        before_listen()
+    # Let queued speech finish first: the microphone should not hear the assistant
+    tts = get_tts()
+    tts.drain()
+
     recognizer = sr.Recognizer()
     attempts = 3
     ambient_duration = 1.5
@@ -112,21 +141,45 @@ def listen():
     except Exception:
         pass
 
+    capture = get_capture() if MIC_ALWAYS_ON else None
+
     for attempt in range(attempts):
-        with SoundDeviceMicrophone() as source:
+        if capture is not None:
+            # Read on from the always-on stream, skipping stale audio and our own voice
+            source = capture.source(since=max(time.monotonic() - MIC_BACKLOG_SECONDS, tts.spoken_at))
+        else:
+            source = SoundDeviceMicrophone()
+        with source:
             print("Listening...")
-            try:
-                recognizer.adjust_for_ambient_noise(source, duration=ambient_duration)
-            except Exception:
-                pass
+            if capture is not None:
+                # The background noise floor replaces calibrating for ambient_duration
+                recognizer.dynamic_energy_threshold = False
+                recognizer.energy_threshold = capture.noise.threshold
+            else:
+                try:
+                    recognizer.adjust_for_ambient_noise(source, duration=ambient_duration)
+                except Exception:
+                    pass
 
             try:
-                audio = recognizer.listen(source, timeout=listen_timeout, phrase_time_limit=phrase_time_limit)
+                if VAD_ENABLED:
+                    # Ends the phrase after a few hundred ms of silence instead of pause_threshold
+                    detector = VoiceActivityDetector(source.SAMPLE_RATE, recognizer.energy_threshold)
+                    audio = record_utterance(source, detector, timeout=listen_timeout,
+                                             phrase_time_limit=phrase_time_limit)
+                else:
+                    audio = recognizer.listen(source, timeout=listen_timeout, phrase_time_limit=phrase_time_limit)
             except sr.WaitTimeoutError:
                 print("Listening timed out waiting for phrase.")
                 if attempt == attempts - 1:
                     speak("I didn't hear anything. Could you please repeat?")
                 continue
+            except CaptureStalled:
+                # The device went away: close it and open the microphone per attempt
+                print("Microphone stream stalled, reopening it.")
+                stop_capture()
+                capture = None
+                continue
 
         try:
             command = recognizer.recognize_google(audio).lower()